@@ -0,0 +1,198 @@
+# ============================================================================
+# QBID De-duplication
+# ============================================================================
+
+"""
+Single-pass removal of duplicate QBIDs from a theme's results
+
+Replaces V51's "TEMPORARY MEASURE": Sort by STARTDATE/MR_CODE, DeleteIdentical on QB_ID, then
+DeleteIdentical again on a synthetic EVCtemp field - each step writing a full copy of the table.
+Here each record is offered once to a hash map keyed on QBID that holds only the winner's policy key and
+position, not the record. Records are spooled to a temporary file as they arrive and read back once, so a
+theme's memory use is bounded by its number of distinct QBIDs times a small tuple.
+
+KEEP POLICIES (chosen per theme, see DEFAULT_KEEP_POLICIES):
+    'latest_startdate':     latest STARTDATE wins; ties go to the lowest MR_Code (risk_register.mr_code),
+                            then to the first seen (same order as V51's Sort + DeleteIdentical on the
+                            biodiversity tables)
+    'highest_value_id':     highest Value_ID wins, then the first seen (V51's forest table dedupe)
+
+Themes without a policy are not de-duplicated, as in V51.
+
+EVC suppression (V51's EVCtemp / "No comment" filters) is handled in the same pass:
+    - EVC records with the same works ID, EVC name and mitigation are collapsed to one
+    - an EVC record whose mitigation starts with "No comment" is dropped when the same works ID and
+      EVC name also has a record with any other mitigation
+"""
+
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from result_records import ResultRecord
+from risk_register import mr_code
+
+
+NO_COMMENT_PREFIX = "No comment"
+EVC_VALUE_TYPE = 'EVC'
+
+# Keep policy per theme (V51 dedupes the biodiversity and forest tables only)
+DEFAULT_KEEP_POLICIES = {'biodiversity': 'latest_startdate', 'forests': 'highest_value_id'}
+
+
+# Placeholder _build_result_row writes into empty extra fields
+MISSING_FIELD = 'Field not found'
+
+
+def _sort_key(value) -> tuple:
+    """Comparable key where missing values (and the missing-field placeholder) always lose"""
+    return (0,) if value in (None, '', MISSING_FIELD) else (1, value)
+
+
+def _startdate_key(record: ResultRecord) -> tuple:
+    return _sort_key(record.get('STARTDATE')), mr_code(record)
+
+
+def _latest_startdate(candidate: tuple, current: tuple) -> bool:
+    candidate_date, candidate_mr = candidate
+    current_date, current_mr = current
+    if candidate_date != current_date:
+        return candidate_date > current_date
+    if candidate_mr in (None, ''):
+        return False
+    return current_mr in (None, '') or str(candidate_mr) < str(current_mr)
+
+
+def _value_id_key(record: ResultRecord) -> tuple:
+    return _sort_key(record.Value_ID)
+
+
+def _highest_value_id(candidate: tuple, current: tuple) -> bool:
+    return candidate > current
+
+
+# Keep policy name -> (key function, function returning True if the candidate key beats the current winner's)
+KEEP_POLICIES: Dict[str, Tuple[Callable[[ResultRecord], tuple], Callable[[tuple, tuple], bool]]] = {
+    'latest_startdate': (_startdate_key, _latest_startdate),
+    'highest_value_id': (_value_id_key, _highest_value_id),
+}
+
+
+class QbidDeduplicator:
+    """Keeps one record per QBID for a single theme, plus the EVC "No comment" suppression
+
+    Records are spooled to a temporary file (in spool_dir, or the system temp folder) unless in_memory is
+    set, e.g. for records that are already held in a list.
+    """
+
+    def __init__(self, keep: str = 'latest_startdate', spool_dir: Optional[Path] = None, in_memory: bool = False):
+        if keep not in KEEP_POLICIES:
+            raise ValueError(f"Unknown keep policy '{keep}', expected one of {', '.join(KEEP_POLICIES)}")
+        self._key, self._is_better = KEEP_POLICIES[keep]
+        self._winners = {}              # QBID -> (policy key, position of the winning record)
+        self._commented_evcs = set()    # (works ID, EVC name) with a mitigation other than "No comment"
+        self._no_comment_codes = {}     # mitigation code -> starts with "No comment"
+        self._spool = _MemorySpool() if in_memory else _RecordSpool(spool_dir)
+        self.records_seen = 0
+
+    def add(self, records: Sequence[ResultRecord]):
+        """Offer a batch of records; each replaces the current winner for its QBID if the policy prefers it"""
+        winners = self._winners
+        for record in records:
+            position = self.records_seen
+            self.records_seen += 1
+            key = self._key(record)
+            current = winners.get(record.QBID)
+            if current is None or self._is_better(key, current[0]):
+                winners[record.QBID] = (key, position)
+
+            if record.schema.value_type == EVC_VALUE_TYPE and not self._is_no_comment(record):
+                self._commented_evcs.add((record.UNIQUE_ID, record.Value))
+        self._spool.write(records)
+
+    def results(self) -> Iterator[ResultRecord]:
+        """Surviving records, in the order they were added (read back once from the spool)"""
+        seen_evcs = set()
+        winners = self._winners
+        for position, record in enumerate(self._spool.read()):
+            if winners[record.QBID][1] != position:
+                continue
+            if record.schema.value_type == EVC_VALUE_TYPE:
+                evc_key = (record.UNIQUE_ID, record.Value)
+                if self._is_no_comment(record) and evc_key in self._commented_evcs:
+                    continue
+                if (evc_key, record.mitigation) in seen_evcs:
+                    continue
+                seen_evcs.add((evc_key, record.mitigation))
+            yield record
+
+    def __len__(self) -> int:
+        return len(self._winners)
+
+    def _is_no_comment(self, record: ResultRecord) -> bool:
+        code = record.mitigation
+        no_comment = self._no_comment_codes.get(code)
+        if no_comment is None:
+            mitigation = record['mitigation'] or ''
+            no_comment = self._no_comment_codes[code] = mitigation.startswith(NO_COMMENT_PREFIX)
+        return no_comment
+
+
+class _MemorySpool:
+    """Records already in memory, read back in order"""
+
+    def __init__(self):
+        self._records = []
+
+    def write(self, records: Sequence[ResultRecord]):
+        self._records.extend(records)
+
+    def read(self) -> Iterator[ResultRecord]:
+        records, self._records = self._records, []
+        return iter(records)
+
+
+class _RecordSpool:
+    """Records pickled to a temporary file one batch at a time, without their (shared) schemas"""
+
+    _VALUE_SLOTS = ResultRecord.__slots__[1:]
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._schemas = []              # schema per index, so spooled rows refer to the live schema objects
+        self._schema_index = {}
+
+    def write(self, records: Sequence[ResultRecord]):
+        rows = []
+        for record in records:
+            index = self._schema_index.get(record.schema)
+            if index is None:
+                index = self._schema_index[record.schema] = len(self._schemas)
+                self._schemas.append(record.schema)
+            rows.append((index, tuple(getattr(record, slot) for slot in self._VALUE_SLOTS)))
+        pickle.dump(rows, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def read(self) -> Iterator[ResultRecord]:
+        self._file.seek(0)
+        try:
+            while True:
+                try:
+                    rows = pickle.load(self._file)
+                except EOFError:
+                    break
+                for index, values in rows:
+                    record = ResultRecord.__new__(ResultRecord)
+                    record.schema = self._schemas[index]
+                    for slot, value in zip(self._VALUE_SLOTS, values):
+                        setattr(record, slot, value)
+                    yield record
+        finally:
+            self._file.close()
+
+
+def dedupe_records(records: Sequence[ResultRecord], keep: str = 'latest_startdate') -> List[ResultRecord]:
+    """Convenience wrapper: de-duplicate an in-memory list of records"""
+    deduplicator = QbidDeduplicator(keep, in_memory=True)
+    deduplicator.add(records)
+    return list(deduplicator.results())
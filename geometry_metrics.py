@@ -0,0 +1,378 @@
+# ============================================================================
+# Batched Geometry Metrics
+# ============================================================================
+
+"""
+Bulk calculation of X/Y, AREA_HA and LENGTH_KM for a feature class
+
+Replaces the AddField + per-row UpdateCursor pass (getArea / centroid / positionAlongLine per row) with:
+    1. one SearchCursor pass pulling every shape as WKB (points via FeatureClassToNumPyArray)
+    2. vectorised NumPy maths over all vertices at once: planar centroids and line midpoints in VICGRID2020
+    3. one vectorised pyproj transform to GDA2020 lat/long, then geodesic area (per ring) and length
+       (per segment, all segments in one call) on the GRS80 ellipsoid
+    4. one arcpy.da.ExtendTable call writing every field back
+
+Results match the cursor version: X/Y are truncated to whole metres, polygon X/Y are the area-weighted
+centroid (previously left at 0), line X/Y are the planar midpoint (positionAlongLine(0.5, True)).
+Features are always read in VICGRID2020 (PROJECTED_WKID), whatever the source's own coordinate system.
+
+NumPy ships with ArcGIS Pro; pyproj is optional. METRICS_AVAILABLE is False when either is missing and
+callers should fall back to the cursor implementation. Both are imported on first use (lazy_modules), so
+importing this module stays cheap for commands that never compute metrics.
+
+GeometryResolver provides the same X/Y lazily for result records: representative points are only
+computed for records that reach the QBID engine or a writer, once per source feature, memoised by OID.
+"""
+
+import struct
+from importlib.util import find_spec
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lazy_modules import LazyModule, arcpy
+
+np = LazyModule('numpy')
+pyproj = LazyModule('pyproj')
+METRICS_AVAILABLE = all(find_spec(name) is not None for name in ('numpy', 'pyproj'))
+
+
+# VICGRID2020 (working projection) -> GDA2020 geographic, GRS80 ellipsoid for geodesic measures
+PROJECTED_WKID = 7899
+GEOGRAPHIC_WKID = 7844
+ELLIPSOID = 'GRS80'
+
+# Output fields per geometry type (in addition to X and Y)
+MEASURE_FIELDS = {'POLYGON': 'AREA_HA', 'POLYLINE': 'LENGTH_KM'}
+
+# WKB geometry type codes
+_WKB_POINT, _WKB_LINESTRING, _WKB_POLYGON = 1, 2, 3
+_WKB_MULTIPOINT, _WKB_MULTILINESTRING, _WKB_MULTIPOLYGON = 4, 5, 6
+
+
+# ============================================================================
+# Public API
+# ============================================================================
+
+def add_geometry_fields(feature_class: str, where_clause: Optional[str] = None) -> str:
+    """Calculate X, Y and AREA_HA/LENGTH_KM for every feature and write them back in one ExtendTable call
+
+    Returns the upper-case shape type of the feature class.
+    """
+    shape_type, metrics = compute_metrics(feature_class, where_clause)
+    if metrics is not None and len(metrics):
+        oid_field = arcpy.Describe(feature_class).OIDFieldName
+        arcpy.da.ExtendTable(feature_class, oid_field, metrics, 'OID_JOIN', append_only=False)
+    return shape_type
+
+
+def compute_metrics(feature_class: str, where_clause: Optional[str] = None) -> Tuple[str, Optional['np.ndarray']]:
+    """Geometry metrics for the (optionally filtered) features of a feature class, in VICGRID2020
+
+    Returns (shape type, structured array with OID_JOIN, X, Y and AREA_HA or LENGTH_KM); the array is
+    None for unsupported geometry types.
+    """
+    shape_type = arcpy.Describe(feature_class).shapeType.upper()
+
+    if shape_type in ('POINT', 'MULTIPOINT'):
+        return shape_type, _point_metrics(feature_class, where_clause)
+
+    if shape_type in MEASURE_FIELDS:
+        oids, shapes = _read_wkb_shapes(feature_class, where_clause)
+        if shape_type == 'POLYGON':
+            return shape_type, _polygon_metrics(oids, shapes)
+        return shape_type, _line_metrics(oids, shapes)
+
+    return shape_type, None
+
+
+class GeometryResolver:
+    """Lazily resolves record X/Y from the feature each record references, memoised per (source, OID)
+
+    Records carry geometry_ref = (source feature class, OID): the value feature itself for point datasets,
+    otherwise the dissolved intersection piece. Sources are absolute paths, so the scratch outputs of the
+    runs sharing a resolver (run_batch) never share memo entries. X/Y stay None until a consumer calls
+    resolve() for a batch; only the OIDs not already memoised are read, one query per source per chunk.
+    """
+
+    CHUNK_SIZE = 1000   # OIDs per IN() query
+
+    def __init__(self):
+        self._points = {}           # (source, oid) -> (x, y)
+        self.features_read = 0
+
+    def resolve(self, records: Sequence) -> Sequence:
+        """Fill X/Y on every record in the batch that hasn't been resolved yet"""
+        missing = {}
+        for record in records:
+            if record.X is None and record.geometry_ref is not None and record.geometry_ref not in self._points:
+                source, oid = record.geometry_ref
+                missing.setdefault(source, set()).add(oid)
+
+        for source, oids in missing.items():
+            self._load(source, sorted(oids))
+
+        for record in records:
+            if record.X is None:
+                record.X, record.Y = self._points.get(record.geometry_ref, (0, 0))
+        return records
+
+    def _load(self, source: str, oids: List[int]):
+        for start in range(0, len(oids), self.CHUNK_SIZE):
+            for oid, x, y in self._representative_points(source, oids[start:start + self.CHUNK_SIZE]):
+                self._points[(source, oid)] = (int(x or 0), int(y or 0))
+                self.features_read += 1
+
+    def _representative_points(self, source: str, oids: List[int]) -> Iterable[Tuple[int, float, float]]:
+        where_clause = f"{arcpy.Describe(source).OIDFieldName} IN ({','.join(str(oid) for oid in oids)})"
+        if METRICS_AVAILABLE:
+            _, metrics = compute_metrics(source, where_clause)
+            if metrics is not None:
+                return zip(metrics['OID_JOIN'].tolist(), metrics['X'].tolist(), metrics['Y'].tolist())
+        return _cursor_representative_points(source, where_clause)
+
+
+def _cursor_representative_points(source: str, where_clause: str) -> Iterable[Tuple[int, float, float]]:
+    """Per-row fallback matching the batched metrics: point, area-weighted centroid or line midpoint"""
+    with arcpy.da.SearchCursor(source, ['OID@', 'SHAPE@'], where_clause, spatial_reference=projected_reference()) as cursor:
+        for oid, shape in cursor:
+            yield (oid,) + representative_point(shape)
+
+
+def representative_point(shape) -> Tuple[float, float]:
+    """X/Y of an arcpy geometry in VICGRID2020 by the batched metrics' rule: point, area-weighted centroid or line midpoint"""
+    if not shape or shape.pointCount == 0:
+        return 0, 0
+    reference = shape.spatialReference
+    if reference is not None and reference.factoryCode and reference.factoryCode != PROJECTED_WKID:
+        shape = shape.projectAs(projected_reference())
+    if shape.type == 'polygon':
+        point = shape.trueCentroid
+    elif shape.type == 'polyline':
+        point = shape.positionAlongLine(0.5, True).firstPoint
+    else:
+        point = shape.firstPoint
+    return point.X, point.Y
+
+
+# ============================================================================
+# Metric calculations
+# ============================================================================
+
+def _point_metrics(feature_class: str, where_clause: Optional[str]) -> 'np.ndarray':
+    points = arcpy.da.FeatureClassToNumPyArray(feature_class, ['OID@', 'SHAPE@X', 'SHAPE@Y'], where_clause,
+                                               projected_reference(), null_value=0)
+    metrics = np.zeros(len(points), dtype=[('OID_JOIN', '<i4'), ('X', '<f8'), ('Y', '<f8')])
+    metrics['OID_JOIN'] = points['OID@']
+    metrics['X'] = np.trunc(np.nan_to_num(points['SHAPE@X']))
+    metrics['Y'] = np.trunc(np.nan_to_num(points['SHAPE@Y']))
+    return metrics
+
+
+def _polygon_metrics(oids: List[int], shapes: List[list]) -> 'np.ndarray':
+    """Area-weighted centroids (planar) and geodesic areas for polygons given as lists of rings"""
+    # Flatten every ring of every feature: ring -> owning feature, and +1 exterior / -1 hole
+    rings, ring_feature, ring_role = [], [], []
+    for feature_index, polygons in enumerate(shapes):
+        for polygon in polygons:
+            for ring_number, ring in enumerate(polygon):
+                rings.append(ring)
+                ring_feature.append(feature_index)
+                ring_role.append(1.0 if ring_number == 0 else -1.0)
+
+    metrics = np.zeros(len(oids), dtype=[('OID_JOIN', '<i4'), ('X', '<f8'), ('Y', '<f8'), ('AREA_HA', '<f8')])
+    metrics['OID_JOIN'] = oids
+    if not rings:
+        return metrics
+
+    ring_feature = np.asarray(ring_feature)
+    ring_role = np.asarray(ring_role)
+    coords, starts = _concatenate(rings)
+
+    # Shift to a local origin to keep the shoelace products well conditioned
+    origin = coords.mean(axis=0)
+    x, y = (coords - origin).T
+    next_index = _next_vertex_index(starts, len(coords))
+    x1, y1 = x[next_index], y[next_index]
+    cross = x * y1 - x1 * y
+
+    signed_area = np.add.reduceat(cross, starts) / 2
+    moment_x = np.add.reduceat((x + x1) * cross, starts) / 6
+    moment_y = np.add.reduceat((y + y1) * cross, starts) / 6
+
+    # Normalise ring orientation: exteriors add, holes subtract, whatever the winding order
+    weight = ring_role * np.sign(signed_area)
+    feature_area = np.bincount(ring_feature, weights=np.abs(signed_area) * ring_role, minlength=len(oids))
+    feature_mx = np.bincount(ring_feature, weights=moment_x * weight, minlength=len(oids))
+    feature_my = np.bincount(ring_feature, weights=moment_y * weight, minlength=len(oids))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centroid_x = np.where(feature_area > 0, feature_mx / feature_area + origin[0], 0)
+        centroid_y = np.where(feature_area > 0, feature_my / feature_area + origin[1], 0)
+
+    # Geodesic area per ring on the ellipsoid, all coordinates transformed in one call
+    lons, lats = _to_geographic(coords)
+    geod = pyproj.Geod(ellps=ELLIPSOID)
+    ends = np.append(starts[1:], len(coords))
+    ring_geodesic = np.array([abs(geod.polygon_area_perimeter(lons[s:e], lats[s:e])[0])
+                              for s, e in zip(starts, ends)])
+    geodesic_area = np.bincount(ring_feature, weights=ring_geodesic * ring_role, minlength=len(oids))
+
+    metrics['X'] = np.trunc(centroid_x)
+    metrics['Y'] = np.trunc(centroid_y)
+    metrics['AREA_HA'] = geodesic_area / 10000
+    return metrics
+
+
+def _line_metrics(oids: List[int], shapes: List[list]) -> 'np.ndarray':
+    """Planar midpoints and geodesic lengths for polylines given as lists of parts"""
+    parts, part_feature = [], []
+    for feature_index, line_parts in enumerate(shapes):
+        for part in line_parts:
+            parts.append(part)
+            part_feature.append(feature_index)
+
+    metrics = np.zeros(len(oids), dtype=[('OID_JOIN', '<i4'), ('X', '<f8'), ('Y', '<f8'), ('LENGTH_KM', '<f8')])
+    metrics['OID_JOIN'] = oids
+    if not parts:
+        return metrics
+
+    coords, starts = _concatenate(parts)
+    vertex_feature = np.repeat(np.asarray(part_feature), np.diff(np.append(starts, len(coords))))
+
+    # Segments join consecutive vertices of the same part only
+    same_part = np.ones(len(coords) - 1, dtype=bool)
+    same_part[starts[1:] - 1] = False
+    segment_feature = vertex_feature[:-1][same_part]
+
+    deltas = np.diff(coords, axis=0)[same_part]
+    planar_lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+
+    lons, lats = _to_geographic(coords)
+    geodesic_lengths = pyproj.Geod(ellps=ELLIPSOID).line_lengths(lons, lats)
+    geodesic_lengths = np.asarray(geodesic_lengths)[same_part]
+    metrics['LENGTH_KM'] = np.bincount(segment_feature, weights=geodesic_lengths, minlength=len(oids)) / 1000
+
+    # Planar midpoint along each feature's parts in order, as positionAlongLine(0.5, True): one cumulative
+    # length over every segment, then one searchsorted for the half-way length of every feature
+    features = np.unique(segment_feature)
+    first = np.searchsorted(segment_feature, features, side='left')
+    last = np.searchsorted(segment_feature, features, side='right') - 1
+    cumulative = np.cumsum(planar_lengths)
+    offset = cumulative[first] - planar_lengths[first]
+    half = offset + (cumulative[last] - offset) / 2
+    segment = np.clip(np.searchsorted(cumulative, half), first, last)
+
+    lengths = planar_lengths[segment]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(lengths > 0, (half - (cumulative[segment] - lengths)) / lengths, 0)
+    midpoints = coords[:-1][same_part][segment] + deltas[segment] * fraction[:, None]
+    metrics['X'][features] = np.trunc(midpoints[:, 0])
+    metrics['Y'][features] = np.trunc(midpoints[:, 1])
+
+    return metrics
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _read_wkb_shapes(feature_class: str, where_clause: Optional[str]) -> Tuple[List[int], List[list]]:
+    """One cursor pass returning OIDs and shapes parsed from WKB (empty list for null shapes)"""
+    oids, shapes = [], []
+    with arcpy.da.SearchCursor(feature_class, ['OID@', 'SHAPE@WKB'], where_clause,
+                               spatial_reference=projected_reference()) as cursor:
+        for oid, wkb in cursor:
+            oids.append(oid)
+            shapes.append(parse_wkb(bytes(wkb))[1] if wkb else [])
+    return oids, shapes
+
+
+def parse_wkb(wkb: bytes, offset: int = 0) -> Tuple[int, list]:
+    """Parse (ISO or extended) WKB into (base type, parts)
+
+    Points and lines give a list of Nx2 coordinate arrays; polygons give a list of polygons, each a list
+    of rings (exterior first). Z and M values are dropped.
+    """
+    geometry_type, parts, _ = _parse_wkb(wkb, offset)
+    return geometry_type, parts
+
+
+def _parse_wkb(wkb: bytes, offset: int) -> Tuple[int, list, int]:
+    byte_order = '<' if wkb[offset] == 1 else '>'
+    raw_type = struct.unpack_from(f'{byte_order}I', wkb, offset + 1)[0]
+    offset += 5
+
+    has_z = bool(raw_type & 0x80000000) or (raw_type & 0xFFFF) // 1000 in (1, 3)
+    has_m = bool(raw_type & 0x40000000) or (raw_type & 0xFFFF) // 1000 in (2, 3)
+    geometry_type = (raw_type & 0xFFFF) % 1000
+    dims = 2 + has_z + has_m
+    dtype = np.dtype(f'{byte_order}f8')
+
+    def read_coords(offset: int) -> Tuple['np.ndarray', int]:
+        count = struct.unpack_from(f'{byte_order}I', wkb, offset)[0]
+        offset += 4
+        coords = np.frombuffer(wkb, dtype=dtype, count=count * dims, offset=offset).reshape(count, dims)[:, :2]
+        return coords.astype('<f8'), offset + count * dims * 8
+
+    if geometry_type == _WKB_POINT:
+        coords = np.frombuffer(wkb, dtype=dtype, count=dims, offset=offset)[:2].reshape(1, 2).astype('<f8')
+        return geometry_type, [coords], offset + dims * 8
+
+    if geometry_type == _WKB_LINESTRING:
+        coords, offset = read_coords(offset)
+        return geometry_type, [coords], offset
+
+    if geometry_type == _WKB_POLYGON:
+        ring_count = struct.unpack_from(f'{byte_order}I', wkb, offset)[0]
+        offset += 4
+        rings = []
+        for _ in range(ring_count):
+            ring, offset = read_coords(offset)
+            rings.append(ring)
+        return geometry_type, [rings], offset
+
+    if geometry_type in (_WKB_MULTIPOINT, _WKB_MULTILINESTRING, _WKB_MULTIPOLYGON):
+        member_count = struct.unpack_from(f'{byte_order}I', wkb, offset)[0]
+        offset += 4
+        parts = []
+        for _ in range(member_count):
+            _, member_parts, offset = _parse_wkb(wkb, offset)
+            parts.extend(member_parts)
+        return geometry_type - 3, parts, offset
+
+    raise ValueError(f"Unsupported WKB geometry type: {raw_type}")
+
+
+def _concatenate(arrays: List['np.ndarray']) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Stack coordinate arrays, returning the stacked array and each array's start index"""
+    lengths = np.array([len(a) for a in arrays])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.concatenate(arrays), starts
+
+
+def _next_vertex_index(starts: 'np.ndarray', total: int) -> 'np.ndarray':
+    """Index of the following vertex in the same ring, wrapping the last vertex to the ring start"""
+    next_index = np.arange(1, total + 1)
+    ends = np.append(starts[1:], total) - 1
+    next_index[ends] = starts
+    return next_index
+
+
+_spatial_references = {}
+
+
+def projected_reference():
+    """arcpy SpatialReference for PROJECTED_WKID, created once"""
+    if PROJECTED_WKID not in _spatial_references:
+        _spatial_references[PROJECTED_WKID] = arcpy.SpatialReference(PROJECTED_WKID)
+    return _spatial_references[PROJECTED_WKID]
+
+
+_transformers: Dict[Tuple[int, int], 'pyproj.Transformer'] = {}
+
+
+def _to_geographic(coords: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """Project VICGRID2020 coordinates to GDA2020 long/lat in one vectorised call"""
+    key = (PROJECTED_WKID, GEOGRAPHIC_WKID)
+    if key not in _transformers:
+        _transformers[key] = pyproj.Transformer.from_crs(PROJECTED_WKID, GEOGRAPHIC_WKID, always_xy=True)
+    return _transformers[key].transform(coords[:, 0], coords[:, 1])
@@ -5,18 +5,35 @@
 # Gippsland rulz
 # ============================================================================
 
-import arcpy
-import pandas as pd
+import argparse
+import csv
 import logging
 import os
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from dataclasses import replace
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from dataclasses import dataclass
 
+from lazy_modules import arcpy, pd
 from dataset_matrix import DATASET_MATRIX
-from qbid_matrix import QBID_MATRIX, QBID2_MATRIX
-from mitigations import FOREST_MITIGATIONS, HERITAGE_MITIGATIONS, NATIVE_TITLE_MATRIX
+from qbid_engine import QbidEngine, QbidIndex
+from dedup import DEFAULT_KEEP_POLICIES, QbidDeduplicator, dedupe_records
+import geometry_metrics
+from tile_cache import TileCache
+from source_metadata import change_stamp
+from replica_store import ReplicaStore
+import spatial_index
+from values_index import ValuesIndex
+from run_stats import STATS_FILE, RunStatistics
+from summary_table import SummaryFlattener
+from mitigations import HERITAGE_MITIGATIONS, NATIVE_TITLE_MATRIX
+from mitigation_index import MitigationIndex, flatten_mitigations
+from risk_register import LANDSCAPE_PRECEDENCE_REGISTERS, MODE_REGISTERS, MitigationRewriter, RiskRegister, mr_code
+from result_records import (RESULT_FIELDS, DERIVED_FIELDS, SCHEMA_FIELDS, DatasetSchema, ResultRecord, RunDictionaries,
+                            encoded_columns, records_to_dicts)
 
 
 # ============================================================================
@@ -30,13 +47,35 @@ class Settings:
     workspace: Path
     mode: str = "DAP"
     themes: List[str] = None
+    modes: Optional[List[str]] = None   # several modes in one run (shared detection, per-mode outputs); defaults to [mode]
     district: str = None
+    keep_results: bool = False      # opt-in: hold every result in memory and return it (pre-streaming behaviour)
+    batch_size: int = 5000          # rows per batch when streaming results through mitigation and writers
+    dedupe_keep: Optional[Dict[str, str]] = None    # QBID dedupe keep policy per theme ('latest_startdate', 'highest_value_id'); None for dedup.DEFAULT_KEEP_POLICIES, {} to disable
+    tile_cache: Optional[Path] = None   # folder of the tiled values cache (see tile_cache.py); None reads sources directly
+    replica_store: Optional[Path] = None    # folder of local replicas of the network sources (see replica_store.py)
+    replica_refresh_hours: float = 24   # replicas older than this are refreshed at the start of a run
+    replica_rebuild_days: float = 7     # replicas of sources without editor tracking are rebuilt at least this often
+    point_fast_path: bool = True        # check point datasets by exact distance to the works instead of buffer + Intersect
+    curve_tolerance: float = spatial_index.CURVE_TOLERANCE   # metres a true curve may move when replaced by chords for distance checks
+    order_by_history: bool = True       # run cheap, likely-to-match datasets first using the run statistics history
+    code_mitigations: bool = True       # apply EVC/species-level MITIGATIONS entries, not just theme/value type ones
+    risk_registers: Optional[Dict[str, str]] = None     # risk register tables by key (RISK_REGISTERS); None skips the MR_Code join
     
     def __post_init__(self):
         if self.themes is None:
             self.themes = ["forests", "biodiversity"]
+        if self.dedupe_keep is None:
+            self.dedupe_keep = dict(DEFAULT_KEEP_POLICIES)
+        if not self.modes:
+            self.modes = [self.mode]
+        self.mode = self.modes[0]       # primary mode, for single-mode callers
         self.workspace = Path(self.workspace)
         self.workspace.mkdir(exist_ok=True)
+        if self.tile_cache is not None:
+            self.tile_cache = Path(self.tile_cache)
+        if self.replica_store is not None:
+            self.replica_store = Path(self.replica_store)
 
 @dataclass
 class DatasetConfig:
@@ -54,6 +93,33 @@ class DatasetConfig:
     modes: Optional[List[str]] = None
 
 
+# ============================================================================
+# Shared Caches
+# ============================================================================
+
+class SharedCache:
+    """Values-side state that stays warm across the ValuesChecker runs of one process (see run_batch)
+
+    Nothing here depends on the works being checked: source metadata, selection layers over whole
+    sources, resolved value geometry, the tile cache, replicas and run statistics.
+    """
+
+    def __init__(self, settings: Settings):
+        self.tile_cache = TileCache(settings.tile_cache) if settings.tile_cache else None
+        self.replicas = (ReplicaStore(settings.replica_store, settings.replica_refresh_hours,
+                                      rebuild_days=settings.replica_rebuild_days) if settings.replica_store else None)
+        self.replicas_refreshed = False
+        self.run_stats = RunStatistics(settings.workspace / STATS_FILE)
+        self.geometry = geometry_metrics.GeometryResolver()    # lazy X/Y for result records, memoised by source OID
+        self.source_extents = {}                    # values source -> (change stamp, extent in the works' coordinate system)
+        self.existing = set()                       # values sources known to exist
+        self.shape_types = {}                       # values source -> shape type ('' if it can't be described)
+        self.field_names = {}                       # values source -> set of field names
+        self.selection_layers = {}                  # (values source, where clause) -> feature layer
+        self.risk_registers = {}                    # risk register path -> RiskRegister, loaded on first use (or by build_values_index)
+        self.register_rewriter = MitigationRewriter()   # REGISTER_MITIGATION_RULES, shared by all registers
+
+
 # ============================================================================
 # Main Processing Engine
 # ============================================================================
@@ -61,11 +127,33 @@ class DatasetConfig:
 class ValuesChecker:
     """Main processing engine for values checking"""
     
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, shared: Optional[SharedCache] = None):
         self.settings = settings
+        self.shared = shared or SharedCache(settings)
         self.logger = self._setup_logging()
         self.start_date = datetime.now().strftime("%Y%m%d") #("%d%m%Y")
         self.temp_datasets = []
+        self.dictionaries = RunDictionaries()      # per-run codes for repetitive result columns
+        self.geometry = self.shared.geometry
+        self.qbid_engines = {mode: QbidEngine(mode, self.geometry) for mode in settings.modes}
+        self.qbid_engine = self.qbid_engines[settings.mode]
+        self.mitigation_index = MitigationIndex(flatten_mitigations(settings.code_mitigations))
+        self.tile_cache = self.shared.tile_cache
+        self.replicas = self.shared.replicas
+        self.works_extent = None                    # extent of the widest works buffer, used to pick cached tiles
+        self.working_data = None                    # cleaned works feature class
+        self._works_geometry = None                 # works read once for the point fast path, by high_risk_only
+        self.works_partitions = {}                  # works/buffer layer -> {high_risk_only: (layer, feature count)}
+        self.works_extents = {}                     # works/buffer layer -> extent (xmin, ymin, xmax, ymax)
+        self._source_extents = self.shared.source_extents
+        self._source_stamps = {}                    # values source -> change stamp, taken once per run
+        self._dataset_checked = False               # set once a dataset gets past the extent early exits
+        self.run_stats = self.shared.run_stats
+        self.values_index = None                    # warm in-memory values for interactive checks (build_values_index)
+        self._indexed_sources = {}                  # (theme, dataset) -> (source, where clause) key into values_index
+        self._indexed_schemas = {}                  # (theme, dataset, buffer, mode) -> schema, reused across checks
+        self.heritage_sites = {}                    # mode -> HeritageSiteIndex of the run's heritage results
+        self.summary_tables = {}                    # mode -> SummaryFlattener of the run's summary results
         self._setup_arcpy_environment()
     
     def process(self) -> Dict:
@@ -78,36 +166,61 @@ class ValuesChecker:
         3. Apply mitigations to results
         4. Generate output files
         6. Cleanup temporary data
+
+        By default phases 2-4 are streamed: cursor rows flow through row-build -> QBID -> mitigation -> writer
+        in bounded batches and only summary counts and output paths are returned. Set Settings.keep_results
+        to hold all results in memory and return them in the result dict.
         """
         try:
-            self.logger.info(f"Starting values checking - Mode: {self.settings.mode}")
+            self.logger.info(f"Starting values checking - Mode: {', '.join(self.settings.modes)}")
             
             # Phase 1: Data Preparation
             self.logger.info("Phase 1: Preparing data...")
             self._setup_workspace()
-            working_data = self._prepare_input_data()
+            self._refresh_replicas()
+            working_data = self.working_data = self._prepare_input_data()
             buffered_layers = self._create_all_buffers(working_data)
+            self.works_extent = self._get_works_extent(working_data)
+
+            if not self.settings.keep_results:
+                # Phases 2-4: Detect (once for all modes), mitigate and write values one batch at a time
+                self.logger.info("Phases 2-4: Detecting values, applying mitigations and writing outputs (streaming)...")
+                outputs, counts = self._stream_all_themes(buffered_layers)
+                for mode in self.settings.modes:
+                    outputs.extend(self._generate_works_outputs(working_data, mode))
+                collisions = self._report_qbid_collisions()
+
+                self.run_stats.save()
+                self.logger.info("Processing completed successfully")
+                return {'success': True, 'outputs': outputs, 'counts': self._by_mode(counts), 'qbid_collisions': collisions}
             
-            # Phase 2: Values Detection
+            # Phase 2: Values Detection (once for all modes)
             self.logger.info("Phase 2: Detecting values...")
-            all_results = {}
+            all_results = {mode: {} for mode in self.settings.modes}
             for theme in self.settings.themes:
                 self.logger.info(f"Processing {theme} theme...")
-                theme_results = self._process_single_theme(theme, buffered_layers)
-                all_results[theme] = theme_results
+                theme_results = list(self._process_single_theme(theme, buffered_layers))
+                for mode, mode_results in self._split_by_mode(theme_results).items():
+                    all_results[mode][theme] = self.qbid_engines[mode].build_batch(mode_results)
                 self.logger.info(f"Found {len(theme_results)} values for {theme} theme")
                 print("-" * 60)
             
-            # Phase 3: Apply Mitigations
-            self.logger.info("Phase 3: Applying mitigations...")
-            mitigated_results = self._apply_all_mitigations(all_results)
-            
-            # Phase 4: Generate Outputs
-            self.logger.info("Phase 4: Generating outputs...")
-            outputs = self._generate_all_outputs(mitigated_results, working_data)
+            # Phases 3-4: Apply mitigations and generate outputs per mode
+            outputs, results = [], {}
+            for mode in self.settings.modes:
+                self.logger.info(f"Phase 3: Applying mitigations ({mode})...")
+                mitigated_results = self._apply_all_mitigations(all_results[mode], mode)
+                
+                self.logger.info(f"Phase 4: Generating outputs ({mode})...")
+                for theme_results in mitigated_results.values():
+                    self.qbid_engines[mode].build_alt(theme_results)
+                outputs.extend(self._generate_all_outputs(mitigated_results, working_data, mode))
+                results[mode] = {theme: records_to_dicts(records) for theme, records in mitigated_results.items()}
+            collisions = self._report_qbid_collisions()
+            self.run_stats.save()
             
             self.logger.info("Processing completed successfully")
-            return {'success': True, 'outputs': outputs, 'results': mitigated_results}
+            return {'success': True, 'outputs': outputs, 'results': self._by_mode(results), 'qbid_collisions': collisions}
             
         except Exception as e:
             self.logger.error(f"Processing failed: {e}", exc_info=True)
@@ -116,6 +229,61 @@ class ValuesChecker:
         finally:
             # Phase 5: Clean up temporary files
             self._cleanup_temp_data()
+
+    def _stream_all_themes(self, buffered_layers: Dict[str, str]) -> tuple:
+        """Stream each theme's results through mitigation and into its CSV writer in bounded batches"""
+        outputs = []
+        counts = {mode: {} for mode in self.settings.modes}
+
+        for theme in self.settings.themes:
+            self.logger.info(f"Processing {theme} theme...")
+            modes = self.settings.modes
+            writers = {mode: ThemeCsvWriter(self._get_theme_csv_path(theme, mode), self._get_theme_columns(theme, mode))
+                       for mode in modes}
+            keep = self.settings.dedupe_keep.get(theme)
+            deduplicators = {mode: QbidDeduplicator(keep, self.settings.workspace) if keep else None for mode in modes}
+
+            def mitigate_and_write(mode: str, mode_batch: List[ResultRecord]):
+                mode_batch = self._apply_theme_mitigations(theme, mode_batch, mode)
+                self._collect_summary(theme, mode_batch, mode)
+                if deduplicators[mode]:
+                    deduplicators[mode].add(mode_batch)     # only the current winner per QBID is held
+                else:
+                    for batch in _batched(mode_batch, self.settings.batch_size):
+                        writers[mode].write_batch(self.qbid_engines[mode].build_alt(batch))
+
+            # Each batch is detected once, then QBIDs, mitigations and dedupe run per mode. Heritage mitigations
+            # depend on every site found for a work, so that theme is held and mitigated once it is complete.
+            held = {mode: [] for mode in modes} if theme in WHOLE_THEME_RULE_THEMES else None
+            theme_results = self._process_single_theme(theme, buffered_layers)
+            for batch in _batched(theme_results, self.settings.batch_size):
+                for mode, mode_batch in self._split_by_mode(batch).items():
+                    self.qbid_engines[mode].build_batch(mode_batch)
+                    if held is not None:
+                        held[mode].extend(mode_batch)
+                    else:
+                        mitigate_and_write(mode, mode_batch)
+
+            for mode in modes:
+                if held and held[mode]:
+                    mitigate_and_write(mode, held[mode])
+                writer, deduplicator = writers[mode], deduplicators[mode]
+                if deduplicator:
+                    self.logger.info(f"Removed {deduplicator.records_seen - len(deduplicator)} duplicate QBID records from {mode} {theme} theme")
+                    for batch in _batched(deduplicator.results(), self.settings.batch_size):
+                        writer.write_batch(self.qbid_engines[mode].build_alt(batch))
+                writer.close()
+
+                counts[mode][theme] = writer.rows_written
+                if writer.rows_written:
+                    outputs.append(str(writer.filepath))
+                    self.logger.info(f"Created {mode} {theme} report: {writer.filepath}")
+                self.logger.info(f"Found {writer.rows_written} values for {mode} {theme} theme")
+            print("-" * 60)
+
+        self.logger.debug(f"Distinct values per encoded column: {self.dictionaries.summary()}")
+        self.logger.debug(f"Geometry resolved for {self.geometry.features_read} features")
+        return outputs, counts
     
     # ========================================================================
     # Phase 1: Data Preparation Methods
@@ -152,7 +320,8 @@ class ValuesChecker:
         # Add and calculate geometry fields
         self._add_geometry_fields(working_copy)
         self.temp_datasets.append(working_copy)
-        count_feat = arcpy.GetCount_management(working_copy)
+        self._partition_by_risk(working_copy)
+        count_feat = self.works_partitions[working_copy][False][1]
         self.logger.info(f"{self.settings.input_data} cleaned and copied ({count_feat} features)")
         
         return working_copy
@@ -162,8 +331,10 @@ class ValuesChecker:
         buffers = {}
         buffer_names = []
         
-        # Process buffers in dependency order
+        # Process buffers in dependency order; distance rings are evaluated by distance, not built
         for buffer_name, config in BUFFERS.items():
+            if config['buffer_type'] == "RING":
+                continue
             buffer_layer = f"buffer_{buffer_name}"
             buffer_path = os.path.join(arcpy.env.workspace, buffer_layer)
             
@@ -197,6 +368,7 @@ class ValuesChecker:
             
             buffers[buffer_name] = buffer_layer
             self.temp_datasets.append(buffer_layer)
+            self._partition_by_risk(buffer_layer)
             self.logger.debug(f"Created {buffer_name} buffer with type {config['buffer_type']}")
             buffer_names.append(buffer_name)
         
@@ -207,169 +379,352 @@ class ValuesChecker:
     # Phase 2: Values Detection Methods
     # ========================================================================
     
-    def _process_single_theme(self, theme: str, buffered_layers: Dict[str, str]) -> List[Dict]:
-        """Process all datasets for a single theme"""
+    def _process_single_theme(self, theme: str, buffered_layers: Dict[str, str]) -> Iterator[ResultRecord]:
+        """Process all datasets for a single theme, yielding results as they are read"""
               
         # Get dataset configurations for this theme
         if theme not in DATASET_MATRIX:
             self.logger.warning(f"No datasets configured for theme: {theme}")
-            return []
+            return
         
         theme_datasets = DATASET_MATRIX[theme]
+        dataset_names = list(theme_datasets)
+        if self.settings.order_by_history:
+            # Cheap, likely-to-match datasets first; expensive, likely-empty datasets last
+            dataset_names.sort(key=lambda name: self.run_stats.priority(self._stats_key(theme, name)))
         
         # Process each dataset in the theme
-        all_theme_results = []
-        
-        for dataset_name, config in theme_datasets.items():
+        for dataset_name in dataset_names:
             try:
                 # Unpack configuration fields, applying defaults & type
-                config = DatasetConfig(**config)
+                config = DatasetConfig(**theme_datasets[dataset_name])
+
+                if not self._get_enabled_modes(config):
+                    self.logger.info(f"Skipped {dataset_name} as it is disabled in {'/'.join(self.settings.modes)} mode")
+                    continue
 
-                if self._is_dataset_enabled_for_mode(config):
-                    for buffer in self._get_buffer_list(config):
-                        dataset_results = self._process_single_dataset(dataset_name, config, buffer, theme)
-                        all_theme_results.extend(dataset_results)
-                        self.logger.info(f"Processed {dataset_name} with {buffer[7:]} buffer: {len(dataset_results)} values found")
+                # Time spent in this dataset only, not in the consumers of its results
+                stats_key = self._stats_key(theme, dataset_name)
+                values_found, elapsed, started = 0, 0.0, time.perf_counter()
+                self._dataset_checked = False
+                for result in self._process_dataset_buffers(dataset_name, config, theme):
+                    elapsed += time.perf_counter() - started
+                    values_found += 1
+                    yield result
+                    started = time.perf_counter()
+                elapsed += time.perf_counter() - started
+                # extent-skipped datasets are counted apart, so they don't look like empty runs to priority()
+                if self._dataset_checked:
+                    self.run_stats.record(stats_key, values_found, elapsed)
                 else:
-                    self.logger.info(f"Skipped {dataset_name} as it is disabled in {MODE} mode")
+                    self.run_stats.record_skip(stats_key)
             except Exception as e:
                 self.logger.warning(f"Failed to process {dataset_name}: {e}")
 
-        return all_theme_results
+    def _process_dataset_buffers(self, dataset_name: str, config: DatasetConfig, theme: str) -> Iterator[ResultRecord]:
+        """All results of one dataset across its buffers for the current mode"""
+        values_layer_path = self._resolve_values_path(config)
+        if self.works_extent:
+            skip_reason = self._get_extent_skip_reason(values_layer_path, self.works_extent)
+            if skip_reason:
+                self.logger.info(f"Skipped {dataset_name}: {skip_reason}")
+                return
+
+        point_results = self._process_point_dataset(dataset_name, config, theme) if self.settings.point_fast_path else None
+        if point_results is not None:
+            self._dataset_checked = True
+            for buffer, results in point_results.items():
+                yield from results
+                self.logger.info(f"Processed {dataset_name} with {buffer[7:]} buffer (point distance): {len(results)} values found")
+            return
+
+        for buffer in self._get_dataset_buffers(config):
+            values_found = 0
+            for result in self._process_single_dataset(dataset_name, config, buffer, theme):
+                values_found += 1
+                yield result
+            self.logger.info(f"Processed {dataset_name} with {buffer[7:]} buffer: {values_found} values found")
     
-    def _process_single_dataset(self, dataset_name: str, config: DatasetConfig, buffer_name: str, theme: str) -> List[Dict]:
-        """Process a single dataset using its configuration"""
+    def _process_single_dataset(self, dataset_name: str, config: DatasetConfig, buffer_name: str, theme: str) -> Iterator[ResultRecord]:
+        """Process a single dataset using its configuration, yielding one result per cursor row"""
         
-        # Step 1: Resolve dataset path and check existence
-        values_layer_path = config.path.format(**DATA_PATHS)
+        # Step 1: Resolve dataset path (local replica if there is one) and check existence
+        values_layer_path = self._resolve_values_path(config)
 
-        if not arcpy.Exists(values_layer_path):
+        if not self._values_exist(values_layer_path):
             self.logger.warning(f"Dataset not found: {values_layer_path}")
-            return []
+            return
         
-        # Step 2: Apply selection criteria to values layer if specified
-        values_layer = values_layer_path
+        # Step 2: Pick the works partition (all, or non-LRLI for high risk datasets); distance rings are
+        # measured from the works themselves
+        inner_distance, outer_distance = self._get_buffer_band(buffer_name[7:])
+        works_source = buffer_name if inner_distance is None else self.working_data
+        works_layer, works_count = self.works_partitions[works_source][config.high_risk_only]
+
+        # Step 3: early exit, from recorded counts and cached extents only (no GetCount)
+        if works_count == 0:
+            self.logger.info(f"Skipped {dataset_name} with {buffer_name[7:]} buffer: no {'non-LRLI ' if config.high_risk_only else ''}works")
+            return
+        works_extent = self.works_extents[works_source]
+        if inner_distance is not None:
+            works_extent = _grow_extent(works_extent, outer_distance)
+        skip_reason = self._get_extent_skip_reason(values_layer_path, works_extent)
+        if skip_reason:
+            self.logger.info(f"Skipped {dataset_name} with {buffer_name[7:]} buffer: {skip_reason}")
+            return
+        self._dataset_checked = True
+
+        # Step 4: Read from the cached tiles around the works where available, and apply selection criteria
+        values_layer, values_fc = self._get_values_source(values_layer_path)
         if config.where_clause:
-            values_layer = arcpy.management.SelectLayerByAttribute(values_layer_path, "NEW_SELECTION", config.where_clause)
+            values_layer = self._select_values(values_layer, values_fc, config.where_clause)
 
-        # Step 3: Apply LRLI filter to works layer if specified
-        if config.high_risk_only:
-            works_layer = arcpy.management.SelectLayerByAttribute(buffer_name, "NEW_SELECTION", f"{RISK_LEVEL_FIELD} <> 'LRLI'")
-        else:
-            works_layer = buffer_name
+        # Step 5a: Distance rings (inner < d <= outer) by distance predicates, with no ring polygons built
+        if inner_distance is not None:
+            yield from self._process_distance_band(dataset_name, config, buffer_name, theme, works_layer, values_layer, values_fc)
+            return
 
-        # Step 4: quick check of how many features remain after selection/filtering
-        values_count = int(arcpy.GetCount_management(values_layer)[0])
-        works_count = int(arcpy.GetCount_management(works_layer)[0])
-        
-        # Step 5: Perform spatial intersection
-        if values_count > 0 and works_count > 0:
-            intersect_output = f"intersect_{dataset_name}_{buffer_name}"
-            intersect_result = arcpy.analysis.Intersect([works_layer, values_layer], intersect_output, "ALL")
-            self.temp_datasets.append(intersect_output)
-        else:
-            self.logger.warning(f"No features after selection criteria: {dataset_name}, {config.where_clause}")
-            return []
+        # Step 5b: Perform spatial intersection (an empty values selection gives an empty intersect)
+        intersect_output = f"intersect_{dataset_name}_{buffer_name}"
+        intersect_result = arcpy.analysis.Intersect([works_layer, values_layer], intersect_output, "ALL")
+        self.temp_datasets.append(intersect_output)
 
         # Step 6: Extract and return results
         if intersect_result:
-            return self._extract_results_from_intersection(dataset_name, intersect_result, config, theme, buffer_name)
+            yield from self._extract_results_from_intersection(dataset_name, intersect_result, config, theme, buffer_name, values_fc)
         else:
             self.logger.warning(f"No intersections between: {buffer_name}, {dataset_name}")
-            return []
+            return
     
-    def _extract_results_from_intersection(self, dataset_name: str, intersect_result: str, config: DatasetConfig, theme: str, buffer_layer: str) -> List[Dict]:
-        """Extract structured results from intersection output"""
+    def _process_point_dataset(self, dataset_name: str, config: DatasetConfig, theme: str) -> Optional[Dict[str, List[ResultRecord]]]:
+        """Point values by exact distance to the original works, all buffers in one pass
+
+        Returns {buffer name: results} with the same rows buffer + Intersect + Dissolve would produce, or
+        None if the dataset isn't a point dataset or the fast path fails, so the caller falls back.
+        """
+        values_layer_path = self._resolve_values_path(config)
+        if not self._values_exist(values_layer_path) or not self._is_point_dataset(values_layer_path):
+            return None
+        try:
+            values_layer, values_fc = self._get_values_source(values_layer_path)
+            buffers = self._get_dataset_buffers(config)
+            bands = {buffer: self._get_buffer_band(buffer[7:]) for buffer in buffers}
+            max_distance = max(outer for _, outer in bands.values())
+
+            # Works as plain coordinates, read once per run and partitioned like the works layers
+            works = self._get_works_geometry(config.high_risk_only)
+            if not works:
+                return {buffer: [] for buffer in buffers}
+
+            # Point values near the works (in the works' coordinate system), with the configured fields, into a grid hash
+            available_fields = self._get_field_names(values_fc)
+            value_fields = list(dict.fromkeys(f for f in config.fields if f in available_fields))
+            works_sr = arcpy.Describe(self.working_data).spatialReference
+            extent = _grow_extent(_combined_extent(work.extent for work in works), max_distance)
+            with arcpy.da.SearchCursor(values_layer, ['OID@', 'SHAPE@X', 'SHAPE@Y'] + value_fields, config.where_clause,
+                                       spatial_reference=works_sr,
+                                       spatial_filter=arcpy.Extent(*extent, spatial_reference=works_sr).polygon) as cursor:
+                points = [row for row in cursor if row[1] is not None]
+            index = spatial_index.PointGridIndex(points, max_distance)
+
+            # Group as Dissolve would: one row per distinct (works fields + value fields), lowest value OID kept
+            # with its coordinates (the works, and so the points, are in VICGRID2020)
+            groups = {buffer: {} for buffer in buffers}
+            for work in works:
+                for point in index.query(work.extent, max_distance):
+                    distance = work.distance_to(point[1], point[2])
+                    for buffer, (inner, outer) in bands.items():
+                        if distance <= outer and (inner is None or distance > inner):
+                            key = work.attributes + tuple(point[3:])
+                            group = groups[buffer]
+                            if key not in group or point[0] < group[key][0]:
+                                group[key] = point[:3]
+        except Exception as e:
+            self.logger.warning(f"Point fast path failed for {dataset_name}, using buffer overlay: {e}")
+            return None
+
+        self.logger.debug(f"{dataset_name}: {len(points)} points near works, {len(works)} works checked")
+        field_index = {field: i for i, field in enumerate(WORKS_FIELDS + value_fields)}
+        results = {}
+        for buffer, group in groups.items():
+            schema = self._get_dataset_schema(theme, config, buffer)
+            results[buffer] = []
+            for row, (oid, x, y) in sorted(group.items(), key=lambda item: item[1][0]):
+                if not row[0]:
+                    continue
+                result = self._build_result_row(row, field_index, config, schema)
+                result.geometry_ref = (values_fc, oid)
+                result.X, result.Y = int(x), int(y)        # already held, so never re-read by the resolver
+                results[buffer].append(result)
+        return results
+
+    def _process_distance_band(self, dataset_name: str, config: DatasetConfig, buffer_name: str, theme: str,
+                               works_layer, values_layer, values_fc: str) -> Iterator[ResultRecord]:
+        """Values within the outer distance of a work but not wholly inside its inner buffer
+
+        Exactly the values a ring buffer (inner < d <= outer) would intersect: GenerateNearTable finds every
+        work/value pair within the outer distance of the original works, and a COMPLETELY_WITHIN spatial join
+        against the existing inner buffer removes the values that never leave the inner zone. X/Y are those a
+        ring intersect would give: the lowest-OID feature for point values, otherwise the row's pieces inside
+        the works' rings (see _ring_points).
+        """
+        inner_distance, outer_distance = self._get_buffer_band(buffer_name[7:])
+
+        near_table = f"memory\\near_{dataset_name}"
+        arcpy.analysis.GenerateNearTable(works_layer, values_layer, near_table, search_radius=f"{outer_distance} Meters",
+                                         location="NO_LOCATION", angle="NO_ANGLE", closest="ALL", method="PLANAR")
+        pairs = {(work_oid, value_oid) for work_oid, value_oid in arcpy.da.SearchCursor(near_table, ['IN_FID', 'NEAR_FID'])}
+        arcpy.management.Delete(near_table)
+        if not pairs:
+            return
+
+        # Values wholly inside the inner buffer of a work aren't in that work's ring
+        inner_buffer = self._get_inner_buffer(buffer_name[7:])
+        within_table = f"memory\\within_{dataset_name}"
+        arcpy.analysis.SpatialJoin(values_layer, inner_buffer, within_table, "JOIN_ONE_TO_MANY", "KEEP_COMMON",
+                                   arcpy.FieldMappings(), "COMPLETELY_WITHIN")
+        work_of_buffer = dict(arcpy.da.SearchCursor(inner_buffer, ['OID@', 'ORIG_FID']))
+        pairs -= {(work_of_buffer.get(buffer_oid), value_oid)
+                  for value_oid, buffer_oid in arcpy.da.SearchCursor(within_table, ['TARGET_FID', 'JOIN_FID'])}
+        arcpy.management.Delete(within_table)
+
+        # Attributes of the works and values in the remaining pairs
+        works = {row[0]: row[1:] for row in arcpy.da.SearchCursor(self.working_data, ['OID@'] + WORKS_FIELDS)}
+        available_fields = self._get_field_names(values_fc)
+        value_fields = list(dict.fromkeys(f for f in config.fields if f in available_fields))
+        value_oids = sorted({value_oid for _, value_oid in pairs})
+        oid_field = arcpy.Describe(values_fc).OIDFieldName
+        values = {}
+        for start in range(0, len(value_oids), 1000):
+            where_clause = f"{oid_field} IN ({','.join(str(oid) for oid in value_oids[start:start + 1000])})"
+            values.update((row[0], row[1:]) for row in arcpy.da.SearchCursor(values_layer, ['OID@'] + value_fields, where_clause))
+
+        # Group as Dissolve would: one row per distinct (works fields + value fields), lowest value OID kept
+        group = {}
+        for work_oid, value_oid in pairs:
+            if work_oid not in works or value_oid not in values:
+                continue
+            entry = group.setdefault(tuple(works[work_oid]) + tuple(values[value_oid]), [value_oid, []])
+            entry[0] = min(entry[0], value_oid)
+            entry[1].append((work_oid, value_oid))
+
+        ring_points = None
+        if not self._is_point_dataset(values_fc):
+            ring_points = self._ring_points(group, values_layer, oid_field, inner_distance, outer_distance)
+
+        schema = self._get_dataset_schema(theme, config, buffer_name)
+        field_index = {field: i for i, field in enumerate(WORKS_FIELDS + value_fields)}
+        for row, (value_oid, _) in sorted(group.items(), key=lambda item: item[1][0]):
+            if not row[0]:
+                continue
+            result = self._build_result_row(row, field_index, config, schema)
+            result.geometry_ref = (values_fc, value_oid)
+            if ring_points is not None:
+                result.X, result.Y = ring_points[row]
+            yield result
+
+    def _ring_points(self, group: Dict[tuple, list], values_layer, oid_field: str, inner_distance: float,
+                     outer_distance: float) -> Dict[tuple, tuple]:
+        """Row -> X/Y of its values clipped to each work's ring (outer buffer less inner buffer), pieces merged"""
+        works_sr = arcpy.Describe(self.working_data).spatialReference
+        work_oids = {work_oid for _, row_pairs in group.values() for work_oid, _ in row_pairs}
+        value_oids = sorted({value_oid for _, row_pairs in group.values() for _, value_oid in row_pairs})
+        rings = {oid: shape.buffer(outer_distance).difference(shape.buffer(inner_distance))
+                 for oid, shape in arcpy.da.SearchCursor(self.working_data, ['OID@', 'SHAPE@'], spatial_reference=works_sr)
+                 if oid in work_oids}
+        shapes = {}
+        for start in range(0, len(value_oids), 1000):
+            where_clause = f"{oid_field} IN ({','.join(str(oid) for oid in value_oids[start:start + 1000])})"
+            shapes.update(arcpy.da.SearchCursor(values_layer, ['OID@', 'SHAPE@'], where_clause, spatial_reference=works_sr))
+
+        points = {}
+        for row, (_, row_pairs) in group.items():
+            merged = None
+            for work_oid, value_oid in row_pairs:
+                shape = shapes.get(value_oid)
+                if shape is None or work_oid not in rings:
+                    continue
+                dimension = _INTERSECT_DIMENSIONS.get(shape.type)
+                piece = shape.intersect(rings[work_oid], dimension) if dimension else shape
+                merged = piece if merged is None else merged.union(piece)
+            x, y = geometry_metrics.representative_point(merged)
+            points[row] = int(x), int(y)
+        return points
+
+    def _extract_results_from_intersection(self, dataset_name: str, intersect_result: str, config: DatasetConfig, theme: str, buffer_layer: str, values_fc: str) -> Iterator[ResultRecord]:
+        """Extract structured results from intersection output; values_fc is the feature class the values were read from"""
         
         # Prepare and validate fields
         available_fields = [f.name for f in arcpy.ListFields(intersect_result)]   # List all intersecting fields
-        valid_fields = [ID_FIELD, NAME_FIELD, DESCRIPTION_FIELD, DISTRICT_FIELD, RISK_LEVEL_FIELD]   # list standard fields
+        valid_fields = list(WORKS_FIELDS)   # list standard fields
         valid_fields.extend([f for f in config.fields if f in available_fields])  # add values configuration fields that exist in intersection
         
         if len(valid_fields) < 3:  # Need at least DAP_REF_NO, DAP_NAME, DISTRICT
             self.logger.warning(f"Insufficient fields available for {intersect_result}")
-            return []
+            return
         
         # Dissolve features to deal with e.g. multiple intersections with same SMZ
-        dissolve_result = f"dissolve_{dataset_name}"
-        arcpy.analysis.PairwiseDissolve(intersect_result, dissolve_result, dissolve_field=valid_fields, multi_part="MULTI_PART")
-        self._add_geometry_fields(dissolve_result)
-        valid_fields.extend(['X', 'Y'])  # add coordinate fields to list of fields
+        # Named per buffer: records reference their dissolve output until X/Y are resolved, by absolute
+        # path since every run of a batch has a dissolve of the same name in its own workspace
+        dissolve_result = f"dissolve_{dataset_name}_{buffer_layer}"
+        values_fid_field = self._get_values_fid_field(available_fields)
+        if values_fid_field and self._is_point_dataset(values_fc):
+            # Point values: keep the lowest value OID so X/Y can be read straight from the value feature
+            arcpy.analysis.PairwiseDissolve(intersect_result, dissolve_result, dissolve_field=valid_fields,
+                                            statistics_fields=[[values_fid_field, "MIN"]], multi_part="MULTI_PART")
+            valid_fields.append(f"MIN_{values_fid_field}")
+            geometry_source = values_fc
+        else:
+            arcpy.analysis.PairwiseDissolve(intersect_result, dissolve_result, dissolve_field=valid_fields, multi_part="MULTI_PART")
+            valid_fields.append('OID@')
+            geometry_source = _scratch_path(arcpy.env.workspace, dissolve_result)
         self.temp_datasets.append(dissolve_result)
 
-        # Extract data using cursor
-        results = []
+        # One schema is shared by every record from this dataset/buffer
+        schema = self._get_dataset_schema(theme, config, buffer_layer)
+        field_index = {field: i for i, field in enumerate(valid_fields)}
+
+        # Extract data using cursor, handing each result on as it is built
         with arcpy.da.SearchCursor(dissolve_result, valid_fields) as cursor:
             for row in cursor:
                 if not row[0]:  # Skip if no ID_FIELD
                     continue
                 
-                # Build result in desired format
-                result = self._build_result_row(row, valid_fields, config, theme, buffer_layer)
-                
-                # add to output
-                results.append(result)
-
-        return results
+                # Build result in desired format; X/Y are resolved later from the referenced feature
+                result = self._build_result_row(row, field_index, config, schema)
+                result.geometry_ref = (geometry_source, row[-1])
+                yield result
     
-    def _build_result_row(self, row: tuple, valid_fields: List[str], config: DatasetConfig, theme: str, buffer_layer: str) -> Dict:
+    def _build_result_row(self, row: tuple, field_index: Dict[str, int], config: DatasetConfig, schema: DatasetSchema) -> ResultRecord:
         """Build the base result structure common to all themes"""
-        result = {
-            # Standard fields for all values datasets - from works feature class
-            'UNIQUE_ID':   row[valid_fields.index(f'{ID_FIELD}')],
-            'DISTRICT':    row[valid_fields.index(f'{DISTRICT_FIELD}')],
-            'NAME':        row[valid_fields.index(f'{NAME_FIELD}')],
-            'DESCRIPTION': row[valid_fields.index(f'{DESCRIPTION_FIELD}')],
-            'RISK_LVL':    row[valid_fields.index(f'{RISK_LEVEL_FIELD}')],
-
-            # Details of values - from overlapping values feature class
-            'Theme': theme,
-            'Value_Type': config.value_type,
-            'Buffer': buffer_layer[7:], # Shorten buffer string, removing "buffer_" prefix,
-            'Value': None,
-            'Value_Description': None,
-            'Value_ID': None,
-            'X': int(row[valid_fields.index('X')] or 0),
-            'Y': int(row[valid_fields.index('Y')] or 0),
-            'QBID': None,
-            'QBID_Alt': None,
-            'DATE_CHECKED': self.start_date
-            # Any remaining fields specified by 'fields' in values dataset configuration will be appended here
-        }
         
         # Update value field data from value field or fields
+        value = None
         if isinstance(config.value_field, str): 
             # single value field; return single value to 'Value' field
-            result['Value'] = row[valid_fields.index(config.value_field)]
+            value = row[field_index[config.value_field]]
         elif isinstance(config.value_field, list): 
             # multiple value fields; concatenate into 'Value' field with ', ' separator
-            vf_values = []
-            for vf in config.value_field:
-                vf_values.append(row[valid_fields.index(vf)])
-            vf_string = ", ".join(str(item) for item in vf_values)
-            result['Value'] = vf_string
+            value = ", ".join(str(row[field_index[vf]]) for vf in config.value_field)
 
-        # Update Value_ID field data from specified field, if specified
-        if config.id_field:
-            result['Value_ID'] = row[valid_fields.index(config.id_field)]
-        
-        # Update Value_Description field data from specified field, if specified
-        if config.description_field:
-            result['Value_Description'] = row[valid_fields.index(config.description_field)]
-        
-        # Add any aditional fields specified in dataset configuration
-        for fieldname in config.fields:
-            if fieldname not in result: 
-                if fieldname not in filter(None, [config.value_field, config.id_field, config.description_field]):
-                    result[fieldname] = row[valid_fields.index(fieldname)] or 'Field not found'
+        result = ResultRecord(
+            schema,
+            # Any remaining fields specified by 'fields' in values dataset configuration, in schema order
+            extras=tuple(row[field_index[fieldname]] or 'Field not found' for fieldname in schema.extra_fields),
 
-        # calculate quickbase id code
-        result['QBID_Test'] = self._build_quickbase_id(result, theme)
+            # Standard fields for all values datasets - from works feature class
+            UNIQUE_ID=row[field_index[ID_FIELD]],
+            DISTRICT=row[field_index[DISTRICT_FIELD]],
+            NAME=row[field_index[NAME_FIELD]],
+            DESCRIPTION=row[field_index[DESCRIPTION_FIELD]],
+            RISK_LVL=row[field_index[RISK_LEVEL_FIELD]],
 
-        # alternative QBID
-        qbid_fields = ["UNIQUE_ID", "Value_Type", "Value", "Value_ID", "X", "Y"]
-        qbid_string = "|".join(str(result[item]) for item in qbid_fields if result[item] not in [None, "", 0])
-        result['QBID_Alt'] = qbid_string
+            # Details of values - from overlapping values feature class (Theme, Value_Type, Buffer held on schema)
+            Value=value,
+            Value_Description=row[field_index[config.description_field]] if config.description_field else None,
+            Value_ID=row[field_index[config.id_field]] if config.id_field else None,
+        )
+        # X/Y, QBID, QBID_Test and QBID_Alt are filled per batch by the QBID engine
         
         return result
     
@@ -378,103 +733,160 @@ class ValuesChecker:
     # Phase 3: Mitigation Application Methods
     # ========================================================================
     
-    def _apply_all_mitigations(self, all_results: Dict) -> Dict:
+    def _apply_all_mitigations(self, all_results: Dict, mode: str) -> Dict:
         """Apply appropriate mitigations to all theme results"""
         mitigated_results = {}
         
         for theme, theme_results in all_results.items():
             self.logger.info(f"Applying mitigations for {theme} theme...")
-            mitigated_results[theme] = []
-            
-            for result in theme_results:
-                # mitigation = self._determine_mitigation(theme, result)
-                if theme == "forests":
-                    # return self._get_forest_mitigation(result)
-                    """Get forest-specific mitigation"""
-                    value_type = result.get('Value_Type', '')
-                    mitigation = FOREST_MITIGATIONS.get(value_type, "Standard work practices apply")
-                elif theme == "heritage":
-                    # return self._get_heritage_mitigation(result)
-                    risk_level = result.get('RISK_LVL', 'DAP')
-                    sites_exist = 'Yes' if result.get('ACHRIS_ID') else 'No'
-                    sensitivity = result.get('CH_SENS', 'No')
-                    
-                    matrix_key = (risk_level, sites_exist, sensitivity)
-                    mitigation = HERITAGE_MITIGATIONS.get(matrix_key, "Heritage assessment required")
-                elif theme == "summary":
-                    # return self._get_native_title_mitigation(result)
-                    nt_status = result.get('NT_STATUS', '')
-                    risk_level = result.get('RISK_LVL', 'DAP')
-                    
-                    if 'EXTINGUISHED' in nt_status:
-                        mitigation = NATIVE_TITLE_MATRIX['NT_EXTINGUISHED']
-                    elif risk_level == 'LRLI':
-                        mitigation = NATIVE_TITLE_MATRIX['LOW_IMPACT']
-                    else:
-                        mitigation = NATIVE_TITLE_MATRIX['CONSULT']
-                elif theme == "biodiversity":
-                    mitigation = "Refer to NEP team. Standard biodiversity protection measures apply"
-                elif theme == "water":
-                    mitigation = "Ensure works comply with waterway protection requirements"
-                else:
-                    mitigation = "Standard work practices apply"
-                
-                result['mitigation'] = mitigation
-                mitigated_results[theme].append(result)
+            mitigated_results[theme] = self._apply_theme_mitigations(theme, theme_results, mode)
+
+            keep = self.settings.dedupe_keep.get(theme)
+            if keep:
+                mitigated_results[theme] = dedupe_records(mitigated_results[theme], keep)
         
         return mitigated_results
 
+    def _apply_theme_mitigations(self, theme: str, theme_results: Iterable[ResultRecord], mode: str,
+                                 keep_sites: bool = True) -> List[ResultRecord]:
+        """Apply mitigations to a batch of results from a single theme (all of it, for WHOLE_THEME_RULE_THEMES)
+
+        keep_sites keeps the heritage site index for the works detail report; interactive checks pass False
+        so they don't replace the run's index with their own works.
+        """
+        records = list(theme_results)
+        sites = None
+        if theme == 'heritage':
+            sites = HeritageSiteIndex(records)
+            if keep_sites:
+                self.heritage_sites[mode] = sites
+        records = apply_mitigations(self.mitigation_index, mode, theme, records, sites)
+        if theme == 'biodiversity':
+            register = self._get_risk_register(mode)
+            if register is not None:
+                register.join(records)
+        return records
+
+    def _get_risk_register(self, mode: str) -> Optional[RiskRegister]:
+        """The mode's risk register (MR_Code index), loaded once per shared cache"""
+        if not self.settings.risk_registers:
+            return None
+        key, fields = MODE_REGISTERS[mode]
+        path = self.settings.risk_registers.get(key)
+        if not path:
+            return None
+        register = self.shared.risk_registers.get(path)
+        if register is None:
+            register = RiskRegister(path, fields, self.settings.workspace / "risk_registers", self.shared.register_rewriter,
+                                    **_register_options(key))
+            self.shared.risk_registers[path] = register
+            self.logger.info(f"Loaded {len(register.rows)} MR_Codes from {path}")
+        return register
+
+    @staticmethod
+    def _get_mitigation(theme: str, result: ResultRecord, sites: Optional['HeritageSiteIndex'] = None) -> str:
+        """Mitigation text for a single result of a theme decided by row rules (ROW_RULE_THEMES)"""
+        if theme == "heritage":
+            sites = sites or HeritageSiteIndex([result])
+            risk_level = _heritage_risk_level(result.get('RISK_LVL'))
+            unique_id = result.get('UNIQUE_ID')
+
+            matrix_key = (risk_level, sites.sites_exist(unique_id), sites.sensitivity(unique_id))
+            return HERITAGE_MITIGATIONS.get(matrix_key, "Heritage assessment required")
+        elif theme == "summary":
+            nt_status = result.get('NT_STATUS', '')
+            risk_level = result.get('RISK_LVL', 'DAP')
+            
+            if 'EXTINGUISHED' in nt_status:
+                return NATIVE_TITLE_MATRIX['NT_EXTINGUISHED']
+            elif risk_level == 'LRLI':
+                return NATIVE_TITLE_MATRIX['LOW_IMPACT']
+            else:
+                return NATIVE_TITLE_MATRIX['CONSULT']
+        raise ValueError(f"No row rules for the {theme} theme; its mitigations come from the mitigation index")
+
     
     # ========================================================================
     # Phase 4: Output Generation Methods
     # ========================================================================
     
-    def _generate_all_outputs(self, mitigated_results: Dict, working_data: str) -> List[str]:
-        """Generate all output files"""
+    def _generate_all_outputs(self, mitigated_results: Dict, working_data: str, mode: str) -> List[str]:
+        """Generate all output files for one mode"""
         outputs = []
         
         # Generate CSV reports for each theme that has results
         for theme, theme_results in mitigated_results.items():
+            self._collect_summary(theme, theme_results, mode)
             if theme_results:
-                csv_file = self._create_theme_csv_report(theme, theme_results)
+                csv_file = self._create_theme_csv_report(theme, theme_results, mode)
                 outputs.append(csv_file)
         
+        outputs.extend(self._generate_works_outputs(working_data, mode))
+        
+        return outputs
+
+    def _generate_works_outputs(self, working_data: str, mode: str) -> List[str]:
+        """Generate outputs describing the works themselves"""
+        outputs = []
+
         # Generate works detail report
-        works_csv = self._create_works_detail_report(working_data)
+        works_csv = self._create_works_detail_report(working_data, mode)
         outputs.append(works_csv)
 
+        # Generate works summary table (summary theme values flattened per work)
+        if 'summary' in self.settings.themes:
+            outputs.append(self._create_works_summary_report(working_data, mode))
+
         # Generate QuickBase reports
         
         # Generate output shapefile
-        shapefile = self._create_output_shapefile(working_data)
+        shapefile = self._create_output_shapefile(working_data, mode)
         outputs.append(shapefile)
-        
+
         return outputs
     
-    def _create_theme_csv_report(self, theme: str, results: List[Dict]) -> str:
+    def _create_theme_csv_report(self, theme: str, results: List[ResultRecord], mode: str) -> str:
         """Create CSV report for a specific theme"""
-        df = pd.DataFrame(results)
+        df = _records_to_frame(results, self._get_theme_columns(theme, mode))
         
-        filename = f"{self.start_date}_{self.settings.mode}_{theme}_values.csv"
-        filepath = self.settings.workspace / filename
+        filepath = self._get_theme_csv_path(theme, mode)
         
         df.to_csv(filepath, index=False)
         self.logger.info(f"Created {theme} report: {filepath}")
         
         return str(filepath)
     
-    def _create_works_detail_report(self, working_data: str) -> str:
+    def _get_theme_csv_path(self, theme: str, mode: str) -> Path:
+        """Path of the CSV report for a specific theme and mode"""
+        filename = f"{self.start_date}_{mode}_{theme}_values.csv"
+        return self.settings.workspace / filename
+
+    def _get_theme_columns(self, theme: str, mode: str) -> List[str]:
+        """Fixed column order for a theme's CSV report, so batches can be appended without reshaping"""
+        columns = list(RESULT_FIELDS)
+        for config in DATASET_MATRIX.get(theme, {}).values():
+            config = DatasetConfig(**config)
+            if self._is_dataset_enabled_for_mode(config, mode):
+                columns.extend(f for f in self._get_extra_fields(config) if f not in columns)
+        columns.extend(DERIVED_FIELDS)
+        return columns
+    
+    def _create_works_detail_report(self, working_data: str, mode: str) -> str:
         """Create detailed CSV report of all works"""
         works_data = []
         fields = [ID_FIELD, NAME_FIELD, DESCRIPTION_FIELD, RISK_LEVEL_FIELD, DISTRICT_FIELD, "AREA_HA", "X", "Y"]
         
+        sites = self.heritage_sites.get(mode)
         with arcpy.da.SearchCursor(working_data, fields) as cursor:
             for row in cursor:
                 works_data.append(dict(zip(fields, row)))
+                if sites is not None:
+                    works_data[-1]['SITES_EXIST'] = sites.sites_exist(row[0])
+                    works_data[-1]['CH_SENS'] = sites.sensitivity(row[0])
         
         df = pd.DataFrame(works_data)
         
-        filename = f"{self.start_date}_{self.settings.mode}_works_detail.csv"
+        filename = f"{self.start_date}_{mode}_works_detail.csv"
         filepath = self.settings.workspace / filename
         
         df.to_csv(filepath, index=False)
@@ -482,9 +894,30 @@ class ValuesChecker:
         
         return str(filepath)
     
-    def _create_output_shapefile(self, working_data: str) -> str:
+    def _collect_summary(self, theme: str, records: List[ResultRecord], mode: str):
+        """Group summary theme results by work for the works summary table"""
+        if theme == 'summary':
+            self.summary_tables.setdefault(mode, SummaryFlattener()).add(records)
+
+    def _create_works_summary_report(self, working_data: str, mode: str) -> str:
+        """Create CSV summary table with one row per work, written in one go"""
+        flattener = self.summary_tables.get(mode) or SummaryFlattener()
+        with arcpy.da.SearchCursor(working_data, WORKS_FIELDS) as cursor:
+            rows = flattener.rows(cursor)
+
+        df = pd.DataFrame(rows, columns=WORKS_FIELDS + list(flattener.columns))
+
+        filename = f"{self.start_date}_{mode}_works_summary.csv"
+        filepath = self.settings.workspace / filename
+
+        df.to_csv(filepath, index=False)
+        self.logger.info(f"Created works summary table: {filepath} ({len(flattener.values)} works with summary values)")
+
+        return str(filepath)
+
+    def _create_output_shapefile(self, working_data: str, mode: str) -> str:
         """Create output shapefile of processed works"""
-        filename = f"{self.start_date}_{self.settings.mode}_works"
+        filename = f"{self.start_date}_{mode}_works"
         filepath = self.settings.workspace / f"{filename}.shp"
         
         arcpy.conversion.FeatureClassToFeatureClass(
@@ -494,31 +927,202 @@ class ValuesChecker:
         self.logger.info(f"Created output shapefile: {filepath}")
         return str(filepath)
     
+    # ========================================================================
+    # Interactive Checks (warm in-memory indexes)
+    # ========================================================================
+
+    def check_geometry(self, geometry, attrs: Union[Dict, List[Dict], None] = None, mode: Optional[str] = None,
+                       themes: Optional[List[str]] = None, spatial_reference=None) -> Dict[str, List[Dict]]:
+        """Check one or a few works in memory: detection -> mitigation -> QBID, returning {theme: [result dict]}
+
+        geometry is an arcpy geometry or a GeoJSON geometry dict, or a list of them; attrs holds the works
+        fields (DAP_REF_NO, DAP_NAME, ...) as a dict per work. GeoJSON coordinates are read in
+        spatial_reference (default: the index's, VICGRID2020). Runs against values_index (built on first
+        use) and creates no scratch feature classes and does no GDB I/O once the index is warm.
+
+            checker = ValuesChecker(settings)
+            results = checker.check_geometry(polygon, {'DAP_REF_NO': 'GP-TAM-001', 'RISK_LVL': 'DAP'}, mode='DAP')
+        """
+        if self.values_index is None:
+            self.build_values_index()
+        mode = mode or self.settings.mode
+        if mode not in self.qbid_engines:
+            raise ValueError(f"Mode {mode} is not one of this checker's modes ({', '.join(self.settings.modes)})")
+        works = self._as_works(geometry, attrs, spatial_reference)
+        results = self._check_indexed(works, mode, themes or self.settings.themes)
+        return {theme: records_to_dicts(records) for theme, records in results.items()}
+
+    def build_values_index(self, spatial_reference=None) -> ValuesIndex:
+        """Load every values source used by the run's modes and themes into a warm in-memory index, and their risk registers"""
+        index = ValuesIndex(spatial_reference or arcpy.SpatialReference(geometry_metrics.PROJECTED_WKID))
+        indexed_sources = {}
+        for theme in self.settings.themes:
+            for dataset_name, config in DATASET_MATRIX.get(theme, {}).items():
+                config = DatasetConfig(**config)
+                if not self._get_enabled_modes(config):
+                    continue
+                values_layer_path = self._resolve_values_path(config)
+                if not self._values_exist(values_layer_path):
+                    self.logger.warning(f"Dataset not found, not indexed: {values_layer_path}")
+                    continue
+                try:
+                    index.add(values_layer_path, config.where_clause, config.fields)
+                    indexed_sources[(theme, dataset_name)] = (values_layer_path, config.where_clause)
+                except Exception as e:
+                    self.logger.warning(f"Failed to index {dataset_name}: {e}")
+        if 'biodiversity' in self.settings.themes:
+            for mode in self.settings.modes:
+                self._get_risk_register(mode)      # loaded here, not on the first check_geometry call
+        self.values_index = index
+        self._indexed_sources = indexed_sources
+        return index
+
+    def _as_works(self, geometry, attrs, spatial_reference) -> List[tuple]:
+        """(arcpy geometry in the index's coordinate system, WORKS_FIELDS values) per work"""
+        geometries = geometry if isinstance(geometry, (list, tuple)) else [geometry]
+        attrs = attrs if isinstance(attrs, (list, tuple)) else [attrs] * len(geometries)
+        if len(attrs) != len(geometries):
+            raise ValueError(f"{len(geometries)} geometries but {len(attrs)} attribute sets")
+
+        index_sr = self.values_index.spatial_reference
+        input_sr = spatial_reference if spatial_reference is not None else index_sr
+        if isinstance(input_sr, int):
+            input_sr = arcpy.SpatialReference(input_sr)
+        works = []
+        for number, (shape, work_attrs) in enumerate(zip(geometries, attrs), start=1):
+            if isinstance(shape, dict):
+                shape = arcpy.FromWKT(arcpy.AsShape(shape).WKT, input_sr)
+            if shape.spatialReference and shape.spatialReference.factoryCode != index_sr.factoryCode:
+                shape = shape.projectAs(index_sr)
+            attributes = tuple((work_attrs or {}).get(field) for field in WORKS_FIELDS)
+            if not attributes[0]:
+                attributes = (f"CHECK-{number}",) + attributes[1:]    # results are only kept for works with an ID
+            works.append((shape, attributes))
+        return works
+
+    def _check_indexed(self, works: List[tuple], mode: str, themes: List[str]) -> Dict[str, List[ResultRecord]]:
+        """Detection, mitigation and QBIDs for (arcpy geometry, WORKS_FIELDS values) works against values_index"""
+        engine = self.qbid_engines[mode]
+        engine.index = QbidIndex()      # collisions are reported per check, and the index doesn't grow without bound
+        risk_index = WORKS_FIELDS.index(RISK_LEVEL_FIELD)
+        results = {}
+        for theme in themes:
+            records = []
+            for dataset_name, config in DATASET_MATRIX.get(theme, {}).items():
+                config = DatasetConfig(**config)
+                if not self._is_dataset_enabled_for_mode(config, mode):
+                    continue
+                # source keys were resolved when the index was built, so no replica/Exists lookups here
+                source_key = self._indexed_sources.get((theme, dataset_name))
+                source_index = self.values_index.get(*source_key) if source_key else None
+                if source_index is None:
+                    continue
+                for shape, attributes in works:
+                    if config.high_risk_only and attributes[risk_index] == 'LRLI':
+                        continue
+                    records.extend(self._check_work_indexed(theme, dataset_name, config, mode, shape, attributes, source_index))
+
+            engine.build_batch(records)
+            records = self._apply_theme_mitigations(theme, records, mode, keep_sites=False)
+            keep = self.settings.dedupe_keep.get(theme)
+            if keep:
+                records = dedupe_records(records, keep)
+            results[theme] = list(engine.build_alt(records))
+        return results
+
+    def _check_work_indexed(self, theme: str, dataset_name: str, config: DatasetConfig, mode: str, shape,
+                            attributes: tuple, source_index) -> List[ResultRecord]:
+        """One work against one indexed dataset, every buffer of the mode; same rows as buffer + Intersect + Dissolve"""
+        buffers = self._get_buffer_list(config, mode)
+        bands = {buffer: self._get_buffer_band(buffer[7:]) for buffer in buffers}
+        max_distance = max(outer for _, outer in bands.values())
+        zones = {}      # distance, or (inner, outer) for a ring -> buffer polygon of the work, made on first use
+
+        def zone(distance: float):
+            if distance not in zones:
+                zones[distance] = shape.buffer(distance)
+            return zones[distance]
+
+        def ring(inner: float, outer: float):
+            if (inner, outer) not in zones:
+                zones[(inner, outer)] = zone(outer).difference(zone(inner))
+            return zones[(inner, outer)]
+
+        value_fields = [field for field in dict.fromkeys(config.fields) if field in source_index.field_index]
+        positions = [source_index.field_index[field] for field in value_fields]
+
+        # Group as Dissolve would: one row per distinct (works fields + value fields), lowest value OID kept
+        # and the pieces merged. X/Y follow _extract_results_from_intersection: the lowest-OID value feature
+        # itself for point values, otherwise the merged (dissolved) pieces
+        groups = {buffer: {} for buffer in buffers}
+        for feature, distance in source_index.near(shape, max_distance):
+            key = attributes + tuple(feature.attributes[i] for i in positions)
+            for buffer, (inner, outer) in bands.items():
+                if distance > outer:
+                    continue
+                dimension = _INTERSECT_DIMENSIONS.get(feature.shape.type)
+                if inner is None:
+                    piece = feature.shape.intersect(zone(outer), dimension) if dimension else feature.shape
+                elif distance <= inner and feature.shape.within(zone(inner)):
+                    continue        # wholly inside the inner buffer, so not in the ring
+                else:
+                    # the part inside the ring, as the batch band path and a ring buffer intersect give it
+                    piece = feature.shape.intersect(ring(inner, outer), dimension) if dimension else feature.shape
+                group = groups[buffer].get(key)
+                if group is None:
+                    groups[buffer][key] = [feature.oid, piece, feature.shape]
+                else:
+                    if feature.oid < group[0]:
+                        group[0], group[2] = feature.oid, feature.shape
+                    group[1] = group[1].union(piece)
+
+        field_index = {field: i for i, field in enumerate(WORKS_FIELDS + value_fields)}
+        results = []
+        for buffer, group in groups.items():
+            schema_key = (theme, dataset_name, buffer, mode)
+            schema = self._indexed_schemas.get(schema_key)
+            if schema is None:
+                schema = self._indexed_schemas[schema_key] = DatasetSchema(
+                    theme, config.value_type, buffer[7:], self.start_date, self._get_extra_fields(config),
+                    self.dictionaries, frozenset([mode]))
+            for row, (oid, piece, lowest) in sorted(group.items(), key=lambda item: item[1][0]):
+                if not row[0]:
+                    continue
+                result = self._build_result_row(row, field_index, config, schema)
+                x, y = geometry_metrics.representative_point(lowest if lowest.type == 'point' else piece)
+                result.X, result.Y = int(x), int(y)
+                results.append(result)
+        return results
+
     # ========================================================================
     # Utility and Helper Methods
     # ========================================================================
     
-    def _build_quickbase_id(self, rowdata:dict, theme:str) -> str:
-        try:        
-            qbid_fields = QBID_MATRIX[MODE][theme]
-            qbid_string = "|".join(str(rowdata[item]) for item in qbid_fields if rowdata[item] not in [None, "", 0])
-            
-            return qbid_string
-        
-        except Exception as e:
-            a=1
-            # self.logger.warning(f"Failed to generate QBID: {e}")
-        
-        try:
-            qbid_fields = ["UNIQUE_ID", "Value_Type", "Value", "Value_ID"]
-            qbid_string = "|".join(str(rowdata[item]) for item in qbid_fields if rowdata[item] not in [None, "", 0])
+    def _report_qbid_collisions(self) -> Dict:
+        """Log QBIDs issued more than once this run; returns the number of colliding QBIDs per theme"""
+        summaries = {}
+        for mode, engine in self.qbid_engines.items():
+            summaries[mode] = engine.index.summary()
+            for theme, count in summaries[mode].items():
+                self.logger.warning(f"{count} duplicate QBIDs in {mode} {theme} theme")
+            for (theme, qbid), times in list(engine.index.collisions.items())[:20]:
+                self.logger.debug(f"Duplicate QBID ({mode} {theme}, issued {times} times): {qbid}")
+        return self._by_mode(summaries)
 
-            return qbid_string
-        
-        except Exception as e:
-            # self.logger.warning(f"Failed to generate QBID: {e}")
-            
-            return rowdata['UNIQUE_ID']
+    def _by_mode(self, per_mode: Dict[str, Dict]) -> Dict:
+        """Per-mode results as returned to callers: flat for a single-mode run, keyed by mode otherwise"""
+        return per_mode[self.settings.mode] if len(self.settings.modes) == 1 else per_mode
+
+    def _split_by_mode(self, records: List[ResultRecord]) -> Dict[str, List[ResultRecord]]:
+        """Records per mode; a record reported under several modes is copied so each mode gets its own QBIDs"""
+        by_mode = {mode: [] for mode in self.settings.modes}
+        for record in records:
+            first = True
+            for mode in self.settings.modes:
+                if record.schema.modes is None or mode in record.schema.modes:
+                    by_mode[mode].append(record if first else record.copy())
+                    first = False
+        return {mode: mode_records for mode, mode_records in by_mode.items() if mode_records}
 
     def _setup_arcpy_environment(self):
         """Configure ArcPy environment settings"""
@@ -533,6 +1137,18 @@ class ValuesChecker:
     
     def _add_geometry_fields(self, feature_class: str):
         """Add and calculate geometry fields for the feature class based on geometry type"""
+        if geometry_metrics.METRICS_AVAILABLE:
+            try:
+                # Bulk read, vectorised geodesic maths and a single ExtendTable write-back
+                geometry_metrics.add_geometry_fields(feature_class)
+                return
+            except Exception as e:
+                self.logger.warning(f"Batched geometry fields failed for {feature_class}, using cursor: {e}")
+
+        self._add_geometry_fields_by_cursor(feature_class)
+
+    def _add_geometry_fields_by_cursor(self, feature_class: str):
+        """Row-by-row geometry fields, used when NumPy/pyproj aren't available"""
         try:
             # Add coordinate fields to all feature classes
             arcpy.management.AddField(feature_class, "X", "DOUBLE")
@@ -560,8 +1176,8 @@ class ValuesChecker:
                     for row in cursor:
                         if row[3]:  # Check if geometry exists
                             centroid = row[3].centroid
-                            # row[0] = int(centroid.X) if centroid.X else 0  # Easting
-                            # row[1] = int(centroid.Y) if centroid.Y else 0  # Northing
+                            row[0] = int(centroid.X) if centroid.X else 0  # Easting
+                            row[1] = int(centroid.Y) if centroid.Y else 0  # Northing
                             row[2] = row[3].getArea('GEODESIC', 'HECTARES')  # Area in hectares
                         else:
                             row[0] = row[1] = row[2] = 0
@@ -591,6 +1207,16 @@ class ValuesChecker:
         except Exception as e:
             self.logger.warning(f"Could not add geometry fields: {e}")
 
+    @staticmethod
+    def _get_extra_fields(config: DatasetConfig) -> List[str]:
+        """Dataset fields carried through to results in addition to the standard result fields"""
+        mapped_fields = list(filter(None, [config.value_field, config.id_field, config.description_field]))
+        extra_fields = []
+        for fieldname in config.fields:
+            if fieldname not in RESULT_FIELDS and fieldname not in mapped_fields and fieldname not in extra_fields:
+                extra_fields.append(fieldname)
+        return extra_fields
+
     def _get_field_index(self, field_list: List[str], field_name: str) -> Optional[int]:
         """Get the index of a field in the field list"""
         try:
@@ -598,18 +1224,35 @@ class ValuesChecker:
         except ValueError:
             return None
     
-    def _is_dataset_enabled_for_mode(self, config: Dict) -> bool:
-        """Check if a dataset is enabled for the current mode"""
+    def _is_dataset_enabled_for_mode(self, config: Dict, mode: Optional[str] = None) -> bool:
+        """Check if a dataset is enabled for a mode (the primary mode by default)"""
 
         # If no enabled_modes specified, assume enabled for all modes
         if not config.modes:
             return True
         
-        # Check if current mode is in the enabled modes list
-        return self.settings.mode in config.modes
+        # Check if the mode is in the enabled modes list
+        return (mode or self.settings.mode) in config.modes
+
+    def _get_enabled_modes(self, config: DatasetConfig) -> List[str]:
+        """Modes of this run the dataset is enabled for"""
+        return [mode for mode in self.settings.modes if self._is_dataset_enabled_for_mode(config, mode)]
 
-    def _get_buffer_list(self, config:Dict) -> list:
-        """Determine buffer distance or distances for given mode and dataset"""
+    def _get_dataset_buffers(self, config: DatasetConfig) -> List[str]:
+        """Union of the buffers a dataset needs across the run's modes, each checked once"""
+        buffers = set()
+        for mode in self._get_enabled_modes(config):
+            buffers.update(self._get_buffer_list(config, mode))
+        return sorted(buffers)
+
+    def _get_dataset_schema(self, theme: str, config: DatasetConfig, buffer_name: str) -> DatasetSchema:
+        """Schema for one dataset/buffer, tagged with the modes that report this buffer"""
+        modes = frozenset(mode for mode in self._get_enabled_modes(config) if buffer_name in self._get_buffer_list(config, mode))
+        return DatasetSchema(theme, config.value_type, buffer_name[7:], self.start_date,
+                             self._get_extra_fields(config), self.dictionaries, modes)
+
+    def _get_buffer_list(self, config:Dict, mode: Optional[str] = None) -> list:
+        """Determine buffer distance or distances for given mode (the primary mode by default) and dataset"""
         
         # If buffer is a string, return as-is regardless of mode
         if isinstance(config.buffer, str):
@@ -617,31 +1260,186 @@ class ValuesChecker:
         
         # If buffer is a dict, get mode-specific value or values
         if isinstance(config.buffer, dict):
-            return ['buffer_' + value for value in config.buffer[self.settings.mode]]
+            buffers = config.buffer[mode or self.settings.mode]
+            if isinstance(buffers, str):
+                buffers = [buffers]
+            return ['buffer_' + value for value in sorted(buffers)]
         
+    def _partition_by_risk(self, layer: str):
+        """Split a works or buffer layer once into all works and non-LRLI works, recording both counts
+
+        The non-LRLI partition is a definition-query layer, so OIDs still match the layer it came from.
+        """
+        high_risk_layer = f"{layer}_hr"
+        if arcpy.Exists(high_risk_layer):
+            arcpy.management.Delete(high_risk_layer)
+        arcpy.management.MakeFeatureLayer(layer, high_risk_layer, f"{RISK_LEVEL_FIELD} <> 'LRLI'")
+        self.works_partitions[layer] = {
+            False: (layer, int(arcpy.management.GetCount(layer)[0])),
+            True: (high_risk_layer, int(arcpy.management.GetCount(high_risk_layer)[0])),
+        }
+        extent = arcpy.Describe(layer).extent
+        self.works_extents[layer] = (extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+
+    def _get_buffer_band(self, buffer_name: str) -> tuple:
+        """(inner, outer) distance in metres a buffer covers around the works; inner is None for full buffers"""
+        config = BUFFERS[buffer_name]
+        outer = _distance_in_metres(config['buffer_distance'])
+        inner = _distance_in_metres(config['inner_distance']) if config['buffer_type'] == "RING" else None
+        return inner, outer
+
+    def _get_inner_buffer(self, buffer_name: str) -> str:
+        """The full buffer layer whose distance is a ring's inner distance"""
+        inner, _ = self._get_buffer_band(buffer_name)
+        for name, config in BUFFERS.items():
+            if config['buffer_type'] == "FULL" and _distance_in_metres(config['buffer_distance']) == inner:
+                return f"buffer_{name}"
+        raise ValueError(f"No full buffer of {inner} m for the inner edge of {buffer_name}")
+
+    def _get_works_geometry(self, high_risk_only: bool = False) -> List[spatial_index.WorkGeometry]:
+        """Works features as coordinate lists (all, or non-LRLI), read on first use"""
+        if self._works_geometry is None:
+            works = spatial_index.read_works(self.working_data, WORKS_FIELDS, curve_tolerance=self.settings.curve_tolerance)
+            risk_index = WORKS_FIELDS.index(RISK_LEVEL_FIELD)
+            self._works_geometry = {False: works, True: [work for work in works if work.attributes[risk_index] != 'LRLI']}
+        return self._works_geometry[high_risk_only]
+
+    def _resolve_values_path(self, config: DatasetConfig) -> str:
+        """Path of a dataset's values layer: the local replica if there is one, otherwise the source"""
+        values_layer_path = config.path.format(**DATA_PATHS)
+        if self.replicas:
+            values_layer_path = self.replicas.path(values_layer_path)
+        return values_layer_path
+
+    def _refresh_replicas(self):
+        """Refresh any local replica that is missing or past its refresh interval (once per shared cache)"""
+        if not self.replicas or self.shared.replicas_refreshed:
+            return
+        self.shared.replicas_refreshed = True
+        sources = {}
+        for theme in self.settings.themes:
+            for config in DATASET_MATRIX.get(theme, {}).values():
+                config = DatasetConfig(**config)
+                if self._get_enabled_modes(config):
+                    source = config.path.format(**DATA_PATHS)
+                    index_fields = sources.setdefault(source, set())
+                    index_fields.update(f for f in (config.id_field, config.value_field) if isinstance(f, str))
+        self.replicas.index_fields = {source: sorted(fields) for source, fields in sources.items()}
+        due = [source for source in sources if self.replicas.due(source) and arcpy.Exists(source)]
+        if due:
+            self.logger.info(f"Refreshing {len(due)} local replicas...")
+            self.replicas.refresh_due(due)
+
+    def _get_values_source(self, values_layer_path: str) -> tuple:
+        """(layer to intersect, feature class behind it): the cached tiles near the works, else the source itself"""
+        if self.tile_cache and self.works_extent:
+            layer = self.tile_cache.layer_for(values_layer_path, self.works_extent)
+            if layer:
+                return layer, self.tile_cache.local_path(values_layer_path)
+            self.logger.debug(f"No current tile cache for {values_layer_path}, reading source")
+        return values_layer_path, values_layer_path
+
+    def _select_values(self, values_layer, values_fc: str, where_clause: str):
+        """Values layer limited to a dataset's where clause
+
+        Tile layers are made per run for the works extent and are selected in place; layers over a whole
+        source are made once per shared cache and reused for every buffer and every input of a batch.
+        """
+        if values_layer != values_fc:
+            return arcpy.management.SelectLayerByAttribute(values_layer, "NEW_SELECTION", where_clause)
+        key = (values_fc, where_clause)
+        layer = self.shared.selection_layers.get(key)
+        if layer is None:
+            layer = f"values_selection_{len(self.shared.selection_layers)}"
+            arcpy.management.MakeFeatureLayer(values_fc, layer, where_clause)
+            self.shared.selection_layers[key] = layer
+        return layer
+
+    def _values_exist(self, values_layer_path: str) -> bool:
+        """arcpy.Exists for a values source, remembered once true"""
+        if values_layer_path in self.shared.existing:
+            return True
+        if arcpy.Exists(values_layer_path):
+            self.shared.existing.add(values_layer_path)
+            return True
+        return False
+
+    def _get_field_names(self, dataset_path: str) -> set:
+        """Field names of a values source, listed once per shared cache"""
+        names = self.shared.field_names.get(dataset_path)
+        if names is None:
+            names = self.shared.field_names[dataset_path] = {f.name for f in arcpy.ListFields(dataset_path)}
+        return names
+
+    def _get_shape_type(self, dataset_path: str) -> str:
+        """Shape type of a values source, described once per shared cache ('' if it can't be described)"""
+        shape_type = self.shared.shape_types.get(dataset_path)
+        if shape_type is None:
+            try:
+                shape_type = arcpy.Describe(dataset_path).shapeType
+            except:
+                shape_type = ''
+            self.shared.shape_types[dataset_path] = shape_type
+        return shape_type
+
+    def _stats_key(self, theme: str, dataset_name: str) -> str:
+        return RunStatistics.key(self.settings.district, theme, dataset_name)
+
+    def _get_extent_skip_reason(self, values_layer_path: str, works_extent: tuple) -> Optional[str]:
+        """Why a values source can't touch the works extent, from cached tile/source extents; None if it might"""
+        if self.tile_cache:
+            tiles = self.tile_cache.overlapping_tiles(values_layer_path, works_extent)
+            if tiles == 0:
+                return "no cached tile reaches the buffered works"
+            if tiles:
+                return None
+        source_extent = self._get_source_extent(values_layer_path)
+        if source_extent and not _extents_overlap(source_extent, works_extent):
+            return "source extent does not reach the buffered works"
+        return None
+
+    def _get_source_extent(self, values_layer_path: str) -> Optional[tuple]:
+        """Extent of a values source in the works' coordinate system, reused while its change stamp holds"""
+        try:
+            stamp = self._source_stamps.get(values_layer_path)
+            if stamp is None:
+                stamp = self._source_stamps[values_layer_path] = change_stamp(values_layer_path)
+            cached = self._source_extents.get(values_layer_path)
+            extent = cached[1] if cached and cached[0] == stamp else self.run_stats.source_extent(values_layer_path, stamp)
+            if extent is None:
+                described = arcpy.Describe(values_layer_path).extent
+                works_sr = arcpy.Describe(self.working_data).spatialReference
+                if described.spatialReference and described.spatialReference.factoryCode != works_sr.factoryCode:
+                    described = described.projectAs(works_sr)
+                extent = (described.XMin, described.YMin, described.XMax, described.YMax)
+                self.run_stats.record_source_extent(values_layer_path, extent, stamp)
+        except Exception:
+            return None
+        self._source_extents[values_layer_path] = (stamp, extent)
+        return extent
+
+    def _get_works_extent(self, working_data: str) -> tuple:
+        """Extent of the works grown by the widest buffer distance (xmin, ymin, xmax, ymax)"""
+        extent = arcpy.Describe(working_data).extent
+        widest = max(self._get_buffer_band(name)[1] for name in BUFFERS)
+        return _grow_extent((extent.XMin, extent.YMin, extent.XMax, extent.YMax), widest)
+
+    def _get_values_fid_field(self, intersect_fields: List[str]) -> Optional[str]:
+        """FID_ field Intersect added for the values input (inputs are [works, values], so it is the last)"""
+        fid_fields = [f for f in intersect_fields if f.upper().startswith('FID_')]
+        return fid_fields[-1] if len(fid_fields) >= 2 else None
+
     def _is_point_dataset(self, dataset_path: str) -> bool:
         """Check if a dataset has point geometry"""
-        try:
-            desc = arcpy.Describe(dataset_path)
-            return desc.shapeType == 'Point'
-        except:
-            return False
+        return self._get_shape_type(dataset_path) == 'Point'
         
     def _is_polygon_dataset(self, dataset_path: str) -> bool:
         """Check if a dataset has polygon geometry"""
-        try:
-            desc = arcpy.Describe(dataset_path)
-            return desc.shapeType == 'Polygon'
-        except:
-            return False
+        return self._get_shape_type(dataset_path) == 'Polygon'
     
     def _is_line_dataset(self, dataset_path: str) -> bool:
         """Check if a dataset has polygon geometry"""
-        try:
-            desc = arcpy.Describe(dataset_path)
-            return desc.shapeType == 'Polyline'
-        except:
-            return False
+        return self._get_shape_type(dataset_path) == 'Polyline'
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
@@ -665,21 +1463,169 @@ class ValuesChecker:
                 self.logger.warning(f"Could not delete {dataset}: {e}")
 
 
+# ============================================================================
+# Mitigation Helpers
+# ============================================================================
+
+# Themes whose mitigation depends on row values other than the value code (see ValuesChecker._get_mitigation)
+ROW_RULE_THEMES = ('heritage', 'summary')
+
+# Themes whose row rules depend on other results of the same work, so they are mitigated as a whole
+WHOLE_THEME_RULE_THEMES = ('heritage',)
+
+# Heritage value types that make SITES_EXIST 'Yes' (ACHRIS places) and CH_SENS 'Yes' for a work
+HERITAGE_SITE_VALUE_TYPES = ('Heritage Site', 'Heritage Site - Preliminary')
+CULTURAL_SENSITIVITY_VALUE_TYPES = ('Cultural Sensitivity',)
+
+# RISK_LVL -> risk level of the HERITAGE_MITIGATIONS matrix; works without a level count as DAP
+HERITAGE_RISK_LEVELS = {'LRLI': 'LRLI', 'DAP': 'DAP', None: 'DAP', '': 'DAP'}
+_unknown_risk_levels = set()                # RISK_LVL values already logged as unknown
+
+
+def _heritage_risk_level(risk_level: Optional[str]) -> Optional[str]:
+    """Heritage matrix risk level for a work's RISK_LVL; unknown levels are logged once and passed through"""
+    if risk_level in HERITAGE_RISK_LEVELS:
+        return HERITAGE_RISK_LEVELS[risk_level]
+    if risk_level not in _unknown_risk_levels:
+        _unknown_risk_levels.add(risk_level)
+        logging.getLogger(__name__).warning(f"Unknown RISK_LVL {risk_level!r}: heritage mitigation from the matrix default")
+    return risk_level
+
+
+class HeritageSiteIndex:
+    """UNIQUE_IDs of works with ACHRIS sites / cultural sensitivity, collected in one pass over heritage results"""
+
+    def __init__(self, records: Iterable[ResultRecord] = ()):
+        self.with_sites = set()
+        self.with_sensitivity = set()
+        for record in records:
+            value_type = record.schema.value_type
+            if value_type in HERITAGE_SITE_VALUE_TYPES:
+                self.with_sites.add(record.UNIQUE_ID)
+            elif value_type in CULTURAL_SENSITIVITY_VALUE_TYPES:
+                self.with_sensitivity.add(record.UNIQUE_ID)
+
+    def sites_exist(self, unique_id) -> str:
+        return 'Yes' if unique_id in self.with_sites else 'No'
+
+    def sensitivity(self, unique_id) -> str:
+        return 'Yes' if unique_id in self.with_sensitivity else 'No'
+
+
+def apply_mitigations(index: MitigationIndex, mode: str, theme: str, records: Iterable[ResultRecord],
+                      sites: Optional[HeritageSiteIndex] = None) -> List[ResultRecord]:
+    """Set mitigations on a batch of one theme: row rules for ROW_RULE_THEMES, the compiled index otherwise
+
+    Heritage rules use a HeritageSiteIndex of the same results (built from the batch if not given), so pass
+    the whole theme for each work.
+    """
+    records = list(records)
+    if theme in ROW_RULE_THEMES:
+        if theme == 'heritage' and sites is None:
+            sites = HeritageSiteIndex(records)
+        for record in records:
+            record['mitigation'] = ValuesChecker._get_mitigation(theme, record, sites)
+    else:
+        index.apply(mode, records)
+    return records
+
+
+# ============================================================================
+# Streaming Output Helpers
+# ============================================================================
+
+class ThemeCsvWriter:
+    """Append-only CSV writer for one theme, written one batch at a time"""
+
+    def __init__(self, filepath: Path, columns: List[str]):
+        self.filepath = filepath
+        self.columns = columns
+        self.rows_written = 0
+
+    def write_batch(self, batch: List[ResultRecord]):
+        """Append a batch of results, writing the header with the first batch only"""
+        if not batch:
+            return
+        df = _records_to_frame(batch, self.columns)
+        first_batch = self.rows_written == 0
+        df.to_csv(self.filepath, mode='w' if first_batch else 'a', header=first_batch, index=False)
+        self.rows_written += len(batch)
+
+    def close(self):
+        """Write a header-only file for a theme with no results, replacing any earlier report of the same name"""
+        if not self.rows_written:
+            pd.DataFrame(columns=self.columns).to_csv(self.filepath, index=False)
+
+
+def _records_to_frame(records: List[ResultRecord], columns: List[str]) -> 'pd.DataFrame':
+    """Build a DataFrame from records, keeping dictionary-encoded columns as categoricals"""
+    data = {}
+    for column, (values, categories) in encoded_columns(records, columns).items():
+        if categories is None:
+            data[column] = values
+        else:
+            data[column] = pd.Categorical.from_codes(values, categories=list(categories))
+    return pd.DataFrame(data, columns=columns)
+
+
+# Dimension of an overlay piece by values geometry type (4 = polygon, 2 = line); points are kept whole
+_INTERSECT_DIMENSIONS = {'polygon': 4, 'polyline': 2}
+
+
+def _scratch_path(workspace: str, name: str) -> str:
+    """Absolute path of a scratch output in a run's workspace, unique across the runs of a batch"""
+    return os.path.join(workspace, name)
+
+
+def _combined_extent(extents: Iterable[tuple]) -> tuple:
+    xmins, ymins, xmaxs, ymaxs = zip(*extents)
+    return min(xmins), min(ymins), max(xmaxs), max(ymaxs)
+
+
+def _distance_in_metres(distance: str) -> float:
+    """Metres in a linear unit string such as '500 meters' or '1 meter'"""
+    return float(distance.split()[0])
+
+
+def _extents_overlap(a: tuple, b: tuple) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _grow_extent(extent: tuple, distance: float) -> tuple:
+    return extent[0] - distance, extent[1] - distance, extent[2] + distance, extent[3] + distance
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most 'size' items without materialising it"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 # ============================================================================
 # Configuration Section - Modify these settings as needed
 # ============================================================================
 
 # USER CONFIGURATION
 INPUT_DATA = r"C:\data\gippsdap\Tambo_2324_DAP_sample.shp"
+BATCH_INPUTS = None                                 # Optional: list of works layers or a folder of shapefiles, checked in one process (outputs per input under WORKSPACE)
 ID_FIELD = "DAP_REF_NO"
 NAME_FIELD = "DAP_NAME"
 DESCRIPTION_FIELD = "DESCRIPTIO"
 DISTRICT_FIELD = "DISTRICT"
 RISK_LEVEL_FIELD = "RISK_LVL"
+WORKS_FIELDS = [ID_FIELD, NAME_FIELD, DESCRIPTION_FIELD, DISTRICT_FIELD, RISK_LEVEL_FIELD]    # works fields on every result, in this order
 WORKSPACE = r"C:\data\temp"
+VALID_MODES = ("DAP", "JFMP", "NBFT")
 MODE = "JFMP"                                       # Options: "DAP", "JFMP", "NBFT"
+MODES = None                                        # Optional: several modes in one run, e.g. ["DAP", "JFMP"] (overrides MODE)
 THEMES = ["forests", "biodiversity", "water", "heritage", "summary"]     # Options: "summary", "forests", "biodiversity", "water", "heritage"
 DISTRICT = None                                     # Optional: specify district name or leave as None
+ORDER_BY_HISTORY = True                             # Order datasets by past hit rate and cost (run_statistics.json in WORKSPACE)
+POINT_FAST_PATH = True                              # Check point values by exact distance instead of buffer + Intersect
+CODE_MITIGATIONS = True                             # Apply EVC/species-level entries of mitigations.MITIGATIONS
+DEDUPE_KEEP = None                                  # QBID dedupe keep policy per theme; None for dedup.DEFAULT_KEEP_POLICIES, {} to disable
+JOIN_RISK_REGISTERS = True                          # Take biodiversity mitigations from RISK_REGISTERS by MR_Code (cached in WORKSPACE\risk_registers)
 VERBOSE_LOGGING = True                              # Set to True for detailed logging
 
 # Paths to risk register data - maintained by NEP(?)
@@ -697,6 +1643,14 @@ DATA_PATHS = {
     'regional': "C:\\Data\\CSDL"
 }
 
+# Tiled local cache of the values layers - None to read the CSDL shares directly
+TILE_CACHE = None                                   # e.g. WORKSPACE + r"\tile_cache"
+
+# Local replicas of the network sources in DATA_PATHS - None to read the shares directly
+REPLICA_STORE = None                                # e.g. WORKSPACE + r"\replicas"
+REPLICA_REFRESH_HOURS = 24
+REPLICA_REBUILD_DAYS = 7                            # forced rebuild of sources without editor tracking
+
 # Buffer distances
 BUFFERS = {
     '1m':    {'input_features': "input_layer", 'buffer_distance': "1 meter", 'buffer_type': "FULL"},
@@ -707,14 +1661,236 @@ BUFFERS = {
     '300m':  {'input_features': "input_layer", 'buffer_distance': "300 meters", 'buffer_type': "FULL"},
     '500m':  {'input_features': "input_layer", 'buffer_distance': "500 meters", 'buffer_type': "FULL"},
     '550m':  {'input_features': "input_layer", 'buffer_distance': "550 meters", 'buffer_type': "FULL"},
-    '1000m_ring': {'input_features': "buffer_500m", 'buffer_distance': "500 meters", 'buffer_type': "OUTSIDE_ONLY"},
+    # Rings are not built: values count when inner_distance < distance to the works <= buffer_distance
+    '1000m_ring': {'input_features': "input_layer", 'buffer_distance': "1000 meters", 'inner_distance': "500 meters", 'buffer_type': "RING"},
 }
 
+# ============================================================================
+# Tile Cache Maintenance
+# ============================================================================
+
+def build_tile_cache(cache_root: Union[str, Path], modes: Optional[List[str]] = None,
+                     replica_root: Optional[Union[str, Path]] = None) -> Dict[str, Dict[str, int]]:
+    """Cut (or incrementally refresh) every DATASET_MATRIX source into the tiled values cache
+
+    With replica_root, tiles are cut from the local replicas, matching the paths the checker reads.
+    """
+    cache = TileCache(Path(cache_root))
+    replicas = ReplicaStore(Path(replica_root)) if replica_root else None
+    sources = sorted({config['path'].format(**DATA_PATHS) for datasets in DATASET_MATRIX.values()
+                      for config in datasets.values()
+                      if not modes or not config.get('modes') or set(config['modes']) & set(modes)})
+    if replicas:
+        sources = [replicas.path(source) for source in sources]
+    stats = {}
+    for source in sources:
+        if not arcpy.Exists(source):
+            logging.warning(f"Dataset not found, not tiled: {source}")
+            continue
+        stats[source] = cache.build(source)
+    return stats
+
+
+# ============================================================================
+# Batch Processing
+# ============================================================================
+
+def run_batch(inputs: Union[str, Path, Iterable[Union[str, Path]]], settings: Settings) -> Dict[str, Dict]:
+    """Check many works layers in one process with a shared, warm SharedCache
+
+    inputs is a list of works layers or a folder of shapefiles. settings is the template for every run;
+    each input gets its own settings.workspace subfolder (named after the input) for its outputs.
+    Returns {input: process() result}.
+    """
+    if isinstance(inputs, (str, Path)) and Path(inputs).is_dir():
+        inputs = sorted(Path(inputs).glob("*.shp"))
+    shared = SharedCache(settings)
+    logger = logging.getLogger(__name__)
+
+    results, used_names = {}, set()
+    for input_data in inputs:
+        name = base = Path(input_data).stem
+        suffix = 1
+        while name in used_names:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        used_names.add(name)
+
+        logger.info(f"Batch: checking {input_data} ({len(results) + 1})")
+        run_settings = replace(settings, input_data=str(input_data), workspace=settings.workspace / name)
+        results[str(input_data)] = ValuesChecker(run_settings, shared).process()
+    return results
+
+
+# ============================================================================
+# Report-only Commands (no arcpy)
+# ============================================================================
+
+def validate_config(modes: Optional[List[str]] = None, themes: Optional[List[str]] = None) -> List[str]:
+    """Problems in DATASET_MATRIX, BUFFERS and the run configuration; an empty list if all is well"""
+    modes = modes or MODES or [MODE]
+    themes = themes or THEMES
+    problems = [f"Unknown mode {mode}" for mode in modes if mode not in VALID_MODES]
+    problems += [f"Theme {theme} has no datasets in DATASET_MATRIX" for theme in themes if theme not in DATASET_MATRIX]
+
+    for name, config in BUFFERS.items():
+        source = config['input_features']
+        if source != "input_layer" and source.replace("buffer_", "", 1) not in BUFFERS:
+            problems.append(f"Buffer {name} is built from unknown buffer {source}")
+        if config['buffer_type'] == "RING":
+            inner = _distance_in_metres(config.get('inner_distance', '0'))
+            if not any(c['buffer_type'] == "FULL" and _distance_in_metres(c['buffer_distance']) == inner
+                       for c in BUFFERS.values()):
+                problems.append(f"Ring buffer {name} has no full buffer of {inner} m for its inner edge")
+
+    for theme, datasets in DATASET_MATRIX.items():
+        for dataset_name, config in datasets.items():
+            where = f"{theme}/{dataset_name}"
+            try:
+                config = DatasetConfig(**config)
+            except TypeError as e:
+                problems.append(f"{where}: {e}")
+                continue
+            try:
+                config.path.format(**DATA_PATHS)
+            except KeyError as e:
+                problems.append(f"{where}: path uses unknown DATA_PATHS key {e}")
+            problems += [f"{where}: unknown mode {mode}" for mode in config.modes or [] if mode not in VALID_MODES]
+
+            buffers = config.buffer if isinstance(config.buffer, dict) else {None: config.buffer}
+            for mode, names in buffers.items():
+                if mode is not None and mode not in VALID_MODES:
+                    problems.append(f"{where}: buffer given for unknown mode {mode}")
+                for buffer_name in ([names] if isinstance(names, str) else names):
+                    if buffer_name not in BUFFERS:
+                        problems.append(f"{where}: unknown buffer {buffer_name}")
+            for mode in modes:
+                if isinstance(config.buffer, dict) and mode not in config.buffer and (not config.modes or mode in config.modes):
+                    problems.append(f"{where}: no buffer for enabled mode {mode}")
+
+            value_fields = config.value_field if isinstance(config.value_field, list) else [config.value_field]
+            for field in value_fields + [config.description_field, config.id_field]:
+                if field and field not in config.fields:
+                    problems.append(f"{where}: {field} is not in fields")
+    return problems
+
+
+# Report columns holding integer IDs, which come back as float text ('123.0') from reports saved via pandas
+INTEGRAL_REPORT_FIELDS = ('Value_ID', 'TAXON_ID', 'RECORD_ID')
+
+
+def recompute_reports(csv_paths: Iterable[Union[str, Path]], mode: str, risk_registers: Optional[Dict[str, str]] = None,
+                      register_cache: Optional[Path] = None,
+                      dedupe_keep: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """Re-apply mitigations and rebuild QBIDs in stored theme CSV reports, in place and without arcpy
+
+    Rows are read back into records (one schema per Theme/Value_Type/Buffer, extra fields as configured
+    for that value type, integral ID columns back to int) and go through the same mitigation, risk register,
+    dedupe and QBID code as a full run, using the X/Y already in the report. Biodiversity rows are rejoined
+    from the risk register's JSON cache in register_cache; without a cache, rows whose stored mitigation came
+    from the register are left as they are. dedupe_keep as Settings.dedupe_keep. Returns the number of rows
+    written per file.
+    """
+    engine = QbidEngine(mode)
+    mitigation_index = MitigationIndex(flatten_mitigations(CODE_MITIGATIONS))
+    dedupe_keep = dict(DEFAULT_KEEP_POLICIES) if dedupe_keep is None else dedupe_keep
+    register = _cached_risk_register(mode, risk_registers, register_cache)
+    dictionaries = RunDictionaries()
+    record_fields = [field for field in RESULT_FIELDS if field not in SCHEMA_FIELDS] + DERIVED_FIELDS
+    counts = {}
+    for csv_path in csv_paths:
+        with open(csv_path, newline='') as f:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or []
+            rows = [{key: _report_value(key, value) for key, value in row.items()} for row in reader]
+
+        schemas, records = {}, []
+        for row in rows:
+            schema_key = (row.get('Theme'), row.get('Value_Type'), row.get('Buffer'), row.get('DATE_CHECKED'))
+            schema = schemas.get(schema_key)
+            if schema is None:
+                extra_fields = [field for field in _configured_extra_fields(*schema_key[:2]) if field in columns]
+                schema = schemas[schema_key] = DatasetSchema(*schema_key, extra_fields, dictionaries, frozenset([mode]))
+            records.append(ResultRecord(schema, extras=tuple(row.get(field) for field in schema.extra_fields),
+                                        **{field: row.get(field) for field in record_fields}))
+
+        engine.build_batch(records)
+        by_theme = {}
+        for record in records:
+            by_theme.setdefault(record.schema.theme, []).append(record)
+        records = []
+        for theme, theme_records in by_theme.items():
+            stored = [record['mitigation'] for record in theme_records]
+            apply_mitigations(mitigation_index, mode, theme, theme_records)
+            if theme == 'biodiversity' and register is not None:
+                register.join(theme_records)
+            elif theme == 'biodiversity' and risk_registers:
+                # no register cache to rejoin from: keep what the register gave the rows it matched
+                for record, mitigation in zip(theme_records, stored):
+                    if mitigation and mitigation != record['mitigation'] and mr_code(record) is not None:
+                        record['mitigation'] = mitigation
+            keep = dedupe_keep.get(theme)
+            records.extend(dedupe_records(theme_records, keep) if keep else theme_records)
+        engine.build_alt(records)
+
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(record.as_row(columns) for record in records)
+        counts[str(csv_path)] = len(records)
+    return counts
+
+
+def _report_value(field: str, value: str):
+    """A CSV report cell as a record value: '' is None and integral ID columns ('123.0') are int again"""
+    if value == '':
+        return None
+    if field in INTEGRAL_REPORT_FIELDS:
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        if number.is_integer():
+            return int(number)
+    return value
+
+
+def _cached_risk_register(mode: str, risk_registers: Optional[Dict[str, str]],
+                          register_cache: Optional[Path]) -> Optional[RiskRegister]:
+    """The mode's risk register from its JSON cache (no arcpy), None if not joined or not cached"""
+    if not risk_registers or register_cache is None:
+        return None
+    key, fields = MODE_REGISTERS[mode]
+    path = risk_registers.get(key)
+    if not path:
+        return None
+    register = RiskRegister.from_cache(path, fields, Path(register_cache), **_register_options(key))
+    if register is None:
+        logging.getLogger(__name__).warning(f"No cached risk register for {path}; register mitigations in the reports are kept")
+    return register
+
+
+def _register_options(key: str) -> Dict:
+    """Row precedence of a register as V51 joined it: JFMP burn unit rows by landscape, rings (contingency) in table order"""
+    return {'landscape_precedence': key in LANDSCAPE_PRECEDENCE_REGISTERS,
+            'table_order_buffers': [name for name, config in BUFFERS.items() if config['buffer_type'] == "RING"]}
+
+
+def _configured_extra_fields(theme: str, value_type: str) -> List[str]:
+    """Extra fields of the theme's datasets with this value type, in configuration order"""
+    extra_fields = []
+    for config in DATASET_MATRIX.get(theme, {}).values():
+        config = DatasetConfig(**config)
+        if config.value_type == value_type:
+            extra_fields.extend(f for f in ValuesChecker._get_extra_fields(config) if f not in extra_fields)
+    return extra_fields
+
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """
     Main entry point for the Values Checking Tool
     
@@ -722,15 +1898,47 @@ def main():
     2. Initializes the ValuesChecker with those settings
     3. Runs the processing workflow
     4. Reports results to the user
+
+    Report-only commands run without loading arcpy:
+        --validate-config               check DATASET_MATRIX, BUFFERS and the configuration above
+        --recompute CSV [CSV ...]       re-apply mitigations and QBIDs to stored theme reports (--mode to choose)
     """
+    parser = argparse.ArgumentParser(description="Gippsland values checking tool")
+    parser.add_argument('--validate-config', action='store_true', help="check the configuration and exit")
+    parser.add_argument('--recompute', nargs='+', metavar='CSV', help="re-apply mitigations and QBIDs to theme reports")
+    parser.add_argument('--mode', default=MODE, choices=VALID_MODES, help="mode for --recompute")
+    args = parser.parse_args(argv)
+
+    if args.validate_config:
+        problems = validate_config()
+        for problem in problems:
+            print(f"  {problem}")
+        print(f"Configuration {'has ' + str(len(problems)) + ' problems' if problems else 'OK'}")
+        return 1 if problems else 0
+    if args.recompute:
+        risk_registers = RISK_REGISTERS if JOIN_RISK_REGISTERS else None
+        for csv_path, rows in recompute_reports(args.recompute, args.mode, risk_registers,
+                                                Path(WORKSPACE) / "risk_registers", DEDUPE_KEEP).items():
+            print(f"  {Path(csv_path).name}: {rows} rows recomputed")
+        return 0
     
     # Create settings from configuration
     settings = Settings(
         input_data=INPUT_DATA,
         workspace=Path(WORKSPACE),
         mode=MODE,
+        modes=MODES,
         themes=THEMES,
-        district=DISTRICT
+        district=DISTRICT,
+        tile_cache=TILE_CACHE,
+        replica_store=REPLICA_STORE,
+        replica_refresh_hours=REPLICA_REFRESH_HOURS,
+        replica_rebuild_days=REPLICA_REBUILD_DAYS,
+        point_fast_path=POINT_FAST_PATH,
+        order_by_history=ORDER_BY_HISTORY,
+        code_mitigations=CODE_MITIGATIONS,
+        dedupe_keep=DEDUPE_KEEP,
+        risk_registers=RISK_REGISTERS if JOIN_RISK_REGISTERS else None
     )
     
     # Configure logging level
@@ -739,14 +1947,25 @@ def main():
     
     # Display startup information
     print(f"Starting Values Checking Tool")
-    print(f"Input: {INPUT_DATA}")
+    print(f"Input: {BATCH_INPUTS or INPUT_DATA}")
     print(f"Workspace: {WORKSPACE}")
-    print(f"Mode: {MODE}")
+    print(f"Mode: {', '.join(settings.modes)}")
     print(f"Themes: {', '.join(THEMES)}")
     if DISTRICT:
         print(f"District: {DISTRICT}")
     print("=" * 60)
     
+    # Batch: every input in one process, sharing the values-side caches
+    if BATCH_INPUTS:
+        results = run_batch(BATCH_INPUTS, settings)
+        print("=" * 60)
+        failed = [input_data for input_data, result in results.items() if not result['success']]
+        for input_data, result in results.items():
+            status = f"{len(result['outputs'])} outputs" if result['success'] else f"failed: {result['error']}"
+            print(f"  {Path(input_data).name}: {status}")
+        print(f"Checked {len(results)} inputs, {len(failed)} failed. Outputs saved to: {WORKSPACE}")
+        return 1 if failed else 0
+
     # Run the processing workflow
     checker = ValuesChecker(settings)
     result = checker.process()
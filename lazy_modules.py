@@ -0,0 +1,44 @@
+# ============================================================================
+# Deferred Imports
+# ============================================================================
+
+"""
+Proxies for the heavy modules, imported on first use
+
+Importing arcpy takes several seconds and checks out a licence; pandas takes most of a second. Modules
+import these proxies instead, so the real import happens on the first attribute access and commands that
+never touch geoprocessing (config validation, re-applying mitigations and QBIDs to stored reports) start
+without either.
+
+    from lazy_modules import arcpy
+    arcpy.Exists(path)          # arcpy is imported here, once
+
+loaded() tells whether a proxy's module has been imported yet, e.g. to check that a command stayed
+arcpy-free.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is first used"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute: str):
+        # only called for attributes not found on the proxy itself
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._name}' ({'loaded' if self.loaded() else 'not loaded'})>"
+
+
+arcpy = LazyModule('arcpy')
+pd = LazyModule('pandas')
@@ -0,0 +1,105 @@
+# ============================================================================
+# Compiled Mitigation Index
+# ============================================================================
+
+"""
+One flat, precompiled mitigation table for every mode, theme, value type and code
+
+MITIGATIONS[mode][theme][value_type][code], FOREST_MITIGATIONS[value_type], THEME_MITIGATIONS[theme] and
+DEFAULT_MITIGATION are flattened once into a dict keyed on (mode, theme, value_type, code), with '*'
+standing for "any". The most specific entry wins:
+
+    1. (mode, theme, value_type, code)      e.g. a JFMP mitigation for one EVC or taxon
+    2. ('*',  theme, value_type, code)
+    3. (mode, theme, value_type, '*')
+    4. ('*',  theme, value_type, '*')       e.g. FOREST_MITIGATIONS
+    5. (mode, theme, '*', '*')
+    6. ('*',  theme, '*', '*')              THEME_MITIGATIONS
+    7. DEFAULT_MITIGATION
+
+For each (mode, theme, value_type) this resolves, on first use, to a code -> text dict plus one fallback
+text, so applying mitigations to a batch costs one hash lookup per row (none for value types without
+code-level entries). The code is read from the result field named in MITIGATION_CODE_FIELDS.
+
+    index = MitigationIndex()
+    index.apply('JFMP', records)            # sets record['mitigation'] for every record
+    index.lookup('JFMP', 'biodiversity', 'EVC', 'WPro0858')
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from mitigations import (DEFAULT_MITIGATION, FOREST_MITIGATIONS, MITIGATION_CODE_FIELDS, MITIGATIONS,
+                         THEME_MITIGATIONS)
+from result_records import ResultRecord
+
+
+WILDCARD = '*'
+
+MitigationKey = Tuple[str, str, str, str]       # mode, theme, value_type, code
+
+
+def flatten_mitigations(use_codes: bool = True) -> Dict[MitigationKey, str]:
+    """All mitigation tables as one dict keyed on (mode, theme, value_type, code)"""
+    entries = {}
+    for theme, text in THEME_MITIGATIONS.items():
+        entries[(WILDCARD, theme, WILDCARD, WILDCARD)] = text
+    for value_type, text in FOREST_MITIGATIONS.items():
+        entries[(WILDCARD, 'forests', value_type, WILDCARD)] = text
+    if use_codes:
+        for mode, themes in MITIGATIONS.items():
+            for theme, value_types in themes.items():
+                for value_type, codes in value_types.items():
+                    for code, text in codes.items():
+                        entries[(mode, theme, value_type, str(code))] = text
+    return entries
+
+
+class MitigationIndex:
+    """Flat mitigation table with wildcard fallback, resolved per (mode, theme, value_type) on first use"""
+
+    def __init__(self, entries: Optional[Dict[MitigationKey, str]] = None, default: str = DEFAULT_MITIGATION,
+                 code_fields: Optional[Dict[str, str]] = None):
+        self.entries = flatten_mitigations() if entries is None else entries
+        self.default = default
+        self.code_fields = MITIGATION_CODE_FIELDS if code_fields is None else code_fields
+        self._tables = {}       # (mode, theme, value_type) -> (code field, {code: text}, fallback text)
+
+    def table(self, mode: str, theme: str, value_type: str) -> Tuple[Optional[str], Dict[str, str], str]:
+        """(code field, code -> text, fallback) for one mode/theme/value type"""
+        key = (mode, theme, value_type)
+        table = self._tables.get(key)
+        if table is None:
+            codes = {}
+            for entry_mode in (WILDCARD, mode):         # mode-specific codes overwrite generic ones
+                codes.update((entry[3], text) for entry, text in self.entries.items()
+                             if entry[:3] == (entry_mode, theme, value_type) and entry[3] != WILDCARD)
+            fallback = next((self.entries[candidate] for candidate in (
+                (mode, theme, value_type, WILDCARD), (WILDCARD, theme, value_type, WILDCARD),
+                (mode, theme, WILDCARD, WILDCARD), (WILDCARD, theme, WILDCARD, WILDCARD))
+                if candidate in self.entries), self.default)
+            code_field = self.code_fields.get(value_type) if codes else None
+            table = self._tables[key] = (code_field, codes, fallback)
+        return table
+
+    def lookup(self, mode: str, theme: str, value_type: str, code=None) -> str:
+        """Mitigation text for a single value"""
+        _, codes, fallback = self.table(mode, theme, value_type)
+        return codes.get(str(code), fallback) if code is not None else fallback
+
+    def apply(self, mode: str, records: Sequence[ResultRecord]) -> Sequence[ResultRecord]:
+        """Set the mitigation of every record in a batch"""
+        groups = {}
+        for record in records:
+            groups.setdefault(record.schema, []).append(record)
+
+        for schema, group in groups.items():
+            code_field, codes, fallback = self.table(mode, schema.theme, schema.value_type)
+            if code_field is None:
+                fallback_code = schema.dictionaries.encode('mitigation', fallback)
+                for record in group:
+                    record.mitigation = fallback_code
+                continue
+            for record in group:
+                code = record.get(code_field)
+                record['mitigation'] = codes.get(str(code), fallback) if code is not None else fallback
+        return records
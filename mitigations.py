@@ -61,8 +61,42 @@ MITIGATIONS = {
     }
 }
 
-# Example option to remove hard-coded stuff from main script using multi-level lookup
-# MITIGATIONS = {
-#     ('JFMP', 'forests', 'biodiversity', 'EVC', Actual_EVC_goes_here): "Mitigation here",
-#     ('JFMP', 'forests', 'Flora', 'TAXON', Specific_taxon_goes_here): "Mitigation here"
-# }
\ No newline at end of file
+# Result field holding the code MITIGATIONS is keyed on, per value type
+MITIGATION_CODE_FIELDS = {
+    'EVC': 'Value_Description',     # VEG_CODE
+    'Flora': 'TAXON_ID',
+    'Fauna': 'TAXON_ID'
+}
+
+# Theme-wide mitigations, used when nothing more specific applies
+THEME_MITIGATIONS = {
+    'biodiversity': "Refer to NEP team. Standard biodiversity protection measures apply",
+    'water': "Ensure works comply with waterway protection requirements"
+}
+DEFAULT_MITIGATION = "Standard work practices apply"
+
+# All of the above are flattened by mitigation_index.MitigationIndex into one table keyed on
+# (mode, theme, value_type, code), with '*' for "any", e.g.
+#     ('JFMP', 'biodiversity', 'EVC', 'WPro0858'): "Autumn burning preferred ..."
+#     ('*', 'forests', 'FMZ', '*'): "Refer to Action Statement and SMZ plan ..."
+
+# Rewrites of risk register mitigations (Mitigation_Measure), applied to both registers by
+# risk_register.MitigationRewriter. Each rule: (districts, risk levels, phrases, replacement) - a
+# mitigation containing any of the phrases is replaced when the result's district and risk level match
+# (None matches any). The first matching rule wins.
+NO_ADDITIONAL_COMMENT = "No comment in addition to general work practices and principles"
+LRLI_REFERRED_EVC = ("Work is within or adjacent to a referral EVC. Minimise soil disturbance; Minimise vegetation "
+                     "disturbance and alteration; Avoid new works outside the existing footprint; Minimise alteration "
+                     "to natural drainage patterns near or within the EVC; Minimise canopy disturbance and creation of "
+                     "gaps in canopy vegetation; Minimise chemical drift and off target spraying within the EVC; "
+                     "Minimise machinery movement within this EVC")
+REGISTER_MITIGATION_RULES = [
+    # referred EVCs of another FMA don't apply to the district
+    (('Macalister', 'Latrobe'), None, ('This is a referred EVC in the East Gippsland FMA.',), NO_ADDITIONAL_COMMENT),
+    (('Tambo',), None, ('This is a referred EVC in the Central Gippsland FMA.',), NO_ADDITIONAL_COMMENT),
+    (('Snowy',), None, ('This is a referred EVC in the Central Gippsland FMA.',
+                        'This is a referred EVC in the Tambo and Central Gippsland FMAs.',
+                        'This is a referred EVC in the Tambo  FMA.'), NO_ADDITIONAL_COMMENT),
+    # more detail for LRLI works near referred EVCs
+    (None, ('LRLI',), ('This is a referred EVC',), LRLI_REFERRED_EVC),
+]
@@ -0,0 +1,185 @@
+# ============================================================================
+# QuickBase ID Engine
+# ============================================================================
+
+"""
+Builds QuickBase IDs for whole batches of result records
+
+QBID_MATRIX (per mode/theme) and QBID2_MATRIX (per Value_Type) are compiled once per dataset schema into
+column recipes, so each field's accessor and availability is resolved once rather than by a per-row
+try/except. Recipes are applied column-wise over a batch.
+
+Recipe precedence for the QBID field:
+    1. QBID2_MATRIX[Value_Type], if defined, non-empty and every field is available on the dataset
+    2. QBID_MATRIX[mode][theme], if every field is available on the dataset
+    3. QBID2_MATRIX['other_with_description'] / ['other_no_description'], depending on the row
+
+QBID_Test keeps the QBID_MATRIX-only recipe and QBID_Alt the fixed alternative recipe.
+
+X/Y are resolved lazily (see geometry_metrics.GeometryResolver): build_batch only resolves geometry for
+schemas whose QBID or QBID_Test recipe uses X or Y. QBID_Alt always does, so it is filled by build_alt()
+once records are known to survive de-duplication, just before they are written.
+
+Every QBID is also added to a per-run hash index keyed on (theme, QBID), so duplicate QBIDs - the reason
+V51 needs its "TEMPORARY MEASURE" dedupe - are reported per run instead of silently overwritten.
+"""
+
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence
+
+from qbid_matrix import QBID_MATRIX, QBID2_MATRIX
+from result_records import ENCODED_FIELDS, RESULT_FIELDS, SCHEMA_FIELDS, DatasetSchema, ResultRecord
+
+
+# Fields used when neither matrix gives a usable recipe (previous _build_quickbase_id fallback)
+DEFAULT_QBID_FIELDS = ["UNIQUE_ID", "Value_Type", "Value", "Value_ID"]
+
+# Fields concatenated for QBID_Alt
+ALT_QBID_FIELDS = ["UNIQUE_ID", "Value_Type", "Value", "Value_ID", "X", "Y"]
+
+# Values left out of a QBID
+EMPTY_VALUES = (None, "", 0)
+
+# Fields that need the record's geometry resolved first
+GEOMETRY_FIELDS = frozenset(['X', 'Y'])
+
+
+class QbidRecipe:
+    """Ordered field accessors for one QBID definition, resolved against a dataset schema"""
+    __slots__ = ('fields', 'getters', 'uses_geometry')
+
+    def __init__(self, fields: Sequence[str], getters: List[Callable]):
+        self.fields = tuple(fields)
+        self.getters = getters
+        self.uses_geometry = not GEOMETRY_FIELDS.isdisjoint(self.fields)
+
+    @classmethod
+    def compile(cls, fields: Sequence[str], schema: DatasetSchema) -> Optional['QbidRecipe']:
+        """Compile a field list against a schema; None if any field isn't carried by the dataset"""
+        if not fields:
+            return None
+        getters = []
+        for field in fields:
+            if field in SCHEMA_FIELDS:
+                constant = getattr(schema, SCHEMA_FIELDS[field])
+                getters.append(lambda record, constant=constant: constant)
+            elif field in schema.extra_index:
+                index = schema.extra_index[field]
+                getters.append(lambda record, index=index: record.extras[index])
+            elif field in ENCODED_FIELDS:
+                getters.append(lambda record, field=field: record[field])
+            elif field in RESULT_FIELDS:
+                getters.append(attrgetter(field))
+            else:
+                return None
+        return cls(fields, getters)
+
+    def build(self, records: Sequence[ResultRecord]) -> List[str]:
+        """QBID strings for a batch, built one column at a time"""
+        columns = [[getter(record) for record in records] for getter in self.getters]
+        return ["|".join(str(value) for value in row if value not in EMPTY_VALUES) for row in zip(*columns)]
+
+
+class CompiledSchemaRecipes:
+    """The QBID, QBID_Test and QBID_Alt recipes for one dataset schema"""
+    __slots__ = ('primary', 'with_description', 'no_description', 'test', 'alt', 'uses_geometry')
+
+    def __init__(self, schema: DatasetSchema, mode: str):
+        theme_fields = QBID_MATRIX.get(mode, {}).get(schema.theme)
+        theme_recipe = QbidRecipe.compile(theme_fields, schema)
+
+        self.primary = QbidRecipe.compile(QBID2_MATRIX.get(schema.value_type), schema) or theme_recipe
+        self.with_description = QbidRecipe.compile(QBID2_MATRIX['other_with_description'], schema)
+        self.no_description = QbidRecipe.compile(QBID2_MATRIX['other_no_description'], schema)
+        self.test = theme_recipe or QbidRecipe.compile(DEFAULT_QBID_FIELDS, schema)
+        self.alt = QbidRecipe.compile(ALT_QBID_FIELDS, schema)
+
+        qbid_recipes = [self.primary] if self.primary else [self.with_description, self.no_description]
+        self.uses_geometry = any(recipe.uses_geometry for recipe in qbid_recipes + [self.test] if recipe)
+
+
+class QbidIndex:
+    """Per-run hash index of issued QBIDs, used to report collisions"""
+
+    def __init__(self):
+        self._counts = {}       # (theme code, qbid) -> times issued
+        self.collisions = {}    # (theme, qbid) -> times issued, only for QBIDs issued more than once
+
+    def add(self, theme: str, theme_code: int, qbids: Sequence[str]):
+        counts = self._counts
+        for qbid in qbids:
+            key = (theme_code, qbid)
+            seen = counts.get(key, 0) + 1
+            counts[key] = seen
+            if seen > 1:
+                self.collisions[(theme, qbid)] = seen
+
+    def summary(self) -> Dict[str, int]:
+        """Number of colliding QBIDs per theme"""
+        summary = {}
+        for theme, _ in self.collisions:
+            summary[theme] = summary.get(theme, 0) + 1
+        return summary
+
+
+class QbidEngine:
+    """Assigns QBID, QBID_Test and QBID_Alt to batches of records for one mode
+
+    resolver is any object with resolve(records) filling X/Y in place; without one, records are
+    expected to arrive with X/Y already set.
+    """
+
+    def __init__(self, mode: str, resolver=None):
+        self.mode = mode
+        self.resolver = resolver
+        self.index = QbidIndex()
+        self._recipes = {}      # schema -> CompiledSchemaRecipes
+
+    def recipes_for(self, schema: DatasetSchema) -> CompiledSchemaRecipes:
+        """Compiled recipes for a schema, compiled on first use"""
+        recipes = self._recipes.get(schema)
+        if recipes is None:
+            recipes = self._recipes[schema] = CompiledSchemaRecipes(schema, self.mode)
+        return recipes
+
+    def build_batch(self, records: Sequence[ResultRecord]) -> Sequence[ResultRecord]:
+        """Populate QBID and QBID_Test for every record in the batch and index the results"""
+        for schema, group in _group_by_schema(records).items():
+            recipes = self.recipes_for(schema)
+            if recipes.uses_geometry:
+                self._resolve(group)
+
+            if recipes.primary:
+                qbids = recipes.primary.build(group)
+            else:
+                with_description = recipes.with_description.build(group)
+                no_description = recipes.no_description.build(group)
+                qbids = [with_desc if record.Value_Description not in EMPTY_VALUES else no_desc
+                         for record, with_desc, no_desc in zip(group, with_description, no_description)]
+
+            for record, qbid, test in zip(group, qbids, recipes.test.build(group)):
+                record.QBID = qbid
+                record.QBID_Test = test
+
+            self.index.add(schema.theme, schema.codes['Theme'], qbids)
+        return records
+
+    def build_alt(self, records: Sequence[ResultRecord]) -> Sequence[ResultRecord]:
+        """Resolve geometry and populate QBID_Alt for records that are about to be output"""
+        self._resolve(records)
+        for schema, group in _group_by_schema(records).items():
+            for record, alt in zip(group, self.recipes_for(schema).alt.build(group)):
+                record.QBID_Alt = alt
+        return records
+
+    def _resolve(self, records: Sequence[ResultRecord]):
+        if self.resolver is not None:
+            self.resolver.resolve(records)
+
+
+def _group_by_schema(records: Sequence[ResultRecord]) -> Dict[DatasetSchema, List[ResultRecord]]:
+    """Group records by schema, preserving order within each group"""
+    groups = {}
+    for record in records:
+        groups.setdefault(record.schema, []).append(record)
+    return groups
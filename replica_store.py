@@ -0,0 +1,237 @@
+# ============================================================================
+# Local Replica Store
+# ============================================================================
+
+"""
+Local snapshots of the network layers referenced by DATA_PATHS (and any other share path)
+
+Each source is copied into a local, compacted file geodatabase with a spatial index, an attribute index
+on SRC_OID (the source OID) and indexes on any requested fields. A JSON manifest records when each replica
+was last refreshed and a fingerprint of the source. The checker reads through path(): the replica when
+one exists, otherwise the source itself, so it no longer waits on share latency or locks.
+
+Refresh is scheduled by age (refresh_hours) and incremental where possible:
+    - sources with editor tracking: rows edited since the last refresh are replaced, rows whose OID no
+      longer exists in the source are deleted. Refresh times are kept in UTC and converted to the source's
+      editor tracking time zone; the where clause uses the workspace's field delimiters and date syntax.
+    - other sources: the replica is rebuilt when the fingerprint (count, extent, fields) changed, and in
+      any case once it is older than rebuild_days. The fingerprint misses attribute edits and geometry
+      edits that keep the count and extent, so such edits reach the replica at the forced rebuild.
+
+    store = ReplicaStore(Path(r"C:\\data\\temp\\replicas"), refresh_hours=24, rebuild_days=7)
+    store.refresh_due([r"C:\\Data\\CSDL\\FLORAFAUNA1.gdb\\VBA_FLORA25"])
+    layer = store.path(r"C:\\Data\\CSDL\\FLORAFAUNA1.gdb\\VBA_FLORA25")
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from lazy_modules import arcpy
+from source_metadata import attribute_fields, extent_fingerprint, unique_table_name
+
+
+REPLICA_GDB = "values_replicas.gdb"
+MANIFEST_FILE = "replica_manifest.json"
+SOURCE_OID_FIELD = "SRC_OID"
+
+# Date literal per workspace type / enterprise DBMS, for where clauses on editor tracking fields
+DATE_LITERALS = {
+    'file': "date '{:%Y-%m-%d %H:%M:%S}'",
+    'shapefile': "date '{:%Y-%m-%d}'",
+    'sqlserver': "'{:%Y-%m-%d %H:%M:%S}'",
+    'oracle': "TO_DATE('{:%Y-%m-%d %H:%M:%S}', 'YYYY-MM-DD HH24:MI:SS')",
+    'postgresql': "TIMESTAMP '{:%Y-%m-%d %H:%M:%S}'",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaStore:
+    """Local replicas of network layers with age-based, incremental refresh"""
+
+    def __init__(self, root: Path, refresh_hours: float = 24, index_fields: Optional[Dict[str, List[str]]] = None,
+                 rebuild_days: float = 7):
+        self.root = Path(root)
+        self.refresh_interval = timedelta(hours=refresh_hours)
+        self.rebuild_interval = timedelta(days=rebuild_days)    # forced rebuild of sources without editor tracking
+        self.index_fields = index_fields or {}     # source -> attribute fields to index on the replica
+        self.gdb = self.root / REPLICA_GDB
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+
+    # ------------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------------
+
+    def path(self, source: str) -> str:
+        """Replica path for a source if one exists, otherwise the source path"""
+        entry = self.manifest.get(source)
+        if entry:
+            local = str(self.gdb / entry['name'])
+            if arcpy.Exists(local):
+                return local
+        return source
+
+    def due(self, source: str) -> bool:
+        """True if the source has no replica or its replica is older than the refresh interval"""
+        entry = self.manifest.get(source)
+        return entry is None or _age(entry.get('refreshed')) >= self.refresh_interval
+
+    # ------------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------------
+
+    def refresh_due(self, sources: Iterable[str]) -> Dict[str, str]:
+        """Refresh every source whose replica is missing or older than the refresh interval"""
+        outcomes = {}
+        for source in sources:
+            if not self.due(source):
+                continue
+            try:
+                outcomes[source] = self.refresh(source)
+            except Exception as e:
+                # a failed refresh keeps the previous replica; it is retried on the next due check
+                logger.warning(f"Could not refresh replica of {source}: {e}")
+                outcomes[source] = 'failed'
+        if any(outcome in ('created', 'rebuilt', 'updated') for outcome in outcomes.values()):
+            arcpy.management.Compact(str(self.gdb))
+        return outcomes
+
+    def refresh(self, source: str) -> str:
+        """Create or update one replica; returns 'created', 'rebuilt', 'updated' or 'unchanged'"""
+        self._ensure_gdb()
+        entry = self.manifest.get(source) or {'name': self._local_name(source)}
+        local = str(self.gdb / entry['name'])
+        fields = attribute_fields(source)
+        fingerprint = extent_fingerprint(source) + fields
+        edited_field = getattr(arcpy.Describe(source), 'editedAtFieldName', '') or None
+        started = datetime.now(timezone.utc)
+
+        if not arcpy.Exists(local):
+            self._create_replica(source, local, fields)
+            self._copy_rows(source, local, fields)
+            outcome = 'created'
+        elif entry.get('fields') != fields:
+            arcpy.management.Delete(local)
+            self._create_replica(source, local, fields)
+            self._copy_rows(source, local, fields)
+            outcome = 'rebuilt'
+        elif edited_field and entry.get('refreshed'):
+            outcome = 'updated' if self._sync_edits(source, local, fields, edited_field, entry['refreshed']) else 'unchanged'
+        elif entry.get('fingerprint') != fingerprint or _age(entry.get('rebuilt')) >= self.rebuild_interval:
+            arcpy.management.TruncateTable(local)
+            self._copy_rows(source, local, fields)
+            outcome = 'rebuilt'
+        else:
+            outcome = 'unchanged'
+
+        if outcome != 'unchanged' or 'rebuilt' not in entry:
+            entry['rebuilt'] = started.isoformat(timespec='seconds')
+        entry.update({'fields': fields, 'fingerprint': fingerprint, 'refreshed': started.isoformat(timespec='seconds')})
+        self.manifest[source] = entry
+        self._save_manifest()
+        logger.info(f"Replica of {source}: {outcome}")
+        return outcome
+
+    def _sync_edits(self, source: str, local: str, fields: List[str], edited_field: str, since: str) -> bool:
+        """Replace rows edited since the last refresh and drop rows deleted from the source"""
+        source_oids = {row[0] for row in arcpy.da.SearchCursor(source, ['OID@'])}
+        local_oids = {row[0] for row in arcpy.da.SearchCursor(local, [SOURCE_OID_FIELD])}
+
+        edited_since = f"{arcpy.AddFieldDelimiters(source, edited_field)} >= {_date_literal(source, _parse_utc(since))}"
+        edited = {row[0] for row in arcpy.da.SearchCursor(source, ['OID@'], edited_since)}
+        stale = (local_oids - source_oids) | (edited & local_oids)
+        added = (source_oids - local_oids) | edited
+
+        if stale:
+            with arcpy.da.UpdateCursor(local, [SOURCE_OID_FIELD]) as cursor:
+                for (oid,) in cursor:
+                    if oid in stale:
+                        cursor.deleteRow()
+        if added:
+            self._copy_rows(source, local, fields, sorted(added))
+        return bool(stale or added)
+
+    def _copy_rows(self, source: str, local: str, fields: List[str], oids: Optional[List[int]] = None):
+        """Copy all source rows, or only the given OIDs, into the replica"""
+        is_spatial = hasattr(arcpy.Describe(source), 'shapeType')
+        source_fields = ['OID@'] + (['SHAPE@'] if is_spatial else []) + fields
+        local_fields = [SOURCE_OID_FIELD] + (['SHAPE@'] if is_spatial else []) + fields
+        where_clauses = [None]
+        if oids is not None:
+            oid_field = arcpy.Describe(source).OIDFieldName
+            where_clauses = [f"{oid_field} IN ({','.join(str(oid) for oid in oids[start:start + 1000])})"
+                             for start in range(0, len(oids), 1000)]
+        with arcpy.da.InsertCursor(local, local_fields) as insert:
+            for where_clause in where_clauses:
+                with arcpy.da.SearchCursor(source, source_fields, where_clause) as cursor:
+                    for row in cursor:
+                        insert.insertRow(row)
+
+    def _create_replica(self, source: str, local: str, fields: List[str]):
+        desc = arcpy.Describe(source)
+        name = Path(local).name
+        if hasattr(desc, 'shapeType'):
+            arcpy.management.CreateFeatureclass(str(self.gdb), name, desc.shapeType.upper(), template=source,
+                                                spatial_reference=desc.spatialReference)
+            arcpy.management.AddSpatialIndex(local)
+        else:
+            arcpy.management.CreateTable(str(self.gdb), name, template=source)
+        arcpy.management.AddField(local, SOURCE_OID_FIELD, "LONG")
+        arcpy.management.AddIndex(local, SOURCE_OID_FIELD, f"{name}_src_idx")
+        for field in self.index_fields.get(source, []):
+            if field in fields:
+                arcpy.management.AddIndex(local, field, f"{name}_{field}_idx")
+
+    # ------------------------------------------------------------------------
+    # Manifest and storage
+    # ------------------------------------------------------------------------
+
+    def _ensure_gdb(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not arcpy.Exists(str(self.gdb)):
+            arcpy.management.CreateFileGDB(str(self.root), REPLICA_GDB)
+
+    def _local_name(self, source: str) -> str:
+        """Unique, valid table name for a source path"""
+        return unique_table_name(source, self.gdb, (entry['name'] for entry in self.manifest.values()))
+
+    def _save_manifest(self):
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=1))
+
+
+
+def _parse_utc(stamp: str) -> datetime:
+    """Manifest time as an aware UTC datetime (older manifests stored naive local times)"""
+    moment = datetime.fromisoformat(stamp)
+    return (moment if moment.tzinfo else moment.astimezone()).astimezone(timezone.utc)
+
+
+def _age(stamp: Optional[str]) -> timedelta:
+    """Time since a manifest time, unbounded when there is none"""
+    return datetime.now(timezone.utc) - _parse_utc(stamp) if stamp else timedelta.max
+
+
+def _date_literal(source: str, moment: datetime) -> str:
+    """SQL date literal for a UTC time, in the source's editor tracking time zone and workspace syntax"""
+    desc = arcpy.Describe(source)
+    if not getattr(desc, 'isTimeInUTC', True):
+        moment = moment.astimezone()
+    moment = moment.replace(tzinfo=None)
+
+    workspace = arcpy.Describe(desc.path)
+    if getattr(workspace, 'dataType', '') == 'FeatureDataset':
+        workspace = arcpy.Describe(workspace.path)
+    prog_id = getattr(workspace, 'workspaceFactoryProgID', '') or ''
+    if 'FileGDB' in prog_id:
+        kind = 'file'
+    elif 'Sde' in prog_id:
+        properties = getattr(workspace, 'connectionProperties', None)
+        client = (getattr(properties, 'dbclient', '') or getattr(properties, 'instance', '') or '').lower()
+        kind = next((name for name in ('sqlserver', 'oracle', 'postgresql') if name in client), 'postgresql')
+    else:
+        kind = 'shapefile' if not prog_id else 'file'
+    return DATE_LITERALS[kind].format(moment)
@@ -0,0 +1,233 @@
+# ============================================================================
+# Result Records
+# ============================================================================
+
+"""
+Compact storage for values checking results
+
+Each result used to be a dict holding the 17 standard keys plus the dataset's extra fields, which costs
+over a kilobyte per row. A ResultRecord keeps the per-row values in __slots__ and stores the extra fields
+as a tuple whose layout is described once per dataset by a shared DatasetSchema. Values that are constant
+for a dataset/buffer (Theme, Value_Type, Buffer, DATE_CHECKED) live on the schema and are not repeated
+per row.
+
+Highly repetitive columns (ENCODED_FIELDS) are held as small integer codes against per-run
+RunDictionaries, so e.g. a long mitigation sentence is stored once per run rather than once per row.
+Codes are expanded only when a record is read by field name or serialised; columnar outputs can keep
+them as categoricals via encoded_columns().
+
+    dictionaries = RunDictionaries()
+    schema = DatasetSchema('biodiversity', 'Flora', '50m', '20250707', ['TAXON_ID', 'STARTDATE'], dictionaries)
+    record = ResultRecord(schema, extras=(500002, '2001-03-04'), UNIQUE_ID='GP-TAM-001', DISTRICT='Tambo', ...)
+    record['TAXON_ID']      -> 500002
+    record['DISTRICT']      -> 'Tambo'  (record.DISTRICT holds the code)
+    record.to_dict()        -> same dict the pre-record pipeline produced
+"""
+
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Sequence
+
+
+# Standard fields present on every result, in output column order
+RESULT_FIELDS = ['UNIQUE_ID', 'DISTRICT', 'NAME', 'DESCRIPTION', 'RISK_LVL', 'Theme', 'Value_Type', 'Buffer',
+                 'Value', 'Value_Description', 'Value_ID', 'X', 'Y', 'QBID', 'QBID_Alt', 'DATE_CHECKED']
+
+# Fields whose value is shared by every record of a dataset/buffer and held on the schema
+SCHEMA_FIELDS = {'Theme': 'theme', 'Value_Type': 'value_type', 'Buffer': 'buffer', 'DATE_CHECKED': 'date_checked'}
+
+# Fields calculated after the record is built, appended after the dataset's extra fields
+DERIVED_FIELDS = ['QBID_Test', 'mitigation']
+
+# Repetitive columns held as integer codes against the run's dictionaries
+ENCODED_FIELDS = ('Theme', 'Value_Type', 'Buffer', 'DATE_CHECKED', 'DISTRICT', 'RISK_LVL', 'mitigation')
+
+# Code used for None, matching the missing-value code of pandas categoricals
+NULL_CODE = -1
+
+
+class ColumnDictionary:
+    """Two-way mapping between the distinct values of one column and small integer codes"""
+    __slots__ = ('values', '_codes')
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value: Hashable) -> int:
+        """Code for a value, adding it to the dictionary on first sight"""
+        if value is None:
+            return NULL_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> Any:
+        """Value for a code"""
+        return None if code == NULL_CODE else self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class RunDictionaries:
+    """Per-run dictionaries for every encoded result column"""
+
+    def __init__(self):
+        self.columns = {field: ColumnDictionary() for field in ENCODED_FIELDS}
+
+    def encode(self, field: str, value: Hashable) -> int:
+        return self.columns[field].encode(value)
+
+    def decode(self, field: str, code: int) -> Any:
+        return self.columns[field].decode(code)
+
+    def summary(self) -> Dict[str, int]:
+        """Number of distinct values seen per encoded column"""
+        return {field: len(column) for field, column in self.columns.items()}
+
+
+class DatasetSchema:
+    """Shared description of the records produced by one dataset/buffer combination
+
+    modes lists the run modes (DAP/JFMP/NBFT) the records are reported under; None means every mode.
+    """
+    __slots__ = ('dictionaries', 'codes', 'extra_fields', 'extra_index', 'modes')
+
+    def __init__(self, theme: str, value_type: str, buffer: str, date_checked: str, extra_fields: Sequence[str],
+                 dictionaries: RunDictionaries, modes: Optional[FrozenSet[str]] = None):
+        self.dictionaries = dictionaries
+        self.modes = modes
+        self.codes = {
+            'Theme': dictionaries.encode('Theme', theme),
+            'Value_Type': dictionaries.encode('Value_Type', value_type),
+            'Buffer': dictionaries.encode('Buffer', buffer),
+            'DATE_CHECKED': dictionaries.encode('DATE_CHECKED', date_checked),
+        }
+        self.extra_fields = tuple(extra_fields)
+        self.extra_index = {field: i for i, field in enumerate(self.extra_fields)}
+
+    @property
+    def theme(self) -> str:
+        return self.dictionaries.decode('Theme', self.codes['Theme'])
+
+    @property
+    def value_type(self) -> str:
+        return self.dictionaries.decode('Value_Type', self.codes['Value_Type'])
+
+    @property
+    def buffer(self) -> str:
+        return self.dictionaries.decode('Buffer', self.codes['Buffer'])
+
+    @property
+    def date_checked(self) -> str:
+        return self.dictionaries.decode('DATE_CHECKED', self.codes['DATE_CHECKED'])
+
+
+class ResultRecord:
+    """A single detected value, stored compactly against a shared DatasetSchema
+
+    DISTRICT, RISK_LVL and mitigation attributes hold codes; read and write them by field name
+    (record['DISTRICT']) to get or set the actual values. X and Y are None until resolved from
+    geometry_ref, a (feature class, OID) reference to the feature the coordinates come from.
+    """
+    __slots__ = ('schema', 'UNIQUE_ID', 'DISTRICT', 'NAME', 'DESCRIPTION', 'RISK_LVL', 'Value',
+                 'Value_Description', 'Value_ID', 'X', 'Y', 'QBID', 'QBID_Alt', 'QBID_Test', 'mitigation',
+                 'geometry_ref', 'extras')
+
+    def __init__(self, schema: DatasetSchema, extras: tuple = (), **values):
+        self.schema = schema
+        self.extras = extras
+        for slot in ResultRecord.__slots__[1:-1]:
+            if slot in _ENCODED_SLOTS:
+                setattr(self, slot, schema.dictionaries.encode(slot, values.get(slot)))
+            else:
+                setattr(self, slot, values.get(slot))
+
+    def __getitem__(self, key: str) -> Any:
+        """Dict-style access across standard, schema and extra fields; raises KeyError like a dict"""
+        if key in SCHEMA_FIELDS:
+            return getattr(self.schema, SCHEMA_FIELDS[key])
+        index = self.schema.extra_index.get(key)
+        if index is not None:
+            return self.extras[index]
+        if key in _ENCODED_SLOTS:
+            return self.schema.dictionaries.decode(key, getattr(self, key))
+        if key in _RECORD_SLOTS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        """Dict-style assignment for standard and extra fields"""
+        index = self.schema.extra_index.get(key)
+        if index is not None:
+            extras = list(self.extras)
+            extras[index] = value
+            self.extras = tuple(extras)
+        elif key in _ENCODED_SLOTS:
+            setattr(self, key, self.schema.dictionaries.encode(key, value))
+        elif key in _RECORD_SLOTS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(f"{key} is not a field of {self.schema.value_type} results")
+
+    def code(self, key: str) -> int:
+        """Dictionary code of an encoded field, for cheap grouping and comparison"""
+        if key in SCHEMA_FIELDS:
+            return self.schema.codes[key]
+        if key in _ENCODED_SLOTS:
+            return getattr(self, key)
+        raise KeyError(f"{key} is not an encoded field")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style get, so mitigation and QBID rules can treat records and dicts alike"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self) -> 'ResultRecord':
+        """Independent copy sharing the schema, e.g. to give another run mode its own QBIDs and mitigation"""
+        duplicate = ResultRecord.__new__(ResultRecord)
+        for slot in ResultRecord.__slots__:
+            setattr(duplicate, slot, getattr(self, slot))
+        return duplicate
+
+    def as_row(self, columns: Sequence[str]) -> tuple:
+        """Values for the given output columns, None for columns this dataset doesn't carry"""
+        return tuple(self.get(column) for column in columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Expand to the dict layout produced before records were introduced"""
+        result = {field: self[field] for field in RESULT_FIELDS}
+        result.update(zip(self.schema.extra_fields, self.extras))
+        result['QBID_Test'] = self.QBID_Test
+        if self.mitigation != NULL_CODE:
+            result['mitigation'] = self['mitigation']
+        return result
+
+
+_RECORD_SLOTS = frozenset(ResultRecord.__slots__[1:-1]) - {'geometry_ref'}
+_ENCODED_SLOTS = frozenset(field for field in ENCODED_FIELDS if field in _RECORD_SLOTS)
+
+
+def records_to_dicts(records: List[ResultRecord]) -> List[Dict[str, Any]]:
+    """Expand a list of records for callers that still expect plain dicts"""
+    return [record.to_dict() for record in records]
+
+
+def encoded_columns(records: Sequence[ResultRecord], columns: Sequence[str]) -> Dict[str, tuple]:
+    """Column-wise view of records: encoded columns as (codes, categories), all others as plain value lists
+
+    Codes are returned unexpanded so columnar writers can build categoricals directly,
+    e.g. pd.Categorical.from_codes(codes, categories).
+    """
+    data = {}
+    dictionaries = records[0].schema.dictionaries if records else None
+    for column in columns:
+        if column in ENCODED_FIELDS and dictionaries is not None:
+            codes = [record.code(column) for record in records]
+            data[column] = (codes, dictionaries.columns[column].values)
+        else:
+            data[column] = ([record.get(column) for record in records], None)
+    return data
@@ -0,0 +1,272 @@
+# ============================================================================
+# Risk Register Join
+# ============================================================================
+
+"""
+In-memory join of biodiversity results to the NEP risk registers, keyed on MR_Code
+
+V51 copies the result table, Sorts the JFMP register by Risk_Landscape and runs JoinField for every run.
+Here each register is read once into a hash index: MR_Code -> the register rows for that code, in table
+order, with their landscape. A district's view keeps one row per MR_Code and is built once per district.
+As in V51, only the JFMP register's burn unit rows are chosen by landscape precedence (Latrobe prefers EC
+rows, every other district AGG rows, as the descending/ascending Sort did); the DAP register and the JFMP
+contingency rows (table_order_buffers) take the first row in table order, as V51's unsorted JoinField did.
+
+The index is cached as JSON next to the workspace and reused while the register's version (row count and
+latest Last_Modified) is unchanged, so most runs read one row of the register instead of the whole table.
+
+    register = RiskRegister(RISK_REGISTERS['jfmp'], JFMP_FIELDS, cache_dir, landscape_precedence=True)
+    register.lookup('500002', 'Latrobe')        -> {'Threat': ..., 'Mitigation_Measure': ..., ...}
+    register.join(records)                      # sets mitigation from Mitigation_Measure where MR_Code matches
+    RiskRegister.from_cache(path, fields, cache_dir)    # the last cached index, read without arcpy
+
+MR_Codes are derived from the records as V51 does (mr_code()): taxon ID, taxon ID + 'BR' for known
+breeding/roosting records, VEG_CODE for EVCs, site name for biodiversity monitoring, '11141MON' for LBP
+colonies.
+
+Joined mitigations then go through mitigations.REGISTER_MITIGATION_RULES (referred EVCs of another FMA,
+LRLI rewording) via a MitigationRewriter. The rule phrases are compiled once; each distinct mitigation text
+is matched once for its phrase ids, and each (text, district, risk level) resolved once, however many rows
+and registers share it.
+"""
+
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from lazy_modules import arcpy
+from mitigations import REGISTER_MITIGATION_RULES
+from result_records import ResultRecord
+
+
+MR_CODE_FIELD = "MR_Code"
+LANDSCAPE_FIELD = "Risk_Landscape"
+MODIFIED_FIELD = "Last_Modified"
+MITIGATION_FIELD = "Mitigation_Measure"
+
+# Register fields joined per register (as V51's JoinField lists)
+JFMP_FIELDS = ["Threat", "Risk_Event", MITIGATION_FIELD, MODIFIED_FIELD]
+DAP_FIELDS = ["Soil_Disturbance", "Veg_Alteration", "Waterway_Disturbance", "Chemical_Use", MITIGATION_FIELD, MODIFIED_FIELD]
+
+# RISK_REGISTERS key and fields per mode
+MODE_REGISTERS = {'JFMP': ('jfmp', JFMP_FIELDS), 'DAP': ('dap', DAP_FIELDS), 'NBFT': ('dap', DAP_FIELDS)}
+
+# Registers whose rows are picked by landscape precedence (V51 Sorts only the JFMP register)
+LANDSCAPE_PRECEDENCE_REGISTERS = ('jfmp',)
+
+# Districts whose landscape order is reversed (Latrobe: EC rows before AGG rows)
+DESCENDING_LANDSCAPE_DISTRICTS = ('Latrobe',)
+
+# Taxa with breeding/roosting-specific register entries (MR_Code = TAXON_ID + 'BR')
+BREEDING_ROOSTING_TAXA = frozenset([10220, 10226, 10230, 10246, 10248, 10250, 10253, 11280, 11303, 61341, 61342,
+                                    10117, 10118, 1887, 10176, 10238, 10177, 10112, 10215, 60618, 11141, 10217,
+                                    11455, 10603, 10277, 10302, 10268])
+
+CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def mr_code(record: ResultRecord) -> Optional[str]:
+    """Risk register code for a biodiversity result, None if the value type has no register entries"""
+    value_type = record.schema.value_type
+    if value_type == 'LBP Colony':
+        return '11141MON'
+    if value_type == 'EVC':
+        return record.Value_Description or None
+    if value_type == 'Bio Monitoring':
+        return record.Value or None
+    taxon_id = _taxon_id(record.get('TAXON_ID'))
+    if taxon_id is None:
+        return None
+    extra_info = record.get('EXTRA_INFO') or ''
+    if taxon_id in BREEDING_ROOSTING_TAXA and ('Breeding' in extra_info or 'Roost site' in extra_info):
+        return f"{taxon_id}BR"
+    return str(taxon_id)
+
+
+def _taxon_id(value) -> Optional[int]:
+    """TAXON_ID as an int; None when empty or not a number (e.g. the 'Field not found' placeholder)"""
+    if not value:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class MitigationRewriter:
+    """Declarative mitigation rewrite rules, compiled once and resolved once per distinct text"""
+
+    def __init__(self, rules: Sequence[Tuple] = REGISTER_MITIGATION_RULES):
+        phrases = list(dict.fromkeys(phrase for rule in rules for phrase in rule[2]))
+        self.phrases = phrases
+        self._any_phrase = re.compile('|'.join(re.escape(phrase) for phrase in phrases)) if phrases else None
+        phrase_ids = {phrase: i for i, phrase in enumerate(phrases)}
+        self.rules = [(frozenset(districts) if districts else None, frozenset(risk_levels) if risk_levels else None,
+                       frozenset(phrase_ids[phrase] for phrase in rule_phrases), replacement)
+                      for districts, risk_levels, rule_phrases, replacement in rules]
+        self._text_phrases: Dict[str, FrozenSet[int]] = {}      # mitigation text -> ids of the phrases it contains
+        self._rewrites: Dict[Tuple, str] = {}                   # (text, district, risk level) -> rewritten text
+
+    def phrase_ids(self, text: str) -> FrozenSet[int]:
+        """Ids of the rule phrases a mitigation text contains, matched once per distinct text"""
+        ids = self._text_phrases.get(text)
+        if ids is None:
+            if self._any_phrase is None or not self._any_phrase.search(text):
+                ids = frozenset()
+            else:
+                # phrases overlap ('referred EVC' / 'referred EVC in the ... FMA.'), so test each once matched
+                ids = frozenset(i for i, phrase in enumerate(self.phrases) if phrase in text)
+            self._text_phrases[text] = ids
+        return ids
+
+    def rewrite(self, text: Optional[str], district: Optional[str], risk_level: Optional[str]) -> Optional[str]:
+        """The mitigation text after the first matching rule, or unchanged"""
+        if not text:
+            return text
+        key = (text, district, risk_level)
+        rewritten = self._rewrites.get(key)
+        if rewritten is None:
+            rewritten = text
+            ids = self.phrase_ids(text)
+            if ids:
+                for districts, risk_levels, rule_ids, replacement in self.rules:
+                    if ((districts is None or district in districts) and (risk_levels is None or risk_level in risk_levels)
+                            and ids & rule_ids):
+                        rewritten = replacement
+                        break
+            self._rewrites[key] = rewritten
+        return rewritten
+
+    def apply(self, records: Sequence[ResultRecord]) -> Sequence[ResultRecord]:
+        """Rewrite the mitigation of every record in a batch"""
+        for record in records:
+            text = record['mitigation']
+            rewritten = self.rewrite(text, record['DISTRICT'], record['RISK_LVL'])
+            if rewritten is not text:
+                record['mitigation'] = rewritten
+        return records
+
+
+class RiskRegister:
+    """One risk register held as MR_Code -> rows, with a per-district view by landscape precedence"""
+
+    def __init__(self, path: str, fields: Sequence[str], cache_dir: Optional[Path] = None,
+                 rewriter: Optional[MitigationRewriter] = None, landscape_precedence: bool = False,
+                 table_order_buffers: Sequence[str] = (), load: bool = True):
+        self.path = path
+        self.fields = list(fields)
+        self.rewriter = rewriter or MitigationRewriter()    # share one between registers to match each text once
+        self.cache_path = Path(cache_dir) / f"{Path(path).name}.json" if cache_dir else None
+        self.landscape_precedence = landscape_precedence    # pick rows by district landscape order (JFMP register)
+        self.table_order_buffers = frozenset(table_order_buffers)   # buffers joined in table order regardless
+        self.rows: Dict[str, List[list]] = {}       # MR_Code -> [[landscape, value, ...], ...] in table order
+        self._districts = {}                        # (district, by landscape) -> {MR_Code: values dict}
+        if load:
+            self._load()
+
+    @classmethod
+    def from_cache(cls, path: str, fields: Sequence[str], cache_dir: Path, **options) -> Optional['RiskRegister']:
+        """The register as last cached, read without arcpy (so not checked against the table); None without a cache"""
+        register = cls(path, fields, cache_dir, load=False, **options)
+        rows = register._read_cache()
+        if rows is None:
+            return None
+        register.rows = rows
+        return register
+
+    def lookup(self, code: str, district: Optional[str] = None) -> Optional[Dict]:
+        """Register fields for an MR_Code, from the row the register's precedence picks for the district"""
+        return self.for_district(district).get(code)
+
+    def for_district(self, district: Optional[str], landscape_precedence: Optional[bool] = None) -> Dict[str, Dict]:
+        """MR_Code -> register fields with one row per code, built once per district"""
+        by_landscape = self.landscape_precedence if landscape_precedence is None else landscape_precedence
+        table = self._districts.get((district, by_landscape))
+        if table is None:
+            descending = district in DESCENDING_LANDSCAPE_DISTRICTS
+            table = {}
+            for code, rows in self.rows.items():
+                # a stable sort keeps table order within a landscape, as Sort + JoinField's first match did
+                row = sorted(rows, key=lambda row: row[0] or '', reverse=descending)[0] if by_landscape else rows[0]
+                table[code] = dict(zip(self.fields, row[1:]))
+            self._districts[(district, by_landscape)] = table
+        return table
+
+    def join(self, records: Sequence[ResultRecord]) -> int:
+        """Set the mitigation of every record with a register entry (after the rewrite rules); returns the number matched"""
+        matched = []
+        for record in records:
+            code = mr_code(record)
+            if code is None:
+                continue
+            by_landscape = self.landscape_precedence and record.schema.buffer not in self.table_order_buffers
+            entry = self.for_district(record['DISTRICT'], by_landscape).get(code)
+            if entry and entry.get(MITIGATION_FIELD):
+                record['mitigation'] = entry[MITIGATION_FIELD]
+                matched.append(record)
+        self.rewriter.apply(matched)
+        return len(matched)
+
+    # ------------------------------------------------------------------------
+    # Loading and cache
+    # ------------------------------------------------------------------------
+
+    def _load(self):
+        version = self._version()
+        rows = self._read_cache(version)
+        if rows is not None:
+            self.rows = rows
+            return
+
+        self.rows = self._read()
+        logger.info(f"Read {sum(len(rows) for rows in self.rows.values())} rows from {self.path}")
+        if self.cache_path:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_text(json.dumps({'cache': CACHE_VERSION, 'version': version, 'fields': self.fields,
+                                                   'rows': self.rows}))
+
+    def _read_cache(self, version: Optional[List] = None) -> Optional[Dict[str, List[list]]]:
+        """Cached rows for these fields (and this version, if given); None if there is no usable cache"""
+        if not self.cache_path or not self.cache_path.exists():
+            return None
+        try:
+            cached = json.loads(self.cache_path.read_text())
+            if (cached.get('cache') == CACHE_VERSION and cached['fields'] == self.fields
+                    and (version is None or cached['version'] == version)):
+                return cached['rows']
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"Ignoring unreadable risk register cache {self.cache_path}: {e}")
+        return None
+
+    def _read(self) -> Dict[str, List[list]]:
+        available = {f.name for f in arcpy.ListFields(self.path)}
+        landscape = [LANDSCAPE_FIELD] if LANDSCAPE_FIELD in available else []
+        fields = [f for f in self.fields if f in available]
+        rows = {}
+        with arcpy.da.SearchCursor(self.path, ['OID@', MR_CODE_FIELD] + landscape + fields) as cursor:
+            for row in sorted(cursor):
+                values = dict(zip(fields, row[2 + len(landscape):]))
+                code = str(row[1]).strip() if row[1] is not None else None
+                if code:
+                    rows.setdefault(code, []).append([row[2] if landscape else None] +
+                                                     [_json_value(values.get(f)) for f in self.fields])
+        return rows
+
+    def _version(self) -> List:
+        """Row count and latest Last_Modified: reading one row tells whether the cached index is current"""
+        count = int(arcpy.management.GetCount(self.path)[0])
+        latest = None
+        if MODIFIED_FIELD in {f.name for f in arcpy.ListFields(self.path)}:
+            with arcpy.da.SearchCursor(self.path, [MODIFIED_FIELD], f"{MODIFIED_FIELD} IS NOT NULL",
+                                       sql_clause=(None, f"ORDER BY {MODIFIED_FIELD} DESC")) as cursor:
+                latest = _json_value(next(iter(cursor), [None])[0])
+        return [count, latest]
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
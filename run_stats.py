@@ -0,0 +1,99 @@
+# ============================================================================
+# Run Statistics
+# ============================================================================
+
+"""
+Per-dataset history of how often a dataset matches and how long it takes to check
+
+Kept as a small JSON file in the workspace and updated at the end of each successful run. Statistics are
+held per district (or '*' when no district is set), since selectivity depends mostly on where the works are:
+alpine huts never match Latrobe coastal DAPs but often match Alpine ones.
+
+    stats = RunStatistics(workspace / "run_statistics.json")
+    order = sorted(datasets, key=lambda name: stats.priority(stats.key('Tambo', 'forests', name)))
+    stats.record(key, results=12, seconds=3.4)
+    stats.record_skip(key)                      # skipped by the extent early exit: not a run, priority unchanged
+    stats.save()
+
+priority() puts cheap, likely-to-match datasets first and expensive, likely-empty datasets last; the
+hit rate uses add-one smoothing so a dataset with no history counts as a coin flip.
+
+Source extents are cached here as well (source_extent / record_source_extent), so the extent early exit
+doesn't have to Describe a network layer on every run. A cached extent is reused while the source's change
+stamp (feature count and modification time, see source_metadata.change_stamp) is unchanged; sources without
+a modification time (enterprise geodatabases) also expire after EXTENT_MAX_AGE.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+STATS_FILE = "run_statistics.json"
+EXTENT_MAX_AGE = timedelta(days=1)
+
+logger = logging.getLogger(__name__)
+
+
+class RunStatistics:
+    """Historical hit rate, result count and cost per (district, theme, dataset)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.datasets: Dict[str, dict] = {}
+        self.sources: Dict[str, dict] = {}     # source path -> {'extent': [...], 'stamp': [...], 'checked': iso time}
+        if self.path.exists():
+            try:
+                history = json.loads(self.path.read_text())
+                self.datasets = history.get('datasets', {})
+                self.sources = history.get('sources', {})
+            except (ValueError, OSError) as e:
+                logger.warning(f"Ignoring unreadable run statistics {self.path}: {e}")
+
+    @staticmethod
+    def key(district: Optional[str], theme: str, dataset_name: str) -> str:
+        return f"{district or '*'}|{theme}|{dataset_name}"
+
+    def record(self, key: str, results: int, seconds: float):
+        """Add one run of a dataset to its history"""
+        entry = self.datasets.setdefault(key, {'runs': 0, 'matched_runs': 0, 'results': 0, 'seconds': 0.0})
+        entry['runs'] += 1
+        entry['matched_runs'] += 1 if results else 0
+        entry['results'] += results
+        entry['seconds'] += seconds
+
+    def record_skip(self, key: str):
+        """Count a dataset skipped by the extent early exit, kept apart from its runs"""
+        entry = self.datasets.setdefault(key, {'runs': 0, 'matched_runs': 0, 'results': 0, 'seconds': 0.0})
+        entry['skipped'] = entry.get('skipped', 0) + 1
+
+    def source_extent(self, source: str, stamp: List) -> Optional[tuple]:
+        """Cached extent of a source (works coordinate system), None if unknown or the source changed"""
+        entry = self.sources.get(source)
+        if not entry or entry.get('stamp') != list(stamp):
+            return None
+        if stamp[-1] is None and datetime.now() - datetime.fromisoformat(entry['checked']) >= EXTENT_MAX_AGE:
+            return None
+        return tuple(entry['extent'])
+
+    def record_source_extent(self, source: str, extent: Sequence[float], stamp: List):
+        self.sources[source] = {'extent': list(extent), 'stamp': list(stamp),
+                                'checked': datetime.now().isoformat(timespec='seconds')}
+
+    def hit_rate(self, key: str) -> float:
+        entry = self.datasets.get(key)
+        if entry is None:
+            return 0.5
+        return (entry['matched_runs'] + 1) / (entry['runs'] + 2)
+
+    def mean_seconds(self, key: str) -> float:
+        entry = self.datasets.get(key)
+        return entry['seconds'] / entry['runs'] if entry and entry['runs'] else 0.0
+
+    def priority(self, key: str) -> float:
+        """Sort key: expected time spent for nothing (cost x chance of no match); lowest goes first"""
+        return self.mean_seconds(key) * (1 - self.hit_rate(key))
+
+    def save(self):
+        self.path.write_text(json.dumps({'datasets': self.datasets, 'sources': self.sources}, indent=1, sort_keys=True))
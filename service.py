@@ -0,0 +1,162 @@
+# ============================================================================
+# Values Checking Service
+# ============================================================================
+
+"""
+Long-running values checker with warm in-memory indexes and a local HTTP API
+
+At startup every DATASET_MATRIX source used by the configured modes and themes is loaded into a
+ValuesIndex (see values_index.py). Check requests then run entirely in memory against those indexes through
+ValuesChecker.check_geometry(), with no scratch feature classes, so a single work is checked in well under a second instead of minutes. A
+background thread compares source fingerprints every RELOAD_SECONDS and reloads only the sources that
+changed.
+
+    python service.py                       # serves on http://127.0.0.1:8765
+
+    POST /check     a GeoJSON Feature or FeatureCollection; works attributes (DAP_REF_NO, DAP_NAME, ...) are
+                    read from the feature properties. Optional top-level members:
+                        "mode": "DAP" | "JFMP" | "NBFT"       (default SERVICE_MODES[0])
+                        "themes": ["forests", ...]            (default THEMES)
+                        "wkid": 7899                          (coordinate system of the geometry)
+                    -> {"results": {theme: [result, ...]}, "seconds": 0.41}
+    GET  /status    modes, themes and every loaded source with its feature count and load time
+
+The server only listens on localhost. Checks are run one at a time: arcpy geometry objects are not
+documented as thread-safe, and a single check is short. A reload reads the changed sources without the
+check lock and only takes it to swap each new index in, so checks are not held up while a source loads.
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from gipps_values_checking_tool import (JOIN_RISK_REGISTERS, REPLICA_REBUILD_DAYS, REPLICA_REFRESH_HOURS, REPLICA_STORE,
+                                        RISK_REGISTERS, THEMES, WORKSPACE, Settings, ValuesChecker)
+
+
+logger = logging.getLogger(__name__)
+
+
+class CheckService:
+    """A ValuesChecker with warm in-memory indexes, checking GeoJSON works on request"""
+
+    def __init__(self, settings: Settings, reload_seconds: float):
+        self.checker = ValuesChecker(settings)
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        started = time.perf_counter()
+        self.index = self.checker.build_values_index()
+        self.spatial_reference = self.index.spatial_reference
+        logger.info(f"Indexed {len(self.index.sources)} sources in {time.perf_counter() - started:.1f} s")
+
+    def check(self, request: dict) -> dict:
+        """Check the works in a GeoJSON Feature/FeatureCollection request"""
+        mode = request.get('mode') or self.checker.settings.mode
+        if mode not in self.checker.qbid_engines:
+            raise ValueError(f"Mode {mode} is not served (serving {', '.join(self.checker.settings.modes)})")
+        themes = request.get('themes') or self.checker.settings.themes
+        features = request['features'] if request.get('type') == 'FeatureCollection' else [request]
+        geometries = [feature['geometry'] for feature in features]
+        attrs = [feature.get('properties') or {} for feature in features]
+
+        started = time.perf_counter()
+        with self._lock:
+            results = self.checker.check_geometry(geometries, attrs, mode, themes,
+                                                  int(request.get('wkid') or self.spatial_reference.factoryCode))
+        return {'results': results, 'seconds': round(time.perf_counter() - started, 3)}
+
+    def status(self) -> dict:
+        return {'modes': self.checker.settings.modes, 'themes': self.checker.settings.themes,
+                'sources': self.index.summary()}
+
+    def reload_forever(self):
+        """Reload changed sources every reload_seconds (run on a daemon thread)"""
+        while True:
+            time.sleep(self.reload_seconds)
+            self.index.reload_changed(swap_lock=self._lock)
+
+
+def _make_handler(service: CheckService):
+    class CheckRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') == '/status':
+                self._reply(200, service.status())
+            else:
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/check':
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError as e:
+                self._reply(400, {'error': f"Invalid JSON: {e}"})
+                return
+            try:
+                self._reply(200, service.check(request))
+            except (KeyError, TypeError, ValueError) as e:
+                self._reply(400, {'error': str(e)})
+            except Exception as e:
+                logger.error(f"Check failed: {e}", exc_info=True)
+                self._reply(500, {'error': str(e)})
+
+        def _reply(self, status: int, body: dict):
+            payload = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return CheckRequestHandler
+
+
+# ============================================================================
+# Configuration Section - Modify these settings as needed
+# ============================================================================
+
+SERVICE_HOST = "127.0.0.1"                          # localhost only
+SERVICE_PORT = 8765
+SERVICE_MODES = ["DAP", "JFMP", "NBFT"]             # modes served; the first is the default for requests
+RELOAD_SECONDS = 300                                # how often source fingerprints are compared
+
+
+# ============================================================================
+# Main Entry Point
+# ============================================================================
+
+def main():
+    settings = Settings(
+        input_data="",
+        workspace=Path(WORKSPACE) / "service",
+        modes=SERVICE_MODES,
+        themes=THEMES,
+        replica_store=REPLICA_STORE,
+        replica_refresh_hours=REPLICA_REFRESH_HOURS,
+        replica_rebuild_days=REPLICA_REBUILD_DAYS,
+        risk_registers=RISK_REGISTERS if JOIN_RISK_REGISTERS else None
+    )
+    service = CheckService(settings, RELOAD_SECONDS)
+    threading.Thread(target=service.reload_forever, daemon=True).start()
+
+    server = ThreadingHTTPServer((SERVICE_HOST, SERVICE_PORT), _make_handler(service))
+    print(f"Values checking service on http://{SERVICE_HOST}:{SERVICE_PORT} (POST /check, GET /status)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,72 @@
+# ============================================================================
+# Source Metadata Helpers
+# ============================================================================
+
+"""
+Metadata helpers shared by the local stores of values sources (tile_cache.py, replica_store.py,
+values_index.py)
+
+    attribute_fields(source)                -> ['TAXON_ID', 'SCI_NAME', ...]    (copyable attribute fields)
+    unique_table_name(source, gdb, taken)   -> 'VBA_FLORA25_2'                  (valid and not already used)
+    extent_fingerprint(source)              -> [count, xmin, ymin, xmax, ymax]  (cheap staleness check)
+    change_stamp(source)                    -> [count, modified]                (cheaper: no Describe)
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from lazy_modules import arcpy
+
+
+# Field types not copied as attributes
+SKIPPED_FIELD_TYPES = ('OID', 'Geometry', 'GlobalID', 'Blob', 'Raster')
+
+
+def attribute_fields(source: str) -> List[str]:
+    """Copyable attribute fields of a source (no OID, geometry or system length/area fields)"""
+    desc = arcpy.Describe(source)
+    system_fields = {getattr(desc, 'lengthFieldName', ''), getattr(desc, 'areaFieldName', '')}
+    return [f.name for f in arcpy.ListFields(source)
+            if f.type not in SKIPPED_FIELD_TYPES and f.name not in system_fields]
+
+
+def unique_table_name(source: str, gdb: Path, taken: Iterable[str]) -> str:
+    """Valid table name in gdb for a source path, suffixed to avoid the names already taken"""
+    base = arcpy.ValidateTableName(Path(source).name, str(gdb))
+    taken = set(taken)
+    name, suffix = base, 1
+    while name in taken:
+        suffix += 1
+        name = f"{base}_{suffix}"
+    return name
+
+
+def extent_fingerprint(source: str) -> List:
+    """Cheap staleness check for a source: feature count and extent (one Describe and one GetCount)"""
+    desc = arcpy.Describe(source)
+    count = int(arcpy.management.GetCount(source)[0])
+    extent = desc.extent if hasattr(desc, 'extent') else None
+    bounds = [round(extent.XMin, 3), round(extent.YMin, 3), round(extent.XMax, 3), round(extent.YMax, 3)] if extent else []
+    return [count] + bounds
+
+
+def change_stamp(source: str) -> List:
+    """Feature count and last modification time of a source (None for enterprise sources)"""
+    return [int(arcpy.management.GetCount(source)[0]), modified_time(source)]
+
+
+def modified_time(source: str) -> Optional[float]:
+    """Last write to the files holding a source: the latest file in its file geodatabase, or the file itself"""
+    path = Path(source)
+    for candidate in (path, path.with_suffix('.shp'), *path.parents):
+        if candidate.suffix.lower() == '.sde':
+            return None
+        if candidate.is_file():
+            return candidate.stat().st_mtime
+        if candidate.is_dir():
+            if candidate.suffix.lower() != '.gdb':
+                return None
+            with os.scandir(candidate) as entries:
+                return max((entry.stat().st_mtime for entry in entries if entry.is_file()), default=None)
+    return None
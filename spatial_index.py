@@ -0,0 +1,280 @@
+# ============================================================================
+# Spatial Index and Distance Predicates
+# ============================================================================
+
+"""
+Exact distance checks between works and point values, without buffer or overlay geometry
+
+"Is value v within d metres of work w" is answered directly against the original works geometry:
+    - polygons: 0 inside (holes respected), otherwise the distance to the nearest ring segment
+    - lines: distance to the nearest segment
+    - points: distance to the nearest point
+
+Point values are held in a uniform grid hash (PointGridIndex), so each work only measures the points in
+the cells its extent (grown by the search distance) touches.
+
+True curves are kept out of the overlays rather than densified up front (V51 runs Densify on every
+buffer). Only works that actually have curves are expanded, and only their curve segments: circular
+arcs, circles-as-elliptic-arcs and Bezier curves are read from the geometry JSON and replaced by the fewest
+chords that stay within the curve tolerance (default 0.1 m) of the true curve. Distances are therefore exact
+for straight segments and within the tolerance for curves.
+
+    works = read_works(works_fc, ['DAP_REF_NO', 'DAP_NAME'])
+    index = PointGridIndex(points, cell_size=1000)          # points: [(oid, x, y, attributes), ...]
+    for work in works:
+        for point in index.query(work.extent, 1000):
+            d = work.distance_to(point[1], point[2])
+"""
+
+import json
+import math
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from lazy_modules import arcpy
+
+
+Extent = Tuple[float, float, float, float]      # xmin, ymin, xmax, ymax
+Coordinates = List[Tuple[float, float]]
+
+
+class WorkGeometry:
+    """One works feature: its attributes and its geometry as plain coordinate lists"""
+    __slots__ = ('attributes', 'shape_type', 'parts', 'extent')
+
+    def __init__(self, attributes: tuple, shape_type: str, parts: List[Coordinates], extent: Extent):
+        self.attributes = attributes
+        self.shape_type = shape_type    # 'polygon', 'polyline', 'point' or 'multipoint'
+        self.parts = parts              # rings for polygons, paths for lines, single points otherwise
+        self.extent = extent
+
+    def distance_to(self, x: float, y: float) -> float:
+        """Exact planar distance from a point to this work"""
+        if self.shape_type == 'polygon':
+            if _point_in_rings(x, y, self.parts):
+                return 0.0
+            return _distance_to_paths(x, y, self.parts)
+        if self.shape_type == 'polyline':
+            return _distance_to_paths(x, y, self.parts)
+        return min(math.hypot(x - px, y - py) for part in self.parts for px, py in part)
+
+
+class PointGridIndex:
+    """Uniform grid hash over points, for "all points within d of this extent" queries"""
+
+    def __init__(self, points: Sequence[tuple], cell_size: float):
+        self.points = points            # (oid, x, y, ...) tuples
+        self.cell_size = max(cell_size, 1.0)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, point in enumerate(points):
+            self._cells.setdefault(self._cell(point[1], point[2]), []).append(i)
+
+    def query(self, extent: Extent, distance: float) -> Iterator[tuple]:
+        """Points inside the extent grown by distance (a superset of the points within distance)"""
+        xmin, ymin = self._cell(extent[0] - distance, extent[1] - distance)
+        xmax, ymax = self._cell(extent[2] + distance, extent[3] + distance)
+        for cx in range(xmin, xmax + 1):
+            for cy in range(ymin, ymax + 1):
+                for i in self._cells.get((cx, cy), ()):
+                    yield self.points[i]
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+# Maximum distance between a true curve and the chords that replace it, in metres
+CURVE_TOLERANCE = 0.1
+
+
+def read_works(feature_class: str, fields: List[str], where_clause: Optional[str] = None,
+               curve_tolerance: float = CURVE_TOLERANCE) -> List[WorkGeometry]:
+    """Read works features with their attributes and coordinates"""
+    works = []
+    with arcpy.da.SearchCursor(feature_class, ['SHAPE@'] + fields, where_clause) as cursor:
+        for row in cursor:
+            shape = row[0]
+            if shape is None:
+                continue
+            works.append(WorkGeometry(tuple(row[1:]), shape.type.lower(), shape_parts(shape, curve_tolerance),
+                                      (shape.extent.XMin, shape.extent.YMin, shape.extent.XMax, shape.extent.YMax)))
+    return works
+
+
+def shape_parts(shape, curve_tolerance: float = CURVE_TOLERANCE) -> List[Coordinates]:
+    """Coordinate lists of an arcpy geometry; rings of a polygon part are split at their null separators"""
+    if shape.type in ('point', 'multipoint'):
+        return [[(point.X, point.Y)] for point in _iter_points(shape)]
+    if getattr(shape, 'hasCurves', False):
+        parts = curve_parts(json.loads(shape.JSON), curve_tolerance)
+        if parts is not None:
+            return parts
+        shape = shape.densify("DISTANCE", curve_tolerance * 10, curve_tolerance)   # curve type not handled below
+    parts = []
+    for part in shape:
+        ring = []
+        for point in part:
+            if point is None:           # separates the rings (exterior / holes) of a polygon part
+                if ring:
+                    parts.append(ring)
+                ring = []
+            else:
+                ring.append((point.X, point.Y))
+        if ring:
+            parts.append(ring)
+    return parts
+
+
+def _iter_points(shape):
+    if shape.type == 'point':
+        yield shape.firstPoint
+    else:
+        yield from shape
+
+
+# ============================================================================
+# True curves
+# ============================================================================
+
+def curve_parts(geometry_json: dict, tolerance: float) -> Optional[List[Coordinates]]:
+    """Paths/rings of an Esri JSON curve geometry with each curve segment replaced by chords
+
+    Returns None if the geometry holds a curve type that can't be expanded here (non-circular ellipses).
+    """
+    paths = geometry_json.get('curveRings') or geometry_json.get('curvePaths')
+    if paths is None:
+        paths = geometry_json.get('rings') or geometry_json.get('paths') or []
+    parts = []
+    for path in paths:
+        coords = []
+        for segment in path:
+            if isinstance(segment, list):                       # plain vertex [x, y, (z, m)]
+                coords.append((segment[0], segment[1]))
+                continue
+            start = coords[-1]
+            if 'c' in segment:                                  # circular arc: end point, interior point
+                end, interior = segment['c']
+                coords.extend(_circular_arc(start, tuple(interior[:2]), tuple(end[:2]), tolerance))
+            elif 'b' in segment:                                # cubic Bezier: end point, two control points
+                end, control1, control2 = segment['b']
+                coords.extend(_bezier(start, tuple(control1[:2]), tuple(control2[:2]), tuple(end[:2]), tolerance))
+            elif 'a' in segment:                                # elliptic arc: end, centre, minor, clockwise, rotation, axis, ratio
+                end, centre, _, clockwise = segment['a'][:4]
+                ratio = segment['a'][6] if len(segment['a']) > 6 else 1
+                if ratio != 1:
+                    return None
+                coords.extend(_arc_about_centre(start, tuple(end[:2]), tuple(centre[:2]), bool(clockwise), tolerance))
+            else:
+                return None
+        if coords:
+            parts.append(coords)
+    return parts
+
+
+def _chord_count(radius: float, sweep: float, tolerance: float) -> int:
+    """Fewest equal chords keeping an arc of this radius and sweep within tolerance (sagitta rule)"""
+    if radius <= tolerance:
+        max_angle = math.pi / 2
+    else:
+        max_angle = 2 * math.acos(1 - tolerance / radius)
+    return max(1, math.ceil(abs(sweep) / max_angle))
+
+
+def _arc_points(centre: Tuple[float, float], radius: float, start_angle: float, sweep: float, end: Tuple[float, float],
+                tolerance: float) -> Coordinates:
+    n = _chord_count(radius, sweep, tolerance)
+    points = [(centre[0] + radius * math.cos(start_angle + sweep * k / n),
+               centre[1] + radius * math.sin(start_angle + sweep * k / n)) for k in range(1, n)]
+    points.append(end)
+    return points
+
+
+def _circular_arc(start: Tuple[float, float], interior: Tuple[float, float], end: Tuple[float, float],
+                  tolerance: float) -> Coordinates:
+    """Chords along the circle through start, interior and end, from start to end via interior"""
+    (x1, y1), (x2, y2), (x3, y3) = start, interior, end
+    if start == end:                                        # full circle: interior point is diametrically opposite
+        ux, uy = (x1 + x2) / 2, (y1 + y2) / 2
+    else:
+        d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+        if abs(d) < 1e-12:                                  # collinear: a straight segment
+            return [end]
+        ux = ((x1 ** 2 + y1 ** 2) * (y2 - y3) + (x2 ** 2 + y2 ** 2) * (y3 - y1) + (x3 ** 2 + y3 ** 2) * (y1 - y2)) / d
+        uy = ((x1 ** 2 + y1 ** 2) * (x3 - x2) + (x2 ** 2 + y2 ** 2) * (x1 - x3) + (x3 ** 2 + y3 ** 2) * (x2 - x1)) / d
+    radius = math.hypot(x1 - ux, y1 - uy)
+
+    start_angle = math.atan2(y1 - uy, x1 - ux)
+    ccw_end = (math.atan2(y3 - uy, x3 - ux) - start_angle) % (2 * math.pi)
+    ccw_interior = (math.atan2(y2 - uy, x2 - ux) - start_angle) % (2 * math.pi)
+    if start == end:                                        # full circle
+        ccw_end = 2 * math.pi
+    sweep = ccw_end if ccw_interior < ccw_end else ccw_end - 2 * math.pi
+    return _arc_points((ux, uy), radius, start_angle, sweep, end, tolerance)
+
+
+def _arc_about_centre(start: Tuple[float, float], end: Tuple[float, float], centre: Tuple[float, float],
+                      clockwise: bool, tolerance: float) -> Coordinates:
+    """Chords along a circular arc given by its centre and direction
+
+    Start, end, centre and direction fix the arc, so the stored minor/major flag is not used.
+    """
+    radius = math.hypot(start[0] - centre[0], start[1] - centre[1])
+    start_angle = math.atan2(start[1] - centre[1], start[0] - centre[0])
+    ccw = (math.atan2(end[1] - centre[1], end[0] - centre[0]) - start_angle) % (2 * math.pi)
+    if start == end:                                        # full circle
+        sweep = -2 * math.pi if clockwise else 2 * math.pi
+    else:
+        sweep = ccw - 2 * math.pi if clockwise else ccw
+    return _arc_points(centre, radius, start_angle, sweep, end, tolerance)
+
+
+def _bezier(p0: Tuple[float, float], p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple[float, float],
+            tolerance: float, depth: int = 0) -> Coordinates:
+    """Chords for a cubic Bezier by de Casteljau subdivision until both control points are within tolerance"""
+    if depth >= 16 or max(_distance_to_segment(*p1, *p0, *p3), _distance_to_segment(*p2, *p0, *p3)) <= tolerance:
+        return [p3]
+    mid = lambda a, b: ((a[0] + b[0]) / 2, (a[1] + b[1]) / 2)
+    p01, p12, p23 = mid(p0, p1), mid(p1, p2), mid(p2, p3)
+    p012, p123 = mid(p01, p12), mid(p12, p23)
+    centre = mid(p012, p123)
+    return _bezier(p0, p01, p012, centre, tolerance, depth + 1) + _bezier(centre, p123, p23, p3, tolerance, depth + 1)
+
+
+# ============================================================================
+# Geometry helpers
+# ============================================================================
+
+def _point_in_rings(x: float, y: float, rings: List[Coordinates]) -> bool:
+    """Even-odd test across all rings, so points in holes are outside"""
+    inside = False
+    for ring in rings:
+        x1, y1 = ring[-1]
+        for x2, y2 in ring:
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+            x1, y1 = x2, y2
+    return inside
+
+
+def _distance_to_paths(x: float, y: float, paths: List[Coordinates]) -> float:
+    """Distance from a point to the nearest segment of any path"""
+    best = math.inf
+    for path in paths:
+        if len(path) == 1:
+            best = min(best, math.hypot(x - path[0][0], y - path[0][1]))
+            continue
+        x1, y1 = path[0]
+        for x2, y2 in path[1:]:
+            best = min(best, _distance_to_segment(x, y, x1, y1, x2, y2))
+            x1, y1 = x2, y2
+    return best
+
+
+def _distance_to_segment(x: float, y: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(x - x1, y - y1)
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
@@ -0,0 +1,73 @@
+# ============================================================================
+# Works Summary Table
+# ============================================================================
+
+"""
+One row per work with the distinct summary-theme values flattened into columns
+
+V51 builds DAP_Summary by opening a SearchCursor per work on every joined layer (temppcl, tempplan,
+tempftype, tempnt, ...) and an UpdateCursor per work and field. Here the summary theme's results, which
+are already produced in one pass per dataset, are grouped as they stream past: for each work and summary
+column the distinct non-empty values are kept in first-seen order. The table is then written in one go,
+with multiple values joined by '; ' as V51 did.
+
+    flattener = SummaryFlattener()
+    flattener.add(summary_records)              # any number of batches
+    flattener.rows(works)                       -> [('GP-TAM-001', ..., 'State Forest; Park', ...), ...]
+
+SUMMARY_COLUMNS says which result field of which value type fills each column.
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from result_records import ResultRecord
+
+
+# Summary column -> (value type, result field), in output order
+SUMMARY_COLUMNS = {
+    'LAND_MANGR': ('Land Tenure', 'Value'),                 # MMTGEN
+    'LAND_STATUS': ('Land Tenure', 'Value_Description'),    # MNG_SPEC
+    'ACT': ('Land Tenure', 'ACT'),
+    'PL_ZONE': ('Planning Zone', 'Value'),
+    'LGA': ('Planning Zone', 'Value_Description'),
+    'FOR_TYPE': ('Forest Type', 'Value'),
+    'NT_Name': ('Native Title', 'Value'),
+    'NT_STATUS': ('Native Title', 'Value_Description'),
+}
+
+SEPARATOR = '; '
+EMPTY_VALUES = (None, '', ' ', 'None', 'Field not found')   # 'Field not found' fills missing extra fields
+
+
+class SummaryFlattener:
+    """Distinct non-empty summary values per work and column, collected one batch at a time"""
+
+    def __init__(self, columns: Dict[str, Tuple[str, str]] = None):
+        self.columns = dict(SUMMARY_COLUMNS if columns is None else columns)
+        self._by_value_type = {}        # value type -> [(column position, result field), ...]
+        for position, (value_type, field) in enumerate(self.columns.values()):
+            self._by_value_type.setdefault(value_type, []).append((position, field))
+        self.values: Dict[str, List[dict]] = {}     # UNIQUE_ID -> per column, dict used as an ordered set
+
+    def add(self, records: Iterable[ResultRecord]):
+        """Group a batch of summary results by work"""
+        for record in records:
+            targets = self._by_value_type.get(record.schema.value_type)
+            if not targets:
+                continue
+            work = self.values.get(record.UNIQUE_ID)
+            if work is None:
+                work = self.values[record.UNIQUE_ID] = [{} for _ in self.columns]
+            for position, field in targets:
+                value = record.get(field)
+                if value not in EMPTY_VALUES:
+                    work[position][str(value)] = None
+
+    def flatten(self, unique_id: str) -> List[str]:
+        """The summary columns of one work, distinct values joined by SEPARATOR ('' where none)"""
+        work = self.values.get(unique_id)
+        return [SEPARATOR.join(values) for values in work] if work else [''] * len(self.columns)
+
+    def rows(self, works: Iterable[Sequence]) -> List[tuple]:
+        """One row per work: its own fields (UNIQUE_ID first) followed by the summary columns"""
+        return [tuple(work) + tuple(self.flatten(work[0])) for work in works]
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from result_records import DatasetSchema, ResultRecord, RunDictionaries  # noqa: E402
+
+
+@pytest.fixture
+def dictionaries():
+    return RunDictionaries()
+
+
+@pytest.fixture
+def make_record(dictionaries):
+    """Build a ResultRecord, reusing one schema per (theme, value type, buffer, extra fields, modes)"""
+    schemas = {}
+
+    def make(theme='biodiversity', value_type='Flora', buffer='50m', extras=None, modes=None, **values):
+        extras = dict(extras or {})
+        key = (theme, value_type, buffer, tuple(extras), modes)
+        schema = schemas.get(key)
+        if schema is None:
+            schema = schemas[key] = DatasetSchema(theme, value_type, buffer, '20250707', list(extras), dictionaries,
+                                                  frozenset(modes) if modes else None)
+        return ResultRecord(schema, extras=tuple(extras.values()), **values)
+
+    return make
@@ -0,0 +1,74 @@
+import pytest
+
+from dedup import DEFAULT_KEEP_POLICIES, QbidDeduplicator, dedupe_records
+
+
+def flora(make_record, qbid, startdate, taxon_id=500002, extra_info=None, **values):
+    record = make_record(extras={'TAXON_ID': taxon_id, 'STARTDATE': startdate, 'EXTRA_INFO': extra_info},
+                         UNIQUE_ID='GP-1', **values)
+    record.QBID = qbid
+    return record
+
+
+def test_latest_startdate_wins(make_record):
+    older = flora(make_record, 'A', '2001-01-01', Value='old')
+    newer = flora(make_record, 'A', '2010-01-01', Value='new')
+    other = flora(make_record, 'B', None, Value='other')
+    assert [r.Value for r in dedupe_records([older, newer, other])] == ['new', 'other']
+
+
+def test_startdate_tie_goes_to_lowest_mr_code(make_record):
+    breeding = flora(make_record, 'A', '2001-01-01', taxon_id=10220, extra_info='Breeding site', Value='breeding')
+    plain = flora(make_record, 'A', '2001-01-01', taxon_id=10220, Value='plain')
+    # '10220' < '10220BR'
+    assert [r.Value for r in dedupe_records([breeding, plain])] == ['plain']
+
+
+def test_highest_value_id_wins(make_record):
+    records = []
+    for value_id in (3, 7, 5):
+        record = make_record(theme='forests', value_type='FMZ', UNIQUE_ID='GP-1', Value_ID=value_id)
+        record.QBID = 'A'
+        records.append(record)
+    assert [r.Value_ID for r in dedupe_records(records, 'highest_value_id')] == [7]
+
+
+def test_no_comment_evc_dropped_when_commented_evc_exists(make_record):
+    records = []
+    for mitigation in ("No comment in addition to general work practices", "Avoid soil disturbance",
+                       "Avoid soil disturbance"):
+        record = make_record(value_type='EVC', UNIQUE_ID='GP-1', Value='Wet Forest')
+        record['mitigation'] = mitigation
+        record.QBID = f"Q{len(records)}"
+        records.append(record)
+    assert [r['mitigation'] for r in dedupe_records(records)] == ["Avoid soil disturbance"]
+
+
+def test_spooled_results_match_in_memory(make_record, tmp_path):
+    records = [flora(make_record, f"Q{i % 4}", f"200{i}-01-01", Value=str(i), DISTRICT='Tambo') for i in range(10)]
+    deduplicator = QbidDeduplicator('latest_startdate', tmp_path)
+    for start in range(0, len(records), 3):
+        deduplicator.add(records[start:start + 3])
+    spooled = list(deduplicator.results())
+
+    assert [r.Value for r in spooled] == [r.Value for r in dedupe_records(records)] == ['6', '7', '8', '9']
+    assert spooled[0].schema is records[0].schema
+    assert spooled[0]['DISTRICT'] == 'Tambo'
+    assert len(deduplicator) == 4 and deduplicator.records_seen == 10
+
+
+def test_policies_are_per_theme():
+    assert DEFAULT_KEEP_POLICIES == {'biodiversity': 'latest_startdate', 'forests': 'highest_value_id'}
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        QbidDeduplicator('oldest')
+
+
+def test_placeholder_fields_never_win_or_break_the_tie_break(make_record):
+    placeholder = flora(make_record, 'A', 'Field not found', taxon_id='Field not found', Value='placeholder')
+    dated = flora(make_record, 'A', '2001-01-01', taxon_id='Field not found', Value='dated')
+    undated = flora(make_record, 'B', 'Field not found', taxon_id='Field not found', Value='undated')
+    tied = flora(make_record, 'B', 'Field not found', taxon_id=500002, Value='tied')
+    assert [r.Value for r in dedupe_records([placeholder, dated, undated, tied])] == ['dated', 'tied']
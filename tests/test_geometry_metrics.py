@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import geometry_metrics
+from geometry_metrics import _line_metrics, _polygon_metrics
+
+pytestmark = pytest.mark.skipif(not geometry_metrics.METRICS_AVAILABLE, reason="needs numpy and pyproj")
+
+ROOT = Path(__file__).resolve().parents[1]
+ORIGIN = np.array([2500000.0, 2400000.0])
+
+
+def midpoint_by_walking(parts):
+    """Reference midpoint: walk the segments of every part in order until half the length"""
+    segments = [(a, b) for part in parts for a, b in zip(part[:-1], part[1:])]
+    total = sum(np.hypot(*(b - a)) for a, b in segments)
+    walked = 0.0
+    for a, b in segments:
+        length = np.hypot(*(b - a))
+        if walked + length >= total / 2:
+            fraction = (total / 2 - walked) / length if length else 0
+            return np.trunc(a + (b - a) * fraction)
+        walked += length
+
+
+def test_line_midpoints_match_walking_each_line():
+    rng = np.random.default_rng(1)
+    shapes = []
+    for _ in range(50):
+        parts = [ORIGIN + np.cumsum(rng.uniform(-500, 500, size=(rng.integers(2, 8), 2)), axis=0)
+                 for _ in range(rng.integers(1, 3))]
+        shapes.append(parts)
+    metrics = _line_metrics(list(range(1, 51)), shapes)
+
+    for row, parts in zip(metrics, shapes):
+        assert (row['X'], row['Y']) == tuple(midpoint_by_walking(parts))
+        assert row['LENGTH_KM'] > 0
+
+
+def test_line_metrics_skip_empty_and_single_vertex_features():
+    line = [ORIGIN + np.array([[0.0, 0.0], [1000.0, 0.0]])]
+    metrics = _line_metrics([1, 2, 3], [[], line, [ORIGIN[None, :]]])
+    assert metrics['X'].tolist() == [0, ORIGIN[0] + 500, 0]
+    assert metrics['LENGTH_KM'][1] == pytest.approx(1.0, rel=1e-3)
+
+
+def test_polygon_centroid_and_area():
+    square = ORIGIN + np.array([[0.0, 0.0], [0.0, 100.0], [100.0, 100.0], [100.0, 0.0], [0.0, 0.0]])
+    metrics = _polygon_metrics([7], [[[square]]])
+    assert (metrics['X'][0], metrics['Y'][0]) == (ORIGIN[0] + 50, ORIGIN[1] + 50)
+    assert metrics['AREA_HA'][0] == pytest.approx(1.0, rel=1e-3)
+
+
+def test_importing_the_tool_does_not_load_numpy_or_pyproj():
+    code = ("import sys, gipps_values_checking_tool; "
+            "print(sorted(name for name in ('numpy', 'pyproj') if name in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == '[]'
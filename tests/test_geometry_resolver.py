@@ -0,0 +1,48 @@
+from geometry_metrics import GeometryResolver
+from gipps_values_checking_tool import _scratch_path
+
+
+class TableResolver(GeometryResolver):
+    """Resolver reading representative points from in-memory 'feature classes' instead of a geodatabase"""
+
+    def __init__(self, sources):
+        super().__init__()
+        self.sources = sources
+        self.queries = []
+
+    def _representative_points(self, source, oids):
+        self.queries.append((source, list(oids)))
+        return [(oid,) + self.sources[source][oid] for oid in oids]
+
+
+def test_batch_runs_with_the_same_dissolve_name_keep_their_own_points(make_record):
+    dissolve = "dissolve_EVC_buffer_50m"
+    first, second = _scratch_path(r"C:\temp\batch\works_a", dissolve), _scratch_path(r"C:\temp\batch\works_b", dissolve)
+    resolver = TableResolver({first: {1: (2500100.7, 2400200.2)}, second: {1: (2600300.0, 2410400.9)}})
+
+    run_a = [make_record(UNIQUE_ID='GP-A')]
+    run_a[0].geometry_ref = (first, 1)
+    resolver.resolve(run_a)
+    run_b = [make_record(UNIQUE_ID='GP-B')]
+    run_b[0].geometry_ref = (second, 1)
+    resolver.resolve(run_b)
+
+    assert first != second
+    assert (run_a[0].X, run_a[0].Y) == (2500100, 2400200)
+    assert (run_b[0].X, run_b[0].Y) == (2600300, 2410400)
+    assert resolver.features_read == 2
+
+
+def test_resolver_reads_each_feature_once_in_chunks(make_record):
+    source = _scratch_path(r"C:\temp", "values")
+    resolver = TableResolver({source: {oid: (oid * 10.0, oid * 20.0) for oid in range(1, 6)}})
+    resolver.CHUNK_SIZE = 2
+    records = [make_record() for _ in range(6)]
+    for oid, record in zip([3, 1, 5, 2, 4, 3], records):
+        record.geometry_ref = (source, oid)
+    records[-1].X, records[-1].Y = 7, 8          # already resolved, never read again
+
+    resolver.resolve(records)
+    resolver.resolve(records[:2])
+    assert resolver.queries == [(source, [1, 2]), (source, [3, 4]), (source, [5])]
+    assert [(record.X, record.Y) for record in records] == [(30, 60), (10, 20), (50, 100), (20, 40), (40, 80), (7, 8)]
@@ -0,0 +1,37 @@
+import logging
+
+from gipps_values_checking_tool import HeritageSiteIndex, ValuesChecker, apply_mitigations
+from mitigation_index import MitigationIndex
+from mitigations import HERITAGE_MITIGATIONS
+
+
+def heritage(make_record, value_type, unique_id, risk_level='DAP'):
+    return make_record(theme='heritage', value_type=value_type, UNIQUE_ID=unique_id, RISK_LVL=risk_level)
+
+
+def test_site_index_collects_works_per_value_type(make_record):
+    sites = HeritageSiteIndex([heritage(make_record, 'Heritage Site', 'GP-1'),
+                               heritage(make_record, 'Heritage Site - Preliminary', 'GP-2'),
+                               heritage(make_record, 'Cultural Sensitivity', 'GP-2'),
+                               heritage(make_record, 'Historic Site', 'GP-3')])
+    assert [sites.sites_exist(work) for work in ('GP-1', 'GP-2', 'GP-3', 'GP-4')] == ['Yes', 'Yes', 'No', 'No']
+    assert [sites.sensitivity(work) for work in ('GP-1', 'GP-2', 'GP-3')] == ['No', 'Yes', 'No']
+    assert HeritageSiteIndex().sites_exist('GP-1') == 'No'
+
+
+def test_heritage_mitigation_uses_every_result_of_the_work(make_record):
+    records = [heritage(make_record, 'Cultural Sensitivity', 'GP-1'), heritage(make_record, 'Heritage Site', 'GP-1'),
+               heritage(make_record, 'Cultural Sensitivity', 'GP-2', 'LRLI'),
+               heritage(make_record, 'Cultural Sensitivity', 'GP-3', None)]
+    apply_mitigations(MitigationIndex({}), 'DAP', 'heritage', records)
+    assert [record['mitigation'] for record in records] == [
+        HERITAGE_MITIGATIONS[('DAP', 'Yes', 'Yes')], HERITAGE_MITIGATIONS[('DAP', 'Yes', 'Yes')],
+        HERITAGE_MITIGATIONS[('LRLI', 'No', 'Yes')], HERITAGE_MITIGATIONS[('DAP', 'No', 'Yes')]]
+
+
+def test_unknown_risk_levels_are_logged_not_coerced(make_record, caplog):
+    record = heritage(make_record, 'Heritage Site', 'GP-1', 'HRLI')
+    with caplog.at_level(logging.WARNING):
+        mitigation = ValuesChecker._get_mitigation('heritage', record, HeritageSiteIndex([record]))
+    assert mitigation == "Heritage assessment required"
+    assert "HRLI" in caplog.text
@@ -0,0 +1,39 @@
+from mitigation_index import WILDCARD, MitigationIndex, flatten_mitigations
+
+ENTRIES = {
+    (WILDCARD, 'biodiversity', WILDCARD, WILDCARD): 'theme',
+    (WILDCARD, 'biodiversity', 'Flora', WILDCARD): 'any flora',
+    (WILDCARD, 'biodiversity', 'Flora', '500002'): 'generic 500002',
+    ('JFMP', 'biodiversity', 'Flora', '500002'): 'jfmp 500002',
+    ('JFMP', 'biodiversity', 'Flora', WILDCARD): 'jfmp flora',
+    (WILDCARD, 'forests', 'FMZ', WILDCARD): 'fmz',
+}
+
+
+def index():
+    return MitigationIndex(ENTRIES, default='default', code_fields={'Flora': 'TAXON_ID'})
+
+
+def test_most_specific_entry_wins():
+    mitigations = index()
+    assert mitigations.lookup('JFMP', 'biodiversity', 'Flora', 500002) == 'jfmp 500002'
+    assert mitigations.lookup('DAP', 'biodiversity', 'Flora', '500002') == 'generic 500002'
+    assert mitigations.lookup('JFMP', 'biodiversity', 'Flora', '1') == 'jfmp flora'
+    assert mitigations.lookup('DAP', 'biodiversity', 'Flora', '1') == 'any flora'
+    assert mitigations.lookup('DAP', 'biodiversity', 'EVC', 'WPro0858') == 'theme'
+    assert mitigations.lookup('DAP', 'forests', 'FMZ') == 'fmz'
+    assert mitigations.lookup('DAP', 'water', 'Waterway') == 'default'
+
+
+def test_apply_reads_the_code_field(make_record):
+    records = [make_record(extras={'TAXON_ID': 500002}),
+               make_record(extras={'TAXON_ID': None}),
+               make_record(theme='forests', value_type='FMZ')]
+    index().apply('JFMP', records)
+    assert [record['mitigation'] for record in records] == ['jfmp 500002', 'jfmp flora', 'fmz']
+
+
+def test_flatten_without_codes_keeps_only_generic_entries():
+    entries = flatten_mitigations(use_codes=False)
+    assert entries and all(key[0] == WILDCARD and key[3] == WILDCARD for key in entries)
+    assert ('JFMP', 'biodiversity', 'Flora', '500002') in flatten_mitigations()
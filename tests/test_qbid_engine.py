@@ -0,0 +1,43 @@
+from qbid_engine import QbidEngine, QbidIndex
+
+
+def test_build_batch_uses_value_type_recipe(make_record):
+    record = make_record(theme='forests', value_type='FMZ', UNIQUE_ID='GP-1', Value='SMZ', Value_ID=123)
+    QbidEngine('DAP').build_batch([record])
+    assert record.QBID == 'GP-1|123'
+
+
+def test_build_batch_falls_back_on_description(make_record):
+    with_description = make_record(theme='water', value_type='Watercourse', UNIQUE_ID='GP-1', Value='Creek',
+                                   Value_Description='Perennial', X=10, Y=20)
+    no_description = make_record(theme='water', value_type='Watercourse', UNIQUE_ID='GP-2', Value='Creek', X=10, Y=20)
+    QbidEngine('DAP').build_batch([with_description, no_description])
+    assert with_description.QBID == 'GP-1|Creek|Perennial|10|20'
+    assert no_description.QBID == 'GP-2|Creek|10|20'
+
+
+def test_build_alt_includes_coordinates(make_record):
+    record = make_record(theme='forests', value_type='FMZ', UNIQUE_ID='GP-1', Value='SMZ', Value_ID=123, X=100, Y=200)
+    QbidEngine('DAP').build_alt([record])
+    assert record.QBID_Alt == 'GP-1|FMZ|SMZ|123|100|200'
+
+
+def test_collisions_reported_per_theme(make_record):
+    records = [make_record(theme='forests', value_type='FMZ', UNIQUE_ID='GP-1', Value_ID=1) for _ in range(3)]
+    engine = QbidEngine('DAP')
+    engine.build_batch(records)
+    assert engine.index.collisions == {('forests', 'GP-1|1'): 3}
+    assert engine.index.summary() == {'forests': 1}
+
+
+class CollidingHash(str):
+    """Distinct strings with the same hash"""
+
+    def __hash__(self):
+        return 1
+
+
+def test_index_keys_on_qbid_not_its_hash():
+    index = QbidIndex()
+    index.add('forests', 0, [CollidingHash('GP-1|1'), CollidingHash('GP-1|2')])
+    assert index.collisions == {}
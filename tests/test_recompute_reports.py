@@ -0,0 +1,113 @@
+import csv
+import json
+
+import pytest
+
+import gipps_values_checking_tool as tool
+from gipps_values_checking_tool import RESULT_FIELDS, DERIVED_FIELDS, recompute_reports
+from risk_register import CACHE_VERSION, JFMP_FIELDS
+
+FLORA_EXTRAS = ['SCI_NAME', 'TAXON_ID', 'COLLECTOR', 'FFG_DESC', 'EPBC_DESC', 'MAX_ACC_KM', 'STARTDATE']
+COLUMNS = RESULT_FIELDS + FLORA_EXTRAS + DERIVED_FIELDS
+
+
+def flora_row(**values):
+    row = dict.fromkeys(COLUMNS, '')
+    row.update({'UNIQUE_ID': 'GP-1', 'DISTRICT': 'Tambo', 'NAME': 'Track', 'RISK_LVL': 'DAP', 'Theme': 'biodiversity',
+                'Value_Type': 'Flora', 'Buffer': '50m', 'Value': 'Leafy Greenhood', 'Value_ID': '123.0',
+                'X': '2500100', 'Y': '2400200', 'DATE_CHECKED': '20250707', 'TAXON_ID': '504000.0',
+                'STARTDATE': '2001-01-01'})
+    row.update(values)
+    return row
+
+
+def write_report(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_report(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize('value_id', ['123.0', '123'])
+def test_integral_ids_rebuild_the_same_qbid(tmp_path, value_id):
+    report = tmp_path / "biodiversity.csv"
+    write_report(report, [flora_row(Value_ID=value_id)])
+    recompute_reports([report], 'DAP', dedupe_keep={})
+    row, = read_report(report)
+    assert row['Value_ID'] == '123'
+    assert row['TAXON_ID'] == '504000'
+    assert row['QBID_Alt'] == 'GP-1|Flora|Leafy Greenhood|123|2500100|2400200'
+    assert row['mitigation']
+
+
+def test_value_id_qbid_matches_a_full_run(tmp_path):
+    report = tmp_path / "forests.csv"
+    write_report(report, [flora_row(Theme='forests', Value_Type='FMZ', Value='SMZ', Value_ID='123.0', TAXON_ID='',
+                                    STARTDATE='')])
+    recompute_reports([report], 'DAP')
+    row, = read_report(report)
+    assert row['QBID'] == 'GP-1|123'
+
+
+def test_report_value_keeps_text_ids():
+    assert tool._report_value('Value_ID', 'ABC-1') == 'ABC-1'
+    assert tool._report_value('Value_ID', '12.5') == '12.5'
+    assert tool._report_value('Value', '123.0') == '123.0'
+    assert tool._report_value('RECORD_ID', '') is None
+
+
+def test_recompute_dedupes_like_a_full_run(tmp_path):
+    report = tmp_path / "biodiversity.csv"
+    write_report(report, [flora_row(STARTDATE='2001-01-01', COLLECTOR='old'),
+                          flora_row(STARTDATE='2019-05-01', COLLECTOR='new')])
+    counts = recompute_reports([report], 'DAP')
+    rows = read_report(report)
+    assert counts == {str(report): 1}
+    assert [row['COLLECTOR'] for row in rows] == ['new']
+
+
+def write_register_cache(cache_dir, mitigation):
+    cache_dir.mkdir()
+    rows = {'504000': [['AGG', 'Threat', 'Event', mitigation, None]]}
+    (cache_dir / "JFMP_RiskRegister.json").write_text(json.dumps(
+        {'cache': CACHE_VERSION, 'version': [1, None], 'fields': JFMP_FIELDS, 'rows': rows}))
+
+
+REGISTERS = {'jfmp': "RiskRegister.gdb/JFMP_RiskRegister"}
+
+
+def test_recompute_rejoins_the_cached_register(tmp_path):
+    report = tmp_path / "biodiversity.csv"
+    write_report(report, [flora_row(mitigation='stale register text'), flora_row(TAXON_ID='1', Value='Other')])
+    write_register_cache(tmp_path / "risk_registers", 'current register text')
+    recompute_reports([report], 'JFMP', REGISTERS, tmp_path / "risk_registers")
+    matched, other = read_report(report)
+    assert matched['mitigation'] == 'current register text'
+    assert other['mitigation'] != 'current register text'
+
+
+def test_recompute_keeps_register_mitigations_without_a_cache(tmp_path):
+    report = tmp_path / "biodiversity.csv"
+    write_report(report, [flora_row(mitigation='register text')])
+    recompute_reports([report], 'JFMP', REGISTERS, tmp_path / "risk_registers")
+    row, = read_report(report)
+    assert row['mitigation'] == 'register text'
+
+    recompute_reports([report], 'JFMP')
+    row, = read_report(report)
+    assert row['mitigation'] != 'register text'
+
+
+def test_recompute_survives_placeholder_taxon_ids(tmp_path):
+    report = tmp_path / "biodiversity.csv"
+    write_report(report, [flora_row(TAXON_ID='Field not found')])
+    write_register_cache(tmp_path / "risk_registers", 'register text')
+    recompute_reports([report], 'JFMP', REGISTERS, tmp_path / "risk_registers")
+    row, = read_report(report)
+    assert row['TAXON_ID'] == 'Field not found'
+    assert row['mitigation'] != 'register text'
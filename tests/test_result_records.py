@@ -0,0 +1,46 @@
+import pytest
+
+from result_records import NULL_CODE, ResultRecord
+
+
+def test_fields_read_across_slots_schema_and_extras(make_record):
+    record = make_record(extras={'TAXON_ID': 500002, 'STARTDATE': '2001-03-04'}, UNIQUE_ID='GP-TAM-001',
+                         DISTRICT='Tambo', Value='Leafy Greenhood', Value_ID=7)
+    assert record['UNIQUE_ID'] == 'GP-TAM-001'
+    assert record['Theme'] == 'biodiversity'
+    assert record['Buffer'] == '50m'
+    assert record['DATE_CHECKED'] == '20250707'
+    assert record['TAXON_ID'] == 500002
+    assert record['DISTRICT'] == 'Tambo'
+    assert record.get('SCI_NAME', 'missing') == 'missing'
+    with pytest.raises(KeyError):
+        record['SCI_NAME']
+
+
+def test_encoded_fields_share_codes(make_record, dictionaries):
+    first = make_record(DISTRICT='Tambo', RISK_LVL=None)
+    second = make_record(DISTRICT='Tambo', RISK_LVL='LRLI')
+    assert first.DISTRICT == second.DISTRICT == first.code('DISTRICT')
+    assert first.RISK_LVL == NULL_CODE and first['RISK_LVL'] is None
+    assert first.code('Theme') == second.code('Theme')
+    assert dictionaries.summary()['DISTRICT'] == 1
+
+
+def test_assignment_and_copy(make_record):
+    record = make_record(extras={'TAXON_ID': 1}, DISTRICT='Tambo')
+    duplicate = record.copy()
+    record['mitigation'] = 'Avoid'
+    record['TAXON_ID'] = 2
+    assert record['mitigation'] == 'Avoid' and record['TAXON_ID'] == 2
+    assert duplicate['mitigation'] is None and duplicate['TAXON_ID'] == 1
+    assert duplicate.schema is record.schema
+    with pytest.raises(KeyError):
+        record['SCI_NAME'] = 'x'
+
+
+def test_rows_and_dicts_in_column_order(make_record):
+    record = make_record(extras={'TAXON_ID': 500002}, UNIQUE_ID='GP-1', X=10, Y=20)
+    assert record.as_row(['UNIQUE_ID', 'Value_Type', 'TAXON_ID', 'X', 'EXTRA_INFO']) == ('GP-1', 'Flora', 500002, 10, None)
+    as_dict = record.to_dict()
+    assert as_dict['TAXON_ID'] == 500002 and as_dict['Theme'] == 'biodiversity' and as_dict['X'] == 10
+    assert isinstance(record, ResultRecord) and not hasattr(record, '__dict__')
@@ -0,0 +1,83 @@
+import json
+
+from mitigations import LRLI_REFERRED_EVC, NO_ADDITIONAL_COMMENT
+from risk_register import CACHE_VERSION, JFMP_FIELDS, MitigationRewriter, RiskRegister, mr_code
+
+REGISTER = "RiskRegister.gdb/JFMP_RiskRegister"
+
+
+def row(landscape, mitigation):
+    return [landscape, 'Threat', 'Event', mitigation, None]
+
+
+def cached_register(tmp_path, rows, **options):
+    (tmp_path / "JFMP_RiskRegister.json").write_text(json.dumps(
+        {'cache': CACHE_VERSION, 'version': [1, None], 'fields': JFMP_FIELDS, 'rows': rows}))
+    return RiskRegister.from_cache(REGISTER, JFMP_FIELDS, tmp_path, **options)
+
+
+ROWS = {'504000': [row('EC', 'ec first'), row('AGG', 'agg'), row('EC', 'ec second')]}
+
+
+def test_landscape_precedence_by_district(tmp_path):
+    register = cached_register(tmp_path, ROWS, landscape_precedence=True)
+    assert register.lookup('504000', 'Latrobe')['Mitigation_Measure'] == 'ec first'
+    assert register.lookup('504000', 'Tambo')['Mitigation_Measure'] == 'agg'
+    assert register.lookup('999', 'Tambo') is None
+
+
+def test_table_order_without_landscape_precedence(tmp_path):
+    register = cached_register(tmp_path, ROWS)
+    assert register.lookup('504000', 'Tambo')['Mitigation_Measure'] == 'ec first'
+    assert register.for_district('Tambo', landscape_precedence=True)['504000']['Mitigation_Measure'] == 'agg'
+
+
+def test_join_takes_ring_buffers_in_table_order(tmp_path, make_record):
+    register = cached_register(tmp_path, ROWS, landscape_precedence=True, table_order_buffers=['1000m_ring'])
+    burn_unit = make_record(buffer='500m', extras={'TAXON_ID': 504000.0}, DISTRICT='Tambo', mitigation='index')
+    contingency = make_record(buffer='1000m_ring', extras={'TAXON_ID': 504000}, DISTRICT='Tambo', mitigation='index')
+    unmatched = make_record(buffer='500m', extras={'TAXON_ID': 1}, DISTRICT='Tambo', mitigation='index')
+    assert register.join([burn_unit, contingency, unmatched]) == 2
+    assert [record['mitigation'] for record in (burn_unit, contingency, unmatched)] == ['agg', 'ec first', 'index']
+
+
+def test_from_cache_needs_a_matching_cache(tmp_path):
+    assert RiskRegister.from_cache(REGISTER, JFMP_FIELDS, tmp_path) is None
+    cached_register(tmp_path, ROWS)
+    assert RiskRegister.from_cache(REGISTER, JFMP_FIELDS[:2], tmp_path) is None
+    (tmp_path / "JFMP_RiskRegister.json").write_text("{not json")
+    assert RiskRegister.from_cache(REGISTER, JFMP_FIELDS, tmp_path) is None
+
+
+def test_rewriter_applies_first_matching_rule():
+    rewriter = MitigationRewriter()
+    tambo = "Avoid. This is a referred EVC in the Central Gippsland FMA."
+    assert rewriter.rewrite(tambo, 'Tambo', 'DAP') == NO_ADDITIONAL_COMMENT
+    assert rewriter.rewrite(tambo, 'Latrobe', 'LRLI') == LRLI_REFERRED_EVC
+    assert rewriter.rewrite(tambo, 'Latrobe', 'DAP') == tambo
+    assert rewriter.rewrite("Nothing referred here", 'Tambo', 'LRLI') == "Nothing referred here"
+    assert rewriter.rewrite(None, 'Tambo', 'DAP') is None
+
+
+def test_rewriter_matches_each_text_once():
+    rewriter = MitigationRewriter([(None, None, ('phrase a', 'phrase b'), 'rewritten')])
+    assert rewriter.phrase_ids("has phrase b") == frozenset([1])
+    assert rewriter.phrase_ids("neither") == frozenset()
+    assert rewriter.rewrite("has phrase a", 'Snowy', 'DAP') == 'rewritten'
+    assert len(rewriter._text_phrases) == 3
+
+
+def test_mr_code_ignores_placeholder_taxon_ids(make_record):
+    assert mr_code(make_record(extras={'TAXON_ID': 'Field not found'})) is None
+    assert mr_code(make_record(extras={'TAXON_ID': 'n/a'})) is None
+    assert mr_code(make_record(extras={'TAXON_ID': None})) is None
+    assert mr_code(make_record(extras={'TAXON_ID': '10220.0', 'EXTRA_INFO': 'Roost site'})) == '10220BR'
+    assert mr_code(make_record(extras={'TAXON_ID': 504000})) == '504000'
+
+
+def test_join_skips_placeholder_taxon_ids(tmp_path, make_record):
+    register = cached_register(tmp_path, ROWS)
+    records = [make_record(extras={'TAXON_ID': 'Field not found'}, DISTRICT='Tambo', mitigation='index'),
+               make_record(extras={'TAXON_ID': '504000'}, DISTRICT='Tambo', mitigation='index')]
+    assert register.join(records) == 1
+    assert [record['mitigation'] for record in records] == ['index', 'ec first']
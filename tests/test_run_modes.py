@@ -0,0 +1,86 @@
+import pytest
+
+import gipps_values_checking_tool as tool
+from gipps_values_checking_tool import DatasetConfig, Settings, ValuesChecker
+from qbid_engine import QbidEngine
+from result_records import DatasetSchema, ResultRecord, RunDictionaries
+
+FLORA = {'path': "{csdl}\\FLORAFAUNA1.GDB\\VBA_FLORA25", 'value_type': 'Flora', 'value_field': 'COMM_NAME',
+         'id_field': 'RECORD_ID', 'fields': ["COMM_NAME", "RECORD_ID", "STARTDATE"],
+         'buffer': {'DAP': '50m', 'JFMP': {'500m', '1000m_ring'}, 'NBFT': '50m'}}
+RECOVERY = {'path': "{regional}\\RegionalData.gdb\\BLD_SpeciesRecoveryOverlay", 'value_type': 'SRO - GBC',
+            'value_field': 'SRO_GBC', 'id_field': 'PU_ID', 'fields': ["PU_ID", "SRO_GBC", "SRO_NOTE"],
+            'buffer': '100m', 'modes': ['JFMP', 'NBFT']}
+
+
+@pytest.fixture
+def checker(tmp_path, monkeypatch):
+    """A two-mode checker with just the state _split_by_mode and the schema helpers use (no arcpy setup)"""
+    monkeypatch.setattr(tool, 'DATASET_MATRIX', {'biodiversity': {'flora': FLORA, 'recovery': RECOVERY}})
+    checker = ValuesChecker.__new__(ValuesChecker)
+    checker.settings = Settings(input_data='works.shp', workspace=tmp_path, modes=['DAP', 'JFMP'])
+    checker.start_date = '20250707'
+    checker.dictionaries = RunDictionaries()
+    return checker
+
+
+def detect(checker, config, buffer, work, value_id, *extras):
+    schema = checker._get_dataset_schema('biodiversity', DatasetConfig(**config), buffer)
+    return ResultRecord(schema, extras=extras, UNIQUE_ID=work, Value='Leafy Greenhood', Value_ID=value_id,
+                        X=2500100, Y=2400200)
+
+
+def test_schemas_are_tagged_with_the_modes_reporting_each_buffer(checker):
+    flora, recovery = DatasetConfig(**FLORA), DatasetConfig(**RECOVERY)
+    assert checker._get_dataset_schema('biodiversity', flora, 'buffer_50m').modes == {'DAP'}      # NBFT isn't in this run
+    assert checker._get_dataset_schema('biodiversity', flora, 'buffer_500m').modes == {'JFMP'}
+    assert checker._get_dataset_schema('biodiversity', recovery, 'buffer_100m').modes == {'JFMP'}
+
+
+def test_split_by_mode_gives_each_mode_its_records_and_columns(checker):
+    records = [detect(checker, FLORA, 'buffer_50m', 'GP-1', 1, '2001-01-01'),
+               detect(checker, FLORA, 'buffer_500m', 'GP-1', 2, '2001-01-01'),
+               detect(checker, FLORA, 'buffer_1000m_ring', 'GP-2', 3, '2001-01-01'),
+               detect(checker, RECOVERY, 'buffer_100m', 'GP-2', 4, 'Gang-gang')]
+    untagged = DatasetSchema('biodiversity', 'Flora', '50m', '20250707', ['STARTDATE'], checker.dictionaries)
+    shared = ResultRecord(untagged, extras=('2001-01-01',), UNIQUE_ID='GP-3', Value='Leafy Greenhood', Value_ID=5,
+                          X=2500100, Y=2400200)
+
+    by_mode = checker._split_by_mode(records + [shared])
+    for mode, mode_records in by_mode.items():
+        QbidEngine(mode).build_batch(mode_records)
+
+    assert [(r['UNIQUE_ID'], r['Buffer']) for r in by_mode['DAP']] == [('GP-1', '50m'), ('GP-3', '50m')]
+    assert [(r['UNIQUE_ID'], r['Buffer']) for r in by_mode['JFMP']] == [
+        ('GP-1', '500m'), ('GP-2', '1000m_ring'), ('GP-2', '100m'), ('GP-3', '50m')]
+    dap_shared, jfmp_shared = by_mode['DAP'][-1], by_mode['JFMP'][-1]
+    assert dap_shared is shared and jfmp_shared is not shared       # untagged records are copied for the second mode
+    assert jfmp_shared.schema is untagged and dap_shared.QBID and jfmp_shared.QBID
+    jfmp_shared.QBID = 'changed'
+    assert dap_shared.QBID != 'changed'
+
+    dap_columns = checker._get_theme_columns('biodiversity', 'DAP')
+    jfmp_columns = checker._get_theme_columns('biodiversity', 'JFMP')
+    assert 'SRO_NOTE' not in dap_columns and 'SRO_NOTE' in jfmp_columns
+    assert 'STARTDATE' in dap_columns and 'STARTDATE' in jfmp_columns
+    note = jfmp_columns.index('SRO_NOTE')
+    assert [r.as_row(jfmp_columns)[note] for r in by_mode['JFMP']] == [None, None, 'Gang-gang', None]
+
+
+def test_split_by_mode_drops_modes_without_records(checker):
+    record = detect(checker, FLORA, 'buffer_50m', 'GP-1', 1, '2001-01-01')
+    assert checker._split_by_mode([record]) == {'DAP': [record]}
+
+
+def test_values_index_loads_each_modes_risk_register(checker, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(tool, 'DATASET_MATRIX', {})
+    monkeypatch.setattr(checker, '_get_risk_register', loaded.append)
+    checker.settings.themes = ['biodiversity']
+    checker.build_values_index(spatial_reference=7899)
+    assert loaded == ['DAP', 'JFMP']
+
+    loaded.clear()
+    checker.settings.themes = ['forests']
+    checker.build_values_index(spatial_reference=7899)
+    assert loaded == []
@@ -0,0 +1,32 @@
+from run_stats import RunStatistics
+
+
+def test_skips_do_not_change_priority(tmp_path):
+    stats = RunStatistics(tmp_path / "stats.json")
+    stats.record('*|forests|A', results=0, seconds=2.0)
+    stats.record('*|forests|A', results=3, seconds=2.0)
+    before = stats.priority('*|forests|A')
+    stats.record_skip('*|forests|A')
+    stats.record_skip('*|forests|A')
+    assert stats.priority('*|forests|A') == before
+    assert stats.datasets['*|forests|A']['runs'] == 2
+    assert stats.datasets['*|forests|A']['skipped'] == 2
+
+
+def test_skipped_only_dataset_has_no_history(tmp_path):
+    stats = RunStatistics(tmp_path / "stats.json")
+    stats.record_skip('*|forests|B')
+    assert stats.hit_rate('*|forests|B') == 0.5
+    assert stats.priority('*|forests|B') == 0.0
+
+
+def test_source_extent_follows_change_stamp(tmp_path):
+    stats = RunStatistics(tmp_path / "stats.json")
+    stats.record_source_extent('src', (0, 0, 10, 10), [5, 1700000000.0])
+    stats.save()
+
+    reloaded = RunStatistics(tmp_path / "stats.json")
+    assert reloaded.source_extent('src', [5, 1700000000.0]) == (0, 0, 10, 10)
+    assert reloaded.source_extent('src', [6, 1700000000.0]) is None
+    assert reloaded.source_extent('src', [5, 1700000500.0]) is None
+    assert reloaded.source_extent('other', [5, 1700000000.0]) is None
@@ -0,0 +1,122 @@
+import math
+
+import pytest
+
+from spatial_index import (PointGridIndex, WorkGeometry, _arc_about_centre, _circular_arc, _distance_to_paths,
+                           _point_in_rings, curve_parts)
+
+SQUARE = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)]
+HOLE = [(4.0, 4.0), (4.0, 6.0), (6.0, 6.0), (6.0, 4.0), (4.0, 4.0)]
+
+
+def square_polygon(*rings):
+    xs = [x for ring in rings for x, _ in ring]
+    ys = [y for ring in rings for _, y in ring]
+    return WorkGeometry((), 'polygon', list(rings), (min(xs), min(ys), max(xs), max(ys)))
+
+
+def test_grid_query_reaches_points_in_neighbouring_cells():
+    points = [(1, 99.0, 50.0), (2, 101.0, 50.0), (3, 250.0, 50.0), (4, -0.5, 50.0), (5, 50.0, 199.9)]
+    index = PointGridIndex(points, cell_size=100)
+    found = {point[0] for point in index.query((100.0, 50.0, 100.0, 50.0), 1)}
+    assert found == {1, 2}                          # both sides of the x = 100 cell boundary
+    found = {point[0] for point in index.query((0.0, 0.0, 100.0, 100.0), 50)}
+    assert found == {1, 2, 4, 5}                    # negative coordinates land in cell -1
+    assert len(index) == 5
+
+
+def test_grid_query_is_a_superset_of_points_within_distance():
+    points = [(i, x * 37.0 % 500, x * 91.0 % 500) for i, x in enumerate(range(200))]
+    index = PointGridIndex(points, cell_size=60)
+    extent = (200.0, 200.0, 260.0, 230.0)
+    found = {point[0] for point in index.query(extent, 45)}
+    expected = {oid for oid, x, y in points
+                if extent[0] - 45 <= x <= extent[2] + 45 and extent[1] - 45 <= y <= extent[3] + 45}
+    assert expected <= found
+
+
+def test_point_in_rings_treats_holes_as_outside():
+    assert _point_in_rings(2, 2, [SQUARE, HOLE])
+    assert not _point_in_rings(5, 5, [SQUARE, HOLE])
+    assert _point_in_rings(5, 5, [SQUARE])
+    assert not _point_in_rings(12, 5, [SQUARE, HOLE])
+
+
+def test_distance_inside_a_hole_is_to_the_hole_edge():
+    work = square_polygon(SQUARE, HOLE)
+    assert work.distance_to(5, 5) == pytest.approx(1.0)
+    assert work.distance_to(2, 2) == 0.0
+
+
+@pytest.mark.parametrize('x, y', [(10, 5), (0, 0), (5, 10), (4, 5), (6, 6)])
+def test_points_on_an_edge_or_vertex_are_at_zero_distance(x, y):
+    assert square_polygon(SQUARE, HOLE).distance_to(x, y) == pytest.approx(0.0)
+
+
+def test_distance_to_paths_uses_the_nearest_segment_or_endpoint():
+    path = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)]
+    assert _distance_to_paths(5, 3, [path]) == pytest.approx(3.0)
+    assert _distance_to_paths(13, 12, [path]) == pytest.approx(math.hypot(3, 2))     # beyond the end vertex
+    assert _distance_to_paths(-3, -4, [path]) == pytest.approx(5.0)
+    assert _distance_to_paths(5, 0, [path]) == 0.0
+    assert _distance_to_paths(20, 0, [path, [(21.0, 1.0)]]) == pytest.approx(math.sqrt(2))   # single-vertex part
+
+
+def swept_angle(centre, start, points):
+    """Signed angle turned about centre walking from start through points (positive is counter-clockwise)"""
+    total, previous = 0.0, math.atan2(start[1] - centre[1], start[0] - centre[0])
+    for x, y in points:
+        angle = math.atan2(y - centre[1], x - centre[0])
+        total += (angle - previous + math.pi) % (2 * math.pi) - math.pi
+        previous = angle
+    return total
+
+
+def assert_on_circle(centre, radius, points, tolerance):
+    for (x1, y1), (x2, y2) in zip(points[:-1], points[1:]):
+        assert math.hypot(x2 - centre[0], y2 - centre[1]) == pytest.approx(radius)
+        midpoint = ((x1 + x2) / 2, (y1 + y2) / 2)
+        assert radius - math.hypot(midpoint[0] - centre[0], midpoint[1] - centre[1]) <= tolerance + 1e-9
+
+
+CENTRE, RADIUS = (100.0, 200.0), 50.0
+EAST, NORTH, WEST = (150.0, 200.0), (100.0, 250.0), (50.0, 200.0)
+
+
+@pytest.mark.parametrize('start, end, clockwise, sweep', [
+    (EAST, NORTH, False, math.pi / 2),              # minor, counter-clockwise
+    (EAST, NORTH, True, -3 * math.pi / 2),          # major, clockwise
+    (NORTH, EAST, True, -math.pi / 2),              # minor, clockwise
+    (NORTH, EAST, False, 3 * math.pi / 2),          # major, counter-clockwise
+    (EAST, EAST, False, 2 * math.pi),               # full circle
+    (EAST, EAST, True, -2 * math.pi),
+])
+def test_arc_about_centre_follows_the_clockwise_flag(start, end, clockwise, sweep):
+    points = _arc_about_centre(start, end, CENTRE, clockwise, 0.1)
+    assert points[-1] == end
+    assert swept_angle(CENTRE, start, points) == pytest.approx(sweep)
+    assert_on_circle(CENTRE, RADIUS, [start] + points, 0.1)
+
+
+@pytest.mark.parametrize('start, interior, end, sweep', [
+    (EAST, (135.35533905932738, 235.35533905932738), NORTH, math.pi / 2),         # minor, counter-clockwise
+    (EAST, (100.0, 150.0), NORTH, -3 * math.pi / 2),                             # major, clockwise
+    (NORTH, (135.35533905932738, 235.35533905932738), EAST, -math.pi / 2),        # minor, clockwise
+    (NORTH, WEST, EAST, 3 * math.pi / 2),                                        # major, counter-clockwise
+    (EAST, WEST, EAST, 2 * math.pi),                                             # full circle
+])
+def test_circular_arc_passes_through_the_interior_point(start, interior, end, sweep):
+    points = _circular_arc(start, interior, end, 0.1)
+    assert points[-1] == end
+    assert swept_angle(CENTRE, start, points) == pytest.approx(sweep)
+    assert_on_circle(CENTRE, RADIUS, [start] + points, 0.1)
+
+
+def test_circular_arc_through_collinear_points_is_a_straight_segment():
+    assert _circular_arc((0.0, 0.0), (1.0, 1.0), (2.0, 2.0), 0.1) == [(2.0, 2.0)]
+
+
+def test_curve_parts_ignores_a_minor_flag_that_disagrees_with_the_direction():
+    ring = [[150.0, 200.0], {'a': [[100.0, 250.0], [100.0, 200.0], 1, 1]}, [150.0, 200.0]]
+    (coords,) = curve_parts({'curveRings': [ring]}, 0.1)
+    assert swept_angle(CENTRE, EAST, coords[1:-1]) == pytest.approx(-3 * math.pi / 2)    # clockwise major arc
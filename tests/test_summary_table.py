@@ -0,0 +1,29 @@
+from summary_table import SummaryFlattener
+
+COLUMNS = {'LAND_MANGR': ('Land Tenure', 'Value'), 'ACT': ('Land Tenure', 'ACT'), 'PL_ZONE': ('Planning Zone', 'Value')}
+
+
+def test_distinct_values_in_first_seen_order(make_record):
+    flattener = SummaryFlattener(COLUMNS)
+    tenure = dict(theme='summary', value_type='Land Tenure', UNIQUE_ID='GP-1')
+    flattener.add([make_record(Value='State Forest', extras={'ACT': 'Forests Act'}, **tenure),
+                   make_record(Value='Park', extras={'ACT': 'Forests Act'}, **tenure)])
+    flattener.add([make_record(Value='State Forest', extras={'ACT': 'National Parks Act'}, **tenure),
+                   make_record(theme='summary', value_type='Planning Zone', UNIQUE_ID='GP-1', Value='SMZ')])
+    assert flattener.flatten('GP-1') == ['State Forest; Park', 'Forests Act; National Parks Act', 'SMZ']
+
+
+def test_empty_and_missing_fields_are_skipped(make_record):
+    flattener = SummaryFlattener(COLUMNS)
+    tenure = dict(theme='summary', value_type='Land Tenure', UNIQUE_ID='GP-2')
+    flattener.add([make_record(Value=' ', extras={'ACT': 'Field not found'}, **tenure),
+                   make_record(Value=None, extras={'ACT': 'None'}, **tenure),
+                   make_record(theme='summary', value_type='Native Title', UNIQUE_ID='GP-2', Value='Claim')])
+    assert flattener.flatten('GP-2') == ['', '', '']
+
+
+def test_rows_follow_the_works(make_record):
+    flattener = SummaryFlattener(COLUMNS)
+    flattener.add([make_record(theme='summary', value_type='Planning Zone', UNIQUE_ID='GP-1', Value='GMZ')])
+    assert flattener.rows([('GP-1', 'Track'), ('GP-3', 'Road')]) == [('GP-1', 'Track', '', '', 'GMZ'),
+                                                                     ('GP-3', 'Road', '', '', '')]
@@ -0,0 +1,67 @@
+import csv
+from importlib.util import find_spec
+
+import pytest
+
+from gipps_values_checking_tool import DERIVED_FIELDS, RESULT_FIELDS, ThemeCsvWriter, _batched
+
+COLUMNS = RESULT_FIELDS + DERIVED_FIELDS
+
+needs_pandas = pytest.mark.skipif(find_spec('pandas') is None, reason="needs pandas")
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize('count, size, lengths', [
+    (0, 3, []),
+    (1, 3, [1]),
+    (3, 3, [3]),
+    (7, 3, [3, 3, 1]),
+    (6, 1, [1] * 6),
+])
+def test_batched_splits_at_the_batch_size(count, size, lengths):
+    batches = list(_batched(iter(range(count)), size))
+    assert [len(batch) for batch in batches] == lengths
+    assert [item for batch in batches for item in batch] == list(range(count))
+
+
+@needs_pandas
+def test_writer_writes_the_header_once_and_appends_batches(tmp_path, make_record):
+    path = tmp_path / "20250707_DAP_biodiversity.csv"
+    writer = ThemeCsvWriter(path, COLUMNS)
+    writer.write_batch([make_record(Value='Leafy Greenhood'), make_record(Value='Tall Astelia')])
+    writer.write_batch([])
+    writer.write_batch([make_record(Value='Giant Burrowing Frog')])
+    writer.close()
+
+    rows = read_rows(path)
+    assert rows[0] == COLUMNS
+    value = COLUMNS.index('Value')
+    assert [row[value] for row in rows[1:]] == ['Leafy Greenhood', 'Tall Astelia', 'Giant Burrowing Frog']
+    assert writer.rows_written == 3
+
+
+@needs_pandas
+def test_first_batch_replaces_an_earlier_report(tmp_path, make_record):
+    path = tmp_path / "20250707_DAP_biodiversity.csv"
+    path.write_text("stale,report\n1,2\n")
+    writer = ThemeCsvWriter(path, COLUMNS)
+    writer.write_batch([make_record(Value='Leafy Greenhood')])
+
+    rows = read_rows(path)
+    assert rows[0] == COLUMNS and len(rows) == 2
+
+
+@needs_pandas
+def test_empty_theme_leaves_a_header_only_report(tmp_path):
+    path = tmp_path / "20250707_DAP_heritage.csv"
+    path.write_text("stale,report\n1,2\n")
+    writer = ThemeCsvWriter(path, COLUMNS)
+    writer.write_batch([])
+    writer.close()
+
+    assert read_rows(path) == [COLUMNS]
+    assert writer.rows_written == 0
@@ -0,0 +1,26 @@
+from tile_cache import TileCache
+
+SOURCE = r"C:\Data\CSDL\FLORAFAUNA1.gdb\VBA_FLORA25"
+
+
+def cache_with_tiles(tmp_path, current_fingerprint):
+    cache = TileCache(tmp_path)
+    cache.manifest['sources'][SOURCE] = {'fc': 'VBA_FLORA25', 'source_fingerprint': [2, 0, 0, 30000, 10000],
+                                         'tiles': {'0_0': {'count': 1, 'extent': [0, 0, 9000, 9000]},
+                                                   '2_0': {'count': 1, 'extent': [21000, 0, 29000, 9000]}}}
+    cache._fingerprints[SOURCE] = current_fingerprint      # as taken from the source once per cache
+    return cache
+
+
+def test_overlapping_tiles_of_a_current_cache(tmp_path):
+    cache = cache_with_tiles(tmp_path, [2, 0, 0, 30000, 10000])
+    assert cache.overlapping_tiles(SOURCE, (8000, 0, 12000, 5000)) == 1
+    assert cache.overlapping_tiles(SOURCE, (10000, 0, 20000, 5000)) == 0
+    assert cache.overlapping_tiles("other", (0, 0, 1, 1)) is None
+
+
+def test_stale_cache_is_not_used_to_skip(tmp_path):
+    # the source gained a feature since the cache was built: fall back to the source, don't skip
+    cache = cache_with_tiles(tmp_path, [3, 0, 0, 30000, 10000])
+    assert cache.overlapping_tiles(SOURCE, (10000, 0, 20000, 5000)) is None
+    assert cache.layer_for(SOURCE, (10000, 0, 20000, 5000)) is None
@@ -0,0 +1,237 @@
+# ============================================================================
+# Tiled Values Cache
+# ============================================================================
+
+"""
+Local, grid-tiled copies of the statewide CSDL values layers
+
+Each source layer is cut into fixed VICGRID2020 tiles (10 km by default) and stored in one local feature
+class per source, with a TILE_ID and SRC_OID on every feature. Each feature is assigned to exactly one tile,
+the one containing the centre of its extent, so features are never duplicated or split. The manifest records
+per tile the feature count, the extent actually covered by its features and a fingerprint (SHA-1 of the
+tile's OIDs, geometries and attributes).
+
+    cache = TileCache(Path(r"C:\\data\\temp\\tile_cache"))
+    cache.build(r"C:\\Data\\CSDL\\FLORAFAUNA1.gdb\\VBA_FLORA25")          # cut / incrementally refresh
+    layer = cache.layer_for(source, works_extent)                           # only the tiles needed
+
+build() re-reads the source, compares tile fingerprints with the manifest and only rewrites tiles that
+changed. layer_for() returns a feature layer over the tiles whose feature extent intersects the query
+extent, or None when the source is not cached or looks stale, in which case callers read the source.
+A source's staleness check (count and extent, on the share) runs once per TileCache, so once per run or
+once per batch sharing the cache, not once per dataset and buffer.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lazy_modules import arcpy
+from source_metadata import attribute_fields, extent_fingerprint, unique_table_name
+
+
+TILE_SIZE = 10000                   # metres
+TILE_WKID = 7899                    # VICGRID2020
+CACHE_GDB = "values_tiles.gdb"
+MANIFEST_FILE = "tile_manifest.json"
+
+TILE_ID_FIELD = "TILE_ID"
+SOURCE_OID_FIELD = "SRC_OID"
+
+Extent = Tuple[float, float, float, float]      # xmin, ymin, xmax, ymax
+
+logger = logging.getLogger(__name__)
+
+
+class TileCache:
+    """Tiled local store of values layers with a JSON manifest"""
+
+    def __init__(self, root: Path, tile_size: int = TILE_SIZE):
+        self.root = Path(root)
+        self.tile_size = tile_size
+        self.gdb = self.root / CACHE_GDB
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.manifest = self._load_manifest()
+        self._fingerprints = {}         # source -> extent fingerprint, taken once per cache instance
+
+    # ------------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------------
+
+    def layer_for(self, source: str, extent: Extent) -> Optional[str]:
+        """Feature layer over the cached tiles reaching into extent, or None to fall back to the source"""
+        entry = self._current_entry(source)
+        if entry is None:
+            return None
+
+        tiles = [tile_id for tile_id, tile in entry['tiles'].items() if _intersects(tile['extent'], extent)]
+        layer_name = f"tiles_{entry['fc']}"
+        if not tiles:
+            where_clause = "1 = 0"
+        else:
+            where_clause = f"{TILE_ID_FIELD} IN ({', '.join(repr(tile_id) for tile_id in tiles)})"
+        if arcpy.Exists(layer_name):
+            arcpy.management.Delete(layer_name)
+        arcpy.management.MakeFeatureLayer(str(self.gdb / entry['fc']), layer_name, where_clause)
+        logger.debug(f"Using {len(tiles)} of {len(entry['tiles'])} cached tiles for {source}")
+        return layer_name
+
+    def overlapping_tiles(self, source: str, extent: Extent) -> Optional[int]:
+        """Number of cached tiles whose features reach into extent, None if the source isn't cached or is stale"""
+        entry = self._current_entry(source)
+        if entry is None:
+            return None
+        return sum(1 for tile in entry['tiles'].values() if _intersects(tile['extent'], extent))
+
+    def _current_entry(self, source: str) -> Optional[dict]:
+        """Manifest entry of a source whose cache matches its fingerprint, None if not cached or stale"""
+        entry = self.manifest['sources'].get(source)
+        if entry is None or entry['source_fingerprint'] != self.source_fingerprint(source):
+            return None
+        return entry
+
+    def local_path(self, source: str) -> Optional[str]:
+        """Path of the local feature class holding a source's tiles"""
+        entry = self.manifest['sources'].get(source)
+        return str(self.gdb / entry['fc']) if entry else None
+
+    # ------------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------------
+
+    def build(self, source: str) -> Dict[str, int]:
+        """Cut a source into tiles, rewriting only the tiles whose fingerprint changed"""
+        self._ensure_gdb()
+        entry = self.manifest['sources'].get(source) or {'fc': self._local_name(source), 'tiles': {}}
+        local_fc = str(self.gdb / entry['fc'])
+        fields = attribute_fields(source)
+
+        if not arcpy.Exists(local_fc):
+            self._create_local_fc(source, local_fc, fields)
+            entry['tiles'] = {}
+
+        tiles = self._scan(source, fields)
+        changed = [tile_id for tile_id, tile in tiles.items()
+                   if entry['tiles'].get(tile_id, {}).get('fingerprint') != tile['fingerprint']]
+        removed = [tile_id for tile_id in entry['tiles'] if tile_id not in tiles]
+
+        self._delete_tiles(local_fc, changed + removed)
+        self._insert_tiles(source, local_fc, fields, {tile_id: tiles[tile_id]['oids'] for tile_id in changed})
+
+        entry['tiles'] = {tile_id: {key: tile[key] for key in ('count', 'extent', 'fingerprint')}
+                          for tile_id, tile in tiles.items()}
+        entry['source_fingerprint'] = self._fingerprints[source] = extent_fingerprint(source)
+        entry['built'] = datetime.now().isoformat(timespec='seconds')
+        self.manifest['sources'][source] = entry
+        self._save_manifest()
+
+        stats = {'tiles': len(tiles), 'changed': len(changed), 'removed': len(removed)}
+        logger.info(f"Tiled {source}: {stats}")
+        return stats
+
+    def _scan(self, source: str, fields: List[str]) -> Dict[str, dict]:
+        """One pass over the source: tile membership, feature extent and fingerprint per tile"""
+        tiles = {}
+        spatial_reference = arcpy.SpatialReference(TILE_WKID)
+        with arcpy.da.SearchCursor(source, ['OID@', 'SHAPE@'] + fields, spatial_reference=spatial_reference) as cursor:
+            for row in cursor:
+                oid, shape = row[0], row[1]
+                if shape is None:
+                    continue
+                extent = (shape.extent.XMin, shape.extent.YMin, shape.extent.XMax, shape.extent.YMax)
+                tile_id = self.tile_id((extent[0] + extent[2]) / 2, (extent[1] + extent[3]) / 2)
+                tile = tiles.get(tile_id)
+                if tile is None:
+                    tile = tiles[tile_id] = {'oids': [], 'extent': list(extent), 'digests': []}
+                tile['oids'].append(oid)
+                tile['extent'] = _union(tile['extent'], extent)
+                feature_digest = hashlib.sha1(repr((oid, row[2:])).encode())
+                feature_digest.update(shape.WKB)
+                tile['digests'].append((oid, feature_digest.digest()))
+
+        # Fingerprints are taken in OID order so they don't depend on cursor order
+        for tile in tiles.values():
+            tile['count'] = len(tile['oids'])
+            tile_digest = hashlib.sha1()
+            for _, feature_digest in sorted(tile.pop('digests')):
+                tile_digest.update(feature_digest)
+            tile['fingerprint'] = tile_digest.hexdigest()
+        return tiles
+
+    def source_fingerprint(self, source: str) -> List:
+        """Count and extent of a source, read from the share once per cache instance"""
+        fingerprint = self._fingerprints.get(source)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[source] = extent_fingerprint(source)
+        return fingerprint
+
+    def tile_id(self, x: float, y: float) -> str:
+        """Grid tile containing a VICGRID2020 coordinate"""
+        return f"{int(x // self.tile_size)}_{int(y // self.tile_size)}"
+
+    def _insert_tiles(self, source: str, local_fc: str, fields: List[str], tile_oids: Dict[str, List[int]]):
+        tile_of = {oid: tile_id for tile_id, oids in tile_oids.items() for oid in oids}
+        if not tile_of:
+            return
+        oid_field = arcpy.Describe(source).OIDFieldName
+        oids = sorted(tile_of)
+        spatial_reference = arcpy.SpatialReference(TILE_WKID)
+        with arcpy.da.InsertCursor(local_fc, ['SHAPE@', TILE_ID_FIELD, SOURCE_OID_FIELD] + fields) as insert:
+            for start in range(0, len(oids), 1000):
+                where_clause = f"{oid_field} IN ({','.join(str(oid) for oid in oids[start:start + 1000])})"
+                with arcpy.da.SearchCursor(source, ['OID@', 'SHAPE@'] + fields, where_clause,
+                                           spatial_reference=spatial_reference) as cursor:
+                    for row in cursor:
+                        insert.insertRow((row[1], tile_of[row[0]], row[0]) + tuple(row[2:]))
+
+    def _delete_tiles(self, local_fc: str, tile_ids: Sequence[str]):
+        tile_ids = list(tile_ids)
+        for start in range(0, len(tile_ids), 500):
+            chunk = tile_ids[start:start + 500]
+            where_clause = f"{TILE_ID_FIELD} IN ({', '.join(repr(tile_id) for tile_id in chunk)})"
+            with arcpy.da.UpdateCursor(local_fc, [TILE_ID_FIELD], where_clause) as cursor:
+                for _ in cursor:
+                    cursor.deleteRow()
+
+    def _create_local_fc(self, source: str, local_fc: str, fields: List[str]):
+        desc = arcpy.Describe(source)
+        arcpy.management.CreateFeatureclass(str(self.gdb), Path(local_fc).name, desc.shapeType.upper(),
+                                            template=source, spatial_reference=arcpy.SpatialReference(TILE_WKID))
+        arcpy.management.AddField(local_fc, TILE_ID_FIELD, "TEXT", field_length=24)
+        arcpy.management.AddField(local_fc, SOURCE_OID_FIELD, "LONG")
+        arcpy.management.AddIndex(local_fc, TILE_ID_FIELD, f"{Path(local_fc).name}_tile_idx")
+
+    # ------------------------------------------------------------------------
+    # Manifest and storage
+    # ------------------------------------------------------------------------
+
+    def _ensure_gdb(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not arcpy.Exists(str(self.gdb)):
+            arcpy.management.CreateFileGDB(str(self.root), CACHE_GDB)
+
+    def _local_name(self, source: str) -> str:
+        """Unique, valid feature class name for a source path"""
+        return unique_table_name(source, self.gdb, (entry['fc'] for entry in self.manifest['sources'].values()))
+
+    def _load_manifest(self) -> dict:
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text())
+            if manifest.get('tile_size') == self.tile_size:
+                return manifest
+            logger.warning(f"Tile size changed from {manifest.get('tile_size')} to {self.tile_size}; rebuilding tile cache")
+        return {'tile_size': self.tile_size, 'sources': {}}
+
+    def _save_manifest(self):
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=1))
+
+
+def _union(a: Sequence[float], b: Sequence[float]) -> List[float]:
+    return [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+
+
+def _intersects(a: Sequence[float], b: Sequence[float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
@@ -0,0 +1,179 @@
+# ============================================================================
+# In-memory Values Index
+# ============================================================================
+
+"""
+Warm, in-memory copies of the values sources for interactive checks
+
+Each (source, where clause) used by DATASET_MATRIX is read once into memory: the arcpy geometry of every
+feature (projected to the index's coordinate system) and the attribute fields the datasets need. Features
+are held in a uniform grid hash on their extents, so a check only measures the features whose extent comes
+within the search distance of the work. Geometry predicates (distanceTo, within, intersect) run on the
+in-memory geometry objects, so a check does no GDB I/O at all.
+
+    index = ValuesIndex(arcpy.SpatialReference(7899))
+    index.add(source, "TAXON_TYPE = 'Flora'", ['TAXON_ID', 'SCI_NAME'])
+    for feature, distance in index.get(source, "TAXON_TYPE = 'Flora'").near(work_shape, 500):
+        ...
+    index.reload_changed()          # re-read sources whose count or extent changed
+
+Features much larger than a grid cell (e.g. statewide forest zones) are kept in a short oversized list
+that every query scans, so they don't fill thousands of grid cells.
+"""
+
+import logging
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from lazy_modules import arcpy
+from source_metadata import extent_fingerprint
+
+
+CELL_SIZE = 2000                    # metres
+MAX_CELLS_PER_FEATURE = 64          # features covering more cells than this go to the oversized list
+
+Extent = Tuple[float, float, float, float]      # xmin, ymin, xmax, ymax
+
+logger = logging.getLogger(__name__)
+
+
+class ValueFeature:
+    """One values feature held in memory"""
+    __slots__ = ('oid', 'shape', 'attributes', 'extent')
+
+    def __init__(self, oid: int, shape, attributes: tuple, extent: Extent):
+        self.oid = oid
+        self.shape = shape              # arcpy geometry in the index's coordinate system
+        self.attributes = attributes    # values of SourceIndex.fields, in order
+        self.extent = extent
+
+
+class SourceIndex:
+    """The features of one source (optionally filtered by a where clause) in a grid hash on their extents"""
+
+    def __init__(self, source: str, where_clause: Optional[str], fields: Sequence[str], spatial_reference,
+                 cell_size: float = CELL_SIZE):
+        self.source = source
+        self.where_clause = where_clause
+        self.cell_size = cell_size
+        available = {f.name for f in arcpy.ListFields(source)}
+        self.fields = [f for f in dict.fromkeys(fields) if f in available]
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+        self.fingerprint = extent_fingerprint(source)
+        self.loaded = datetime.now().isoformat(timespec='seconds')
+        self.features: List[ValueFeature] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._oversized: List[int] = []
+
+        with arcpy.da.SearchCursor(source, ['OID@', 'SHAPE@'] + self.fields, where_clause,
+                                   spatial_reference=spatial_reference) as cursor:
+            for row in cursor:
+                shape = row[1]
+                if shape is None:
+                    continue
+                extent = (shape.extent.XMin, shape.extent.YMin, shape.extent.XMax, shape.extent.YMax)
+                self._add(ValueFeature(row[0], shape, tuple(row[2:]), extent))
+
+    def near(self, geometry, distance: float) -> Iterator[Tuple[ValueFeature, float]]:
+        """(feature, distance) for every feature within distance of an arcpy geometry"""
+        extent = geometry.extent
+        query = (extent.XMin - distance, extent.YMin - distance, extent.XMax + distance, extent.YMax + distance)
+        candidates = set(self._oversized)
+        x0, y0 = self._cell(query[0], query[1])
+        x1, y1 = self._cell(query[2], query[3])
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                candidates.update(self._cells.get((cx, cy), ()))
+
+        for i in sorted(candidates):
+            feature = self.features[i]
+            if not _intersects(feature.extent, query):
+                continue
+            feature_distance = feature.shape.distanceTo(geometry)
+            if feature_distance <= distance:
+                yield feature, feature_distance
+
+    def _add(self, feature: ValueFeature):
+        i = len(self.features)
+        self.features.append(feature)
+        x0, y0 = self._cell(feature.extent[0], feature.extent[1])
+        x1, y1 = self._cell(feature.extent[2], feature.extent[3])
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_CELLS_PER_FEATURE:
+            self._oversized.append(i)
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells.setdefault((cx, cy), []).append(i)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+
+class ValuesIndex:
+    """SourceIndex per (source, where clause), reloaded when a source's fingerprint changes
+
+    add() and reload_changed() build new SourceIndex objects before swapping them in, so readers
+    holding the previous index keep a consistent view while a reload runs. reload_changed(swap_lock) also
+    takes a caller's lock for the swap only, e.g. to wait for an in-flight check, never for the reading.
+    """
+
+    def __init__(self, spatial_reference, cell_size: float = CELL_SIZE):
+        self.spatial_reference = spatial_reference
+        self.cell_size = cell_size
+        self.sources: Dict[Tuple[str, Optional[str]], SourceIndex] = {}
+        self._lock = threading.Lock()
+
+    def add(self, source: str, where_clause: Optional[str], fields: Sequence[str]) -> SourceIndex:
+        """Load a source (if not already loaded with these fields) and return its index"""
+        key = (source, where_clause)
+        current = self.sources.get(key)
+        if current is not None and set(fields) <= set(current.fields) | _missing_fields(current, fields):
+            return current
+        wanted = list(current.fields) + list(fields) if current else list(fields)
+        index = SourceIndex(source, where_clause, wanted, self.spatial_reference, self.cell_size)
+        with self._lock:
+            self.sources[key] = index
+        logger.info(f"Indexed {len(index)} features from {source}" + (f" where {where_clause}" if where_clause else ""))
+        return index
+
+    def get(self, source: str, where_clause: Optional[str]) -> Optional[SourceIndex]:
+        return self.sources.get((source, where_clause))
+
+    def reload_changed(self, swap_lock: Optional[threading.Lock] = None) -> List[str]:
+        """Re-read every source whose count or extent changed; returns the sources reloaded"""
+        reloaded = []
+        for key, current in list(self.sources.items()):
+            try:
+                if extent_fingerprint(current.source) == current.fingerprint:
+                    continue
+                index = SourceIndex(current.source, current.where_clause, current.fields, self.spatial_reference,
+                                    self.cell_size)
+            except Exception as e:
+                # keep serving the previous copy; the next check retries
+                logger.warning(f"Could not reload {current.source}: {e}")
+                continue
+            with swap_lock or nullcontext(), self._lock:
+                self.sources[key] = index
+            reloaded.append(current.source)
+            logger.info(f"Reloaded {current.source}: {len(index)} features")
+        return reloaded
+
+    def summary(self) -> List[dict]:
+        """One entry per loaded source, for status reporting"""
+        return [{'source': index.source, 'where_clause': index.where_clause, 'features': len(index),
+                 'loaded': index.loaded} for index in self.sources.values()]
+
+
+def _missing_fields(index: SourceIndex, fields: Sequence[str]) -> set:
+    """Requested fields the source doesn't have (never loadable, so not a reason to reload)"""
+    available = {f.name for f in arcpy.ListFields(index.source)}
+    return {field for field in fields if field not in available}
+
+
+def _intersects(a: Sequence[float], b: Sequence[float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]